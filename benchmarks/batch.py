@@ -0,0 +1,115 @@
+"""
+Compares scoring positions one at a time with Evaluator.evaluate against scoring them in
+vectorized batches with checker.batch_evaluation.BatchEvaluator, and the search with and
+without leaf batching (minimax.batch.LeafBatcher). Needs NumPy.
+
+A vectorized call costs about the same whatever the batch size up to a few dozen positions,
+so small batches are slower than the scalar evaluator and large ones much faster. In the
+search, nodes before the leaves rarely have enough children to fill a batch, so leaf
+batching only pays off with larger batches (min_size) or a richer evaluation.
+
+Run from the repository root:
+    python -m benchmarks.batch --positions 8192 --depth 6
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from checker.batch_evaluation import BatchEvaluator, encode, masks_from_codes
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW
+from minimax.algorithm import NodeCounter, search_position
+from minimax.batch import LeafBatcher
+from minimax.transposition import TranspositionTable
+from benchmarks.positions import POSITIONS, fen_position, random_board
+
+BATCH_SIZES = (1, 8, 32, 128, 1024, 8192)
+
+
+def best_time(function, repeat):
+    """
+    Returns the fastest of repeat runs of a function, in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def batch_rate(batch_evaluator, masks, size, repeat):
+    """
+    Returns the positions scored per second by evaluate_masks in batches of a given size.
+    """
+    yellow, purple, kings, psq = masks
+    count = len(yellow) // size * size
+
+    def run():
+        for start in range(0, count, size):
+            end = start + size
+            batch_evaluator.evaluate_masks(yellow[start:end], purple[start:end], kings[start:end], psq[start:end])
+    return count / best_time(run, repeat)
+
+
+def search_time(positions, depth, batch):
+    """
+    Searches every (BitBoard, max_player) pair to a fixed depth without quiescence.
+
+    Returns:
+        tuple: Total seconds and nodes, and the list of (value, move) results.
+    """
+    seconds, nodes, results = 0.0, 0, []
+    for position, max_player in positions:
+        counter, tt = NodeCounter(), TranspositionTable()
+        start = time.perf_counter()
+        results.append(search_position(position, depth, max_player, float('-inf'), float('inf'), counter, tt,
+                                       batch=batch))
+        seconds += time.perf_counter() - start
+        nodes += counter.nodes
+    return seconds, nodes, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=8192, help='random positions to score')
+    parser.add_argument('--depth', type=int, default=6, help='search depth over the suite')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    boards = [BitBoard.from_board(random_board(rng)) for _ in range(args.positions)]
+    batch_evaluator = BatchEvaluator(boards[0].evaluator)
+    codes = encode(boards)
+    scalar = np.array([board.evaluate() for board in boards])
+    assert (batch_evaluator.evaluate(codes) == scalar).all(), 'batch scores differ from evaluate'
+
+    print(f"{len(boards)} random positions, positions scored per second (fastest of {args.repeat})")
+    reference = len(boards) / best_time(lambda: [board.evaluate() for board in boards], args.repeat)
+    print(f"{'scalar evaluate':>22} {reference:>11,.0f}")
+    rate = len(boards) / best_time(lambda: batch_evaluator.evaluate(codes), args.repeat)
+    print(f"{'evaluate, (n, 32) codes':>22} {rate:>11,.0f} {rate / reference:>6.2f}x")
+    masks = masks_from_codes(codes) + (np.array([board.psq for board in boards], dtype=np.int64),)
+    for size in BATCH_SIZES:
+        if size <= len(boards):
+            rate = batch_rate(batch_evaluator, masks, size, args.repeat)
+            print(f"{'masks, batches of ' + str(size):>22} {rate:>11,.0f} {rate / reference:>6.2f}x")
+
+    suite = [(position, color == YELLOW) for position, color in map(fen_position, POSITIONS.values())]
+    print(f"\nsearch of {len(suite)} suite positions to depth {args.depth}, no quiescence")
+    print(f"{'leaves':>16} {'seconds':>8} {'nodes':>9} {'batches':>8} {'per batch':>9}")
+    seconds, nodes, expected = search_time(suite, args.depth, None)
+    print(f"{'scalar':>16} {seconds:>8.2f} {nodes:>9}")
+    for min_size in (LeafBatcher().min_size, 1):
+        batch = LeafBatcher(min_size)
+        seconds, nodes, results = search_time(suite, args.depth, batch)
+        assert results == expected, 'batched search chose other moves'
+        print(f"{'batch, min ' + str(min_size):>16} {seconds:>8.2f} {nodes:>9} {batch.batches:>8} "
+              f"{batch.positions / max(batch.batches, 1):>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Measures how much search time the opening book saves over the first plies of a game.
+
+Each game starts with a few random moves, then the engine plays both sides, once searching
+every move and once taking its moves from the book when the position is in it. The
+search time of the two runs is compared ply by ply.
+
+Build a book first, then run from the repository root:
+    python -m minimax.book search --plies 10 --depth 8
+    python -m benchmarks.book --games 20 --depth 8
+"""
+import argparse
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import YELLOW, PURPLE
+from checker.notation import parse_move
+from minimax.book import BOOK_FILE, OpeningBook
+from minimax.search import search
+from minimax.transposition import TranspositionTable
+from selfplay import random_openings
+
+
+def play_opening(opening, plies, depth, book):
+    """
+    Plays the first plies of a game and times every engine move.
+
+    Args:
+        opening (list): Move texts played before the engine takes over.
+        plies (int): The number of plies to play in total.
+        depth (int): The search depth of the engine.
+        book (OpeningBook): The book to play from, or None to search every move.
+
+    Returns:
+        tuple: (seconds spent on each ply, None for the opening moves; number of book moves).
+    """
+    position, color = BitBoard.from_board(Board()), PURPLE
+    tt = TranspositionTable()
+    timings, hits = [], 0
+    for ply in range(plies):
+        if ply < len(opening):
+            move, seconds = parse_move(position, opening[ply], color), None
+        else:
+            start = time.perf_counter()
+            move = book.choose(position, color == YELLOW) if book is not None else None
+            if move is not None:
+                hits += 1
+            else:
+                move = search(position, time_ms=float('inf'), max_depth=depth, max_player=color == YELLOW, tt=tt).move
+            seconds = time.perf_counter() - start
+            if move is None:
+                break
+        timings.append(seconds)
+        position.make_move(move)
+        color = YELLOW if color == PURPLE else PURPLE
+    return timings, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--book', default=BOOK_FILE)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--plies', type=int, default=10)
+    parser.add_argument('--random-plies', type=int, default=2, help='random moves at the start of every game')
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    book = OpeningBook(args.book)
+    print(f"{args.book}: {len(book)} moves")
+    openings = random_openings(args.games, args.random_plies, args.seed)
+    searched = [0.0] * args.plies
+    booked = [0.0] * args.plies
+    hits = moves = 0
+    for opening in openings:
+        without, _ = play_opening(opening, args.plies, args.depth, None)
+        with_book, found = play_opening(opening, args.plies, args.depth, book)
+        hits += found
+        for ply, (a, b) in enumerate(zip(without, with_book)):
+            if a is not None:
+                searched[ply] += a
+                booked[ply] += b
+                moves += 1
+
+    print(f"{len(openings)} games, {args.random_plies} random plies, depth {args.depth}: "
+          f"{hits}/{moves} engine moves from the book")
+    print(f"{'ply':>4} {'search s':>9} {'book s':>9}")
+    for ply in range(args.random_plies, args.plies):
+        print(f"{ply + 1:>4} {searched[ply]:>9.3f} {booked[ply]:>9.3f}")
+    total, total_book = sum(searched), sum(booked)
+    saved = 1 - total_book / total if total else 0.0
+    print(f"first {args.plies} plies: {total:.2f}s searching, {total_book:.2f}s with the book, {saved:.0%} saved")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Measures how much faster the AI's moves get when the search keeps its state between
+moves (minimax.cache.SearchCache), with and without pondering during the opponent's turn.
+
+A game is first played between the AI (YELLOW) and a weaker opponent. The AI's positions
+of that game are then searched again in order to a fixed depth: with a fresh table every
+move, with one cache kept over the whole game, and with the cache plus pondering on the
+expected reply for a while before each move, as if the human were thinking.
+
+Run from the repository root:
+    python -m benchmarks.cache --depth 8 --moves 20 --ponder-ms 500
+"""
+import argparse
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from minimax.cache import SearchCache
+from minimax.search import search, ponder
+
+MODES = ('fresh', 'cache', 'cache + ponder')
+
+
+def record_game(moves, depth, opponent_depth):
+    """
+    Plays a game between the AI and a weaker opponent; PURPLE (the opponent) moves first.
+
+    Returns:
+        list: (position, reply) pairs: the positions where the AI was to move, in order,
+        each with the opponent's move that led to it.
+    """
+    position, played = BitBoard.from_board(Board()), []
+    while len(played) < moves:
+        result = search(position, time_ms=float('inf'), max_depth=opponent_depth, max_player=False)
+        if result.move is None:
+            break
+        reply = result.move
+        position = position.apply(reply)
+        if position.winner() is not None:
+            break
+        played.append((position.copy(), reply))
+        result = search(position, time_ms=float('inf'), max_depth=depth, max_player=True)
+        if result.move is None:
+            break
+        position = position.apply(result.move)
+    return played
+
+
+def replay(positions, depth, mode, ponder_ms):
+    """
+    Searches the AI's positions of a game in order.
+
+    Returns:
+        tuple: The seconds and nodes of every move, and how many opponent replies were the
+        ones the previous search expected.
+    """
+    cache = SearchCache() if mode != 'fresh' else None
+    seconds, nodes, expected = [], [], 0
+    pv, previous = [], None
+    for position, reply in positions:
+        if previous is not None and len(pv) > 1:
+            expected += pv[1] == reply
+            if mode == 'cache + ponder':
+                # The opponent thinks for ponder_ms, while the AI searches the reply it expects
+                guess = previous.apply(pv[0]).apply(pv[1])
+                stop = time.perf_counter() + ponder_ms / 1000
+                while time.perf_counter() < stop and ponder(guess, True, cache, 50, depth) < depth:
+                    pass
+        start = time.perf_counter()
+        result = search(position, time_ms=float('inf'), max_depth=depth, max_player=True, cache=cache)
+        seconds.append(time.perf_counter() - start)
+        nodes.append(result.nodes)
+        pv, previous = result.pv, position
+    return seconds, nodes, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--opponent-depth', type=int, default=4)
+    parser.add_argument('--moves', type=int, default=20)
+    parser.add_argument('--ponder-ms', type=float, default=500, help='time the opponent spends on each reply')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    positions = record_game(args.moves, args.depth, args.opponent_depth)
+    # The modes take turns, and the fastest run of each counts, so drifts in machine load hit them alike
+    best = {}
+    for _ in range(args.repeat):
+        for mode in MODES:
+            seconds, nodes, expected = replay(positions, args.depth, mode, args.ponder_ms)
+            if mode not in best or sum(seconds[1:]) < best[mode][0]:
+                best[mode] = (sum(seconds[1:]), sum(nodes[1:]), expected)
+    print(f"{len(positions)} AI moves searched to depth {args.depth}, fastest of {args.repeat}; "
+          f"the first move is left out of the totals")
+    print(f"{'mode':>15} {'seconds':>8} {'nodes':>9} {'speedup':>8} {'expected replies':>17}")
+    reference = best['fresh'][0]
+    for mode, (seconds, nodes, expected) in best.items():
+        print(f"{mode:>15} {seconds:>8.2f} {nodes:>9} {reference / seconds:>7.2f}x "
+              f"{expected:>9}/{len(positions) - 1}")
+
+
+if __name__ == '__main__':
+    main()
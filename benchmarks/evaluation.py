@@ -0,0 +1,47 @@
+"""
+Measures the cost of one evaluate() call with the material-only weights (the original
+evaluation) and with the full positional evaluator, on Board and on BitBoard.
+
+Run from the repository root:
+    python -m benchmarks.evaluation --positions 2000 --weights weights.json
+"""
+import argparse
+import random
+import timeit
+
+from checker.bitboard import BitBoard
+from checker.evaluation import Evaluator, MATERIAL_WEIGHTS
+from benchmarks.positions import random_board
+
+
+def per_call(boards, repeat):
+    """
+    Returns the best observed time of one evaluate() call, in nanoseconds.
+    """
+    calls = [board.evaluate for board in boards]
+
+    def run():
+        for call in calls:
+            call()
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / len(calls) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--weights', default=None, help='JSON weights file for the positional evaluator')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    positional = Evaluator.load(args.weights) if args.weights else Evaluator()
+    for name, evaluator in (('material only', Evaluator(MATERIAL_WEIGHTS)), ('positional', positional)):
+        rng = random.Random(args.seed)
+        boards = [random_board(rng, evaluator=evaluator) for _ in range(args.positions)]
+        bitboards = [BitBoard.from_board(board) for board in boards]
+        print(f"{name:>14}: Board {per_call(boards, args.repeat):7.0f} ns/call   "
+              f"BitBoard {per_call(bitboards, args.repeat):7.0f} ns/call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Times the two ways of visiting every child position of random positions: the deepcopy path
+of get_all_moves and Board.make_move/unmake_move. That both give the same positions is
+checked by tests/test_make_unmake.py.
+
+Run from the repository root:
+    python -m benchmarks.make_unmake --positions 2000
+"""
+import argparse
+import random
+import time
+
+from checker.constants import YELLOW, PURPLE
+from minimax.algorithm import get_all_moves
+from benchmarks.positions import random_board
+
+
+def bench(positions, seed):
+    """
+    Times visiting every child of the random positions with deepcopy and with make/unmake.
+    """
+    rng = random.Random(seed)
+    boards = [random_board(rng) for _ in range(positions)]
+
+    start = time.perf_counter()
+    for board in boards:
+        for color in (YELLOW, PURPLE):
+            for child in get_all_moves(board, color, None):
+                child.evaluate()
+    copied = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for board in boards:
+        for color in (YELLOW, PURPLE):
+            for move in board.get_all_moves(color):
+                undo = board.make_move(move)
+                board.evaluate()
+                board.unmake_move(undo)
+    in_place = time.perf_counter() - start
+    return copied, in_place
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    copied, in_place = bench(args.positions, args.seed)
+    print(f"deepcopy: {copied:.3f}s  make/unmake: {in_place:.3f}s  speedup: {copied / in_place:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares the number of positions visited by a full-width minimax search with the
+alpha-beta search in minimax.algorithm, and checks that both find the same value and that
+the move alpha-beta picks is one of the best moves of the full-width search.
+
+Run from the repository root:
+    python -m benchmarks.node_counts --min-depth 4 --max-depth 8
+"""
+import argparse
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from minimax.algorithm import NodeCounter, get_all_moves, minimax, terminal_score, YELLOW, PURPLE
+
+
+def full_width(position, depth, max_player, counter, ply=0):
+    """
+    Reference minimax without any pruning, used only as a baseline for node counts.
+
+    Args:
+        position: The board to search.
+        depth: The remaining search depth.
+        max_player: True if the maximizing (AI) player is to move.
+        counter: A NodeCounter incremented once per visited position.
+        ply: The distance from the root, for the score of a lost position.
+
+    Returns:
+        float: The minimax value of the position.
+    """
+    counter.nodes += 1
+    children = get_all_moves(position, YELLOW if max_player else PURPLE, None)
+    if not children:
+        return terminal_score(max_player, ply)  # The side to move cannot move: lost, as in search_position
+    if depth == 0:
+        return position.evaluate()
+    values = [full_width(child, depth - 1, not max_player, counter, ply + 1) for child in children]
+    return max(values) if max_player else min(values)
+
+
+def best_moves(position, depth, counter):
+    """
+    Runs full_width on every move of the maximizing player at the root.
+
+    Args:
+        position: The board to search; the maximizing player is to move and has a move.
+        depth: The search depth, counting the root move.
+        counter: A NodeCounter incremented once per visited position, the root included.
+
+    Returns:
+        tuple: The value of the position and the (yellow, purple, kings) masks of every
+        position reached by a move of that value.
+    """
+    counter.nodes += 1
+    values = [(full_width(child, depth - 1, False, counter, 1), (child.yellow, child.purple, child.kings))
+              for child in get_all_moves(position, YELLOW, None)]
+    best = max(value for value, _ in values)
+    return best, {child for value, child in values if value == best}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-depth', type=int, default=4)
+    parser.add_argument('--max-depth', type=int, default=8)
+    parser.add_argument('--full-width-max-depth', type=int, default=5,
+                        help='deepest depth at which the unpruned baseline is also run')
+    parser.add_argument('--engine', choices=('board', 'bitboard'), default='board',
+                        help='search on Board objects or on the integer BitBoard')
+    args = parser.parse_args()
+
+    board = Board() if args.engine == 'board' else BitBoard.from_board(Board())
+    print(f"{'depth':>5} {'full-width':>12} {'alpha-beta':>12} {'ratio':>8} {'value':>7} {'seconds':>8} {'us/node':>8}")
+    for depth in range(args.min_depth, args.max_depth + 1):
+        pruned = NodeCounter()
+        start = time.perf_counter()
+        value, chosen = minimax(board, depth, True, None, counter=pruned)
+        elapsed = time.perf_counter() - start
+
+        if depth <= args.full_width_max_depth:
+            baseline = NodeCounter()
+            reference, best = best_moves(board, depth, baseline)
+            assert reference == value, f"value mismatch at depth {depth}: {reference} != {value}"
+            assert (chosen.yellow, chosen.purple, chosen.kings) in best, \
+                f"the move chosen at depth {depth} is not one of the {len(best)} moves worth {reference}"
+            ratio = f"{baseline.nodes / pruned.nodes:.1f}x"
+            full = str(baseline.nodes)
+        else:
+            full, ratio = '-', '-'
+        per_node = elapsed / pruned.nodes * 1e6
+        print(f"{depth:>5} {full:>12} {pruned.nodes:>12} {ratio:>8} {value:>7} {elapsed:>8.2f} {per_node:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
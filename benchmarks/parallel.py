@@ -0,0 +1,55 @@
+"""
+Compares the root-parallel search with the serial minimax at fixed depths and reports
+the speedup, checking that the deterministic mode picks the same move as minimax.
+
+Run from the repository root:
+    python -m benchmarks.parallel --min-depth 6 --max-depth 9 --processes 16
+"""
+import argparse
+import os
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from minimax.algorithm import NodeCounter, minimax
+from minimax.parallel import ParallelSearch
+from minimax.transposition import TranspositionTable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-depth', type=int, default=6)
+    parser.add_argument('--max-depth', type=int, default=9)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--memory-mb', type=float, default=16)
+    args = parser.parse_args()
+
+    position = BitBoard.from_board(Board())
+    pool = ParallelSearch(args.processes, args.memory_mb)
+    pool.search(position, 2)  # Start the worker processes before timing anything
+    print(f"{args.processes} processes")
+    print(f"{'depth':>5} {'serial s':>9} {'parallel s':>10} {'speedup':>8} {'det. s':>8} {'same move':>9}")
+    try:
+        for depth in range(args.min_depth, args.max_depth + 1):
+            start = time.perf_counter()
+            value, serial_board = minimax(position, depth, True, None, counter=NodeCounter(),
+                                          tt=TranspositionTable(args.memory_mb))
+            serial = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fast = pool.search(position, depth)
+            parallel = time.perf_counter() - start
+            assert fast.value == value, f"value mismatch at depth {depth}: {fast.value} != {value}"
+
+            start = time.perf_counter()
+            exact = pool.search(position, depth, deterministic=True)
+            deterministic = time.perf_counter() - start
+            same = exact.board == serial_board
+            print(f"{depth:>5} {serial:>9.2f} {parallel:>10.2f} {serial / parallel:>7.1f}x "
+                  f"{deterministic:>8.2f} {str(same):>9}")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Measures the PDN import (checker.pdn): games per second of reading alone and of reading,
+validating and writing positions, in this process and over a process pool, and the
+memory the reader needs for files of different sizes.
+
+The PDN file is generated: random games under forced-capture rules, written with move
+numbers, tags, and the odd comment and variation, then repeated to the requested size.
+Before timing, a known game is imported to check that multi-jumps are read along the
+squares they are written with.
+
+Run from the repository root:
+    python -m benchmarks.pdn --games 20000 --processes 2
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import YELLOW, PURPLE
+from checker.notation import move_to_text
+from checker.pdn import read_games, import_pdn, read_positions
+from checker.rules import FORCED_CAPTURE
+
+UNIQUE_GAMES = 500  # Distinct random games; the file repeats them
+# A short game under forced captures with a man crowned by a double jump (13x22x31) and
+# the new king turning back down partway through a triple jump (31x24x15x22)
+KNOWN_GAME = """[Event "Crowning and turning captures"]
+[Result "1/2-1/2"]
+
+1. 10-15 22-18 2. 15x22 26x17 3. 9-13 31-26 4. 13x22x31 23-18 5. 5-9 24-19
+6. 31x24x15x22 1/2-1/2
+"""
+KNOWN_PLIES = 11
+# The same game with a capture stopped early or written along a path it cannot take
+BROKEN_MOVES = (('13x22x31', '13x22'), ('31x24x15x22', '31x24x15'), ('31x24x15x22', '31x24x31x22'))
+# Games without moves from setups that are not positions: a reversed range, and a side without pieces
+BROKEN_SETUPS = ('B:W32-21:B1-12', 'B:W21-32:B')
+
+
+def random_game(rng, max_plies=120):
+    """
+    Plays random legal moves from the start position.
+
+    Returns:
+        tuple: The move texts and the PDN result.
+    """
+    position, color, texts = BitBoard.from_board(Board(rules=FORCED_CAPTURE)), YELLOW, []
+    while len(texts) < max_plies:
+        moves = position.get_all_moves(color)
+        if not moves:
+            return texts, '0-1' if color == YELLOW else '1-0'
+        move = rng.choice(moves)
+        texts.append(move_to_text(move, position))
+        position.make_move(move)
+        color = PURPLE if color == YELLOW else YELLOW
+    return texts, '1/2-1/2'
+
+
+def game_text(number, texts, result, rng):
+    """
+    Writes a game as PDN, with tags, move numbers and an occasional comment or variation.
+    """
+    lines = [f'[Event "Random game {number}"]', '[GameType "21"]', f'[Result "{result}"]', '']
+    words = []
+    for ply, text in enumerate(texts):
+        if ply % 2 == 0:
+            words.append(f"{ply // 2 + 1}.")
+        words.append(text)
+        if rng.random() < 0.02:
+            words.append('{a comment (with brackets) over\nseveral lines}')
+        elif rng.random() < 0.01:
+            words.append('(1-5 32-28)')
+    words.append(result)
+    for start in range(0, len(words), 12):
+        lines.append(' '.join(words[start:start + 12]))
+    return '\n'.join(lines) + '\n\n'
+
+
+def write_pdn(path, games, seed):
+    """
+    Writes a PDN file of a number of games.
+    """
+    rng = random.Random(seed)
+    texts = [game_text(number, *random_game(rng), rng) for number in range(min(games, UNIQUE_GAMES))]
+    with open(path, 'w') as file:
+        for number in range(games):
+            file.write(texts[number % len(texts)])
+
+
+def check_known_game(directory):
+    """
+    Imports KNOWN_GAME and its broken copies, checking that only the game itself is kept.
+    """
+    path, out = os.path.join(directory, 'known.pdn'), os.path.join(directory, 'known.ckp')
+    broken = [KNOWN_GAME.replace(move, wrong) for move, wrong in BROKEN_MOVES]
+    broken += [f'[FEN "{setup}"]\n[Result "1-0"]\n\n1-0\n' for setup in BROKEN_SETUPS]
+    with open(path, 'w') as file:
+        file.write('\n'.join([KNOWN_GAME] + broken))
+    errors = []
+    games, written, positions = import_pdn(path, out, FORCED_CAPTURE, processes=1, errors=errors)
+    assert (games, written, positions) == (1 + len(broken), 1, KNOWN_PLIES), f"known game imported as {errors}"
+    assert [index for index, _ in errors] == list(range(1, 1 + len(broken))), f"broken games kept: {errors}"
+    for name in (path, out):
+        os.remove(name)
+
+
+def read_rate(path):
+    """
+    Returns the games read per second, and the peak memory of the reader in bytes,
+    measured in a second pass since tracing the allocations slows the reader down.
+    """
+    rates = []
+    for traced in (False, True):
+        if traced:
+            tracemalloc.start()
+        start, games = time.perf_counter(), 0
+        with open(path) as file:
+            for _ in read_games(file):
+                games += 1
+        rates.append(games / (time.perf_counter() - start))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rates[0], peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=20000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='size of the pool to compare')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path, out = os.path.join(directory, 'games.pdn'), os.path.join(directory, 'positions.ckp')
+    check_known_game(directory)
+    print(f"known game with crowning and turning multi-jumps: imported, "
+          f"{len(BROKEN_MOVES) + len(BROKEN_SETUPS)} broken copies skipped")
+    print("reading only")
+    for games in (args.games // 10, args.games):
+        write_pdn(path, games, args.seed)
+        rate, peak = read_rate(path)
+        print(f"{games:>8} games, {os.path.getsize(path) / 1e6:>6.1f} MB: {rate:>8.0f} games/s, "
+              f"peak memory {peak / 1024:.0f} kB")
+
+    print(f"\nimport of {args.games} games: read, validate every move, write positions")
+    for processes in sorted({1, max(args.processes, 2)}):
+        start = time.perf_counter()
+        games, written, positions = import_pdn(path, out, FORCED_CAPTURE, processes)
+        elapsed = time.perf_counter() - start
+        stored = sum(len(block['game']) for block in read_positions(out))
+        assert written == games and stored == positions, 'games were skipped or positions lost'
+        print(f"{processes:>3} process{'es' if processes > 1 else '  '}: {games / elapsed:>8.0f} games/s, "
+              f"{positions / elapsed:>9.0f} positions/s, {positions} positions in "
+              f"{os.path.getsize(out) / 1e6:.1f} MB ({os.path.getsize(out) / positions:.0f} bytes each)")
+    print(f"({os.cpu_count()} CPUs available)")
+    for name in (path, out):
+        os.remove(name)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
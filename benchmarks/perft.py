@@ -0,0 +1,151 @@
+"""
+Times the table-driven move generators against the original recursive one, then counts
+perft (every line of play to a fixed depth) from the starting position with Board and
+BitBoard. That they all find the same moves is checked by tests/test_perft.py.
+
+Run from the repository root:
+    python -m benchmarks.perft --positions 3000 --depth 6
+"""
+import argparse
+import random
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import ROWS, COLS, YELLOW, PURPLE
+from benchmarks.positions import random_board
+
+
+def legacy_valid_moves(board, piece):
+    """
+    The recursive generator Board.get_valid_moves used before the move tables, kept as
+    the reference the tables are checked against.
+
+    Args:
+        board (Board): The position.
+        piece (Piece): The piece to move.
+
+    Returns:
+        dict: Maps (row, col) to the list of skipped pieces.
+    """
+    moves = {}
+    left, right, row = piece.col - 1, piece.col + 1, piece.row
+    if piece.color == PURPLE or piece.king:
+        moves.update(_legacy_traverse(board, row - 1, max(row - 3, -1), -1, piece.color, left, -1))
+        moves.update(_legacy_traverse(board, row - 1, max(row - 3, -1), -1, piece.color, right, 1))
+    if piece.color == YELLOW or piece.king:
+        moves.update(_legacy_traverse(board, row + 1, min(row + 3, ROWS), 1, piece.color, left, -1))
+        moves.update(_legacy_traverse(board, row + 1, min(row + 3, ROWS), 1, piece.color, right, 1))
+    return moves
+
+
+def _legacy_traverse(board, start, stop, step, color, col, col_step, skipped=None):
+    """
+    Helper with the body of the old _traverse_left (col_step -1) and _traverse_right (col_step 1).
+    """
+    skipped = skipped or []
+    moves = {}
+    last = []
+    for r in range(start, stop, step):
+        if not 0 <= col < COLS:
+            break
+        current = board.board[r][col]
+        if current == 0:
+            if skipped and not last:
+                break
+            elif skipped:
+                moves[(r, col)] = last + skipped
+            else:
+                moves[(r, col)] = last
+            if last:
+                row = max(r - 3, 0) if step == -1 else min(r + 3, ROWS)
+                moves.update(_legacy_traverse(board, r + step, row, step, color, col - 1, -1, last))
+                moves.update(_legacy_traverse(board, r + step, row, step, color, col + 1, 1, last))
+            break
+        elif current.color == color:
+            break
+        else:
+            last = [current]
+        col += col_step
+    return moves
+
+
+def legacy_all_moves(board, color):
+    """
+    Lists every move of one side with the legacy generator, like Board.get_all_moves.
+    """
+    return [(piece, row, col, skipped)
+            for piece in board.get_all_pieces(color)
+            for (row, col), skipped in legacy_valid_moves(board, piece).items()]
+
+
+def bench(positions, seed, repeat=5):
+    """
+    Times generating every move of both sides on random positions with each generator.
+    """
+    rng = random.Random(seed)
+    boards = [random_board(rng) for _ in range(positions)]
+    bitboards = [BitBoard.from_board(board) for board in boards]
+    timings = {}
+    for name, generate, targets in (('legacy', legacy_all_moves, boards),
+                                    ('Board', Board.get_all_moves, boards),
+                                    ('BitBoard', BitBoard.get_all_moves, bitboards)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for target in targets:
+                generate(target, YELLOW)
+                generate(target, PURPLE)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def perft(position, depth, color):
+    """
+    Counts the positions reached after every sequence of depth moves, playing the moves in place.
+
+    Args:
+        position: A Board or a BitBoard; it is restored before returning.
+        depth (int): The number of moves to play.
+        color (tuple): The side to move.
+
+    Returns:
+        int: The number of leaf positions.
+    """
+    moves = position.get_all_moves(color)
+    if depth == 1:
+        return len(moves)
+    other = YELLOW if color == PURPLE else PURPLE
+    nodes = 0
+    for move in moves:
+        undo = position.make_move(move)
+        nodes += perft(position, depth - 1, other)
+        position.unmake_move(undo)
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=3000)
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    timings = bench(args.positions, args.seed)
+    for name, seconds in timings.items():
+        print(f"{name:>9}: {seconds * 1e6 / args.positions / 2:7.1f} us per side  "
+              f"speedup {timings['legacy'] / seconds:5.1f}x")
+
+    print(f"{'depth':>5} {'perft':>12} {'Board s':>9} {'BitBoard s':>10}")
+    for depth in range(1, args.depth + 1):
+        timings = []
+        for position in (Board(), BitBoard.from_board(Board())):
+            start = time.perf_counter()
+            nodes = perft(position, depth, PURPLE)  # PURPLE moves first in the game
+            timings.append(time.perf_counter() - start)
+        print(f"{depth:>5} {nodes:>12} {timings[0]:>9.3f} {timings[1]:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Positions shared by the benchmark scripts.
+"""
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import ROWS, COLS, YELLOW, PURPLE
+from checker.notation import parse_fen
+from checker.piece import Piece
+
+
+def random_board(rng, max_pieces=10, king_chance=0.3, evaluator=None):
+    """
+    Builds a random but legal-looking Board: pieces on dark squares only, men never
+    standing on the row where they would already have been crowned.
+
+    Args:
+        rng (random.Random): The random generator to draw from.
+        max_pieces (int): The largest number of pieces per side.
+        king_chance (float): The probability that a piece is a king.
+        evaluator (Evaluator): The evaluation weights of the board.
+
+    Returns:
+        Board: The random position, with consistent counters and hash.
+    """
+    board = Board(evaluator)
+    board.board = [[0] * COLS for _ in range(ROWS)]
+    dark = [(row, col) for row in range(ROWS) for col in range(COLS) if (row + col) % 2]
+    rng.shuffle(dark)
+    yellow, purple = rng.randint(1, max_pieces), rng.randint(1, max_pieces)
+    for index, (row, col) in enumerate(dark[:yellow + purple]):
+        color = YELLOW if index < yellow else PURPLE
+        piece = Piece(row, col, color)
+        crowned = (color == YELLOW and row == ROWS - 1) or (color == PURPLE and row == 0)
+        if crowned or rng.random() < king_chance:
+            piece.make_king()
+        board.board[row][col] = piece
+    board.refresh()  # Counters, hash and evaluation terms of the new pieces
+    return board
+
+
+# Fixed positions for the benchmark suite, as FEN text (see checker.notation); taken from
+# self-play games at depth 3, with the side to move first.
+POSITIONS = {
+    'start': 'W:W21-32:B1-12',
+    'midgame-1': 'W:W18,19,22,23,24,25,29,30,31,32:B1,2,3,4,5,10,11,12,13,15,20,21',
+    'midgame-2': 'W:W13,18,19,21,22,23,24,26,27,28,29,32:B1,2,3,4,5,10,11,12,14,15,16',
+    'midgame-3': 'W:WK9,19,21,22,23,29,30,31,32:B2,4,7,10,12,13,15,16,18,27',
+    'endgame-1': 'W:WK7,K10,15,18,19,29:B1,3,4,12,20,K21,K23,K31,K32',
+    'endgame-2': 'W:WK3,7,14,K17,29,30:B4,19,K23,K31',
+    'endgame-3': 'W:WK14,K22,30:BK5,K9',
+}
+
+
+def fen_position(fen, evaluator=None):
+    """
+    Builds a BitBoard from FEN text.
+
+    Args:
+        fen (str): The position, e.g. a value of POSITIONS.
+        evaluator (Evaluator): The evaluation weights of the position.
+
+    Returns:
+        tuple: (BitBoard, side to move).
+    """
+    yellow, purple, kings, color = parse_fen(fen)
+    return BitBoard(yellow, purple, kings, evaluator=evaluator), color
@@ -0,0 +1,111 @@
+"""
+Measures the frame time and CPU usage of drawing the game window: repainting the whole
+board and flipping the whole screen every frame, against BoardRenderer, which copies the
+empty checkerboard from a cached surface and repaints and pushes only the changed squares.
+
+Frames are timed on an idle board (nothing changed since the last frame) and on frames
+right after a move with a piece selected. The CPU usage is that of the main loop running
+at the game's frame rate on an idle board for a few seconds. Needs pygame; without a
+display, run with SDL_VIDEODRIVER=dummy, where pushing to the screen costs less than on a
+real one, so the measured savings are a lower bound.
+
+Run from the repository root:
+    SDL_VIDEODRIVER=dummy python -m benchmarks.render --frames 600 --seconds 5
+"""
+import argparse
+import time
+
+import pygame
+
+from checker import render
+from checker.board import Board
+from checker.constants import WIDTH, HEIGHT, PURPLE
+
+FPS = 60  # Frame rate of main.py
+
+
+def full_frame(win, board, valid_moves):
+    """
+    Draws a frame the way Game.update did before BoardRenderer: everything, every frame.
+    """
+    render.draw_board(win, board)
+    render.draw_valid_moves(win, valid_moves)
+    render.update_display()
+
+
+def renderer_frame(renderer):
+    """
+    Returns a function that draws a frame the way Game.update does now.
+    """
+    def frame(win, board, valid_moves):
+        render.update_display(renderer.draw(win, board, valid_moves))
+    return frame
+
+
+def frame_times(win, frame, frames, moving):
+    """
+    Draws frames and returns the time of each, in milliseconds.
+
+    Args:
+        frame: full_frame or a renderer_frame.
+        frames (int): The number of frames.
+        moving (bool): Whether a piece is selected or moved before every frame; an idle
+            board otherwise.
+    """
+    board, times = Board(), []
+    pieces = [piece for piece in board.get_all_pieces(PURPLE) if board.get_valid_moves(piece)]
+    for index in range(frames):
+        valid_moves = {}
+        if moving:
+            # Select a piece, or move the selected one to and fro, on alternate frames
+            piece = pieces[index // 2 % len(pieces)]
+            valid_moves = board.get_valid_moves(piece)
+            if index % 2:
+                row, col = piece.row, piece.col
+                target = next(iter(valid_moves))
+                board.move(piece, *target)
+                valid_moves = {}
+                frame(win, board, valid_moves)
+                board.move(piece, row, col)
+        start = time.perf_counter()
+        frame(win, board, valid_moves)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def cpu_usage(win, frame, seconds):
+    """
+    Runs an idle frame loop at FPS and returns the share of one CPU it used.
+    """
+    board, clock = Board(), pygame.time.Clock()
+    wall, cpu = time.perf_counter(), time.process_time()
+    while time.perf_counter() - wall < seconds:
+        clock.tick(FPS)
+        pygame.event.pump()
+        frame(win, board, {})
+    return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--seconds', type=float, default=5, help='length of each CPU usage run')
+    args = parser.parse_args()
+
+    pygame.display.init()
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    modes = (('full repaint', lambda: full_frame), ('dirty squares', lambda: renderer_frame(render.BoardRenderer())))
+    print(f"{args.frames} frames each, video driver {pygame.display.get_driver()}")
+    print(f"{'mode':>14} {'board':>7} {'mean ms':>8} {'max ms':>7}")
+    for name, make in modes:
+        for moving in (False, True):
+            times = frame_times(win, make(), args.frames, moving)[1:]  # The first frame always paints it all
+            print(f"{name:>14} {'moving' if moving else 'idle':>7} {sum(times) / len(times):>8.3f} {max(times):>7.3f}")
+    print(f"\nidle board at {FPS} FPS for {args.seconds:g} s, share of one CPU used")
+    for name, make in modes:
+        print(f"{name:>14} {cpu_usage(win, make(), args.seconds):>7.1%}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
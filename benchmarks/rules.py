@@ -0,0 +1,130 @@
+"""
+Compares the casual rules with the forced-capture rules: the cost of generating the legal
+moves, and the positions a fixed-depth search visits under each.
+
+With forced captures a position with a capture only has capture moves, so the search
+branches far less there. The generator tests every piece for a capture with a few
+whole-board shifts first, so quiet positions only pay that test on top of the plain steps.
+
+Before timing anything, the forced-capture generator is checked against positions whose
+complete captures are known, as in English draughts.
+
+Run from the repository root:
+    python -m benchmarks.rules --depth 6 --positions 40
+"""
+import argparse
+import random
+import time
+
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW, PURPLE
+from checker.notation import parse_fen, move_to_text, square_name
+from checker.rules import CASUAL, FORCED_CAPTURE
+from minimax.algorithm import NodeCounter, search_position
+from minimax.stats import SearchStats
+from minimax.transposition import TranspositionTable
+from benchmarks.positions import POSITIONS, fen_position, random_board
+from benchmarks.quiescence import capture_positions
+
+
+# Positions (FEN) and every legal move in them under forced captures, as (move, captured squares)
+KNOWN_CAPTURES = {
+    'W:W18:B14,6,30': {('18x2', (6, 14))},  # A man's double jump that ends on the crown row
+    'W:WK18:B15,16': {('18x20', (15, 16))},  # A king turning back down partway through a capture
+    'W:WK18:B15,16,23,24': {('18x18', (15, 16, 23, 24))},  # A king jumping round back to its own square
+    'B:B14:W18,26,27': {('14x30', (18, 26)), ('14x32', (18, 27))},  # Two ways on for a YELLOW man
+}
+
+
+def check_captures():
+    """
+    Checks the forced-capture moves of the positions of KNOWN_CAPTURES.
+    """
+    for fen, expected in KNOWN_CAPTURES.items():
+        yellow, purple, kings, color = parse_fen(fen)
+        moves = BitBoard(yellow, purple, kings, rules=FORCED_CAPTURE).get_all_moves(color)
+        found = {(move_to_text(move), tuple(int(square_name(square)) for square in range(32) if move[2] >> square & 1))
+                 for move in moves}
+        assert found == expected and len(found) == len(moves), f"forced captures of {fen}: {found} != {expected}"
+
+
+def with_rules(position, rules):
+    """
+    Returns a copy of a position played under other rules.
+    """
+    return BitBoard(position.yellow, position.purple, position.kings, position.zobrist, position.evaluator,
+                    position.psq, rules)
+
+
+def generation_time(positions, repeat=5):
+    """
+    Returns the fastest time of generating the moves of both sides of every position, in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for position in positions:
+            position.get_all_moves(YELLOW)
+            position.get_all_moves(PURPLE)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def search_counts(positions, depth):
+    """
+    Searches every position to a fixed depth.
+
+    Args:
+        positions (list): (BitBoard, max_player) pairs.
+        depth (int): The search depth.
+
+    Returns:
+        tuple: Total nodes, seconds and average number of moves per generated position.
+    """
+    nodes, seconds, generations, moves = 0, 0.0, 0, 0
+    for position, max_player in positions:
+        counter, tt, stats = NodeCounter(), TranspositionTable(), SearchStats()  # Allocation is not timed
+        start = time.perf_counter()
+        search_position(position, depth, max_player, float('-inf'), float('inf'), counter, tt, stats=stats)
+        seconds += time.perf_counter() - start
+        nodes += counter.nodes
+        generations += stats.generations
+        moves += stats.moves_generated
+    return nodes, seconds, moves / generations if generations else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--positions', type=int, default=40, help='positions with a capture for the side to move')
+    parser.add_argument('--random', type=int, default=2000, help='random positions for the move generation timing')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    check_captures()
+    print(f"forced captures of {len(KNOWN_CAPTURES)} known positions: ok")
+    rng = random.Random(args.seed)
+    boards = [BitBoard.from_board(random_board(rng)) for _ in range(args.random)]
+    quiet = [board for board in boards
+             if not any(move[2] for color in (YELLOW, PURPLE) for move in board.get_all_moves(color))]
+    print(f"move generation, both sides, {len(boards)} random positions ({len(quiet)} without any capture)")
+    for name, group in (('all', boards), ('quiet', quiet)):
+        casual = generation_time([with_rules(board, CASUAL) for board in group]) / (2 * len(group)) * 1e6
+        forced = generation_time([with_rules(board, FORCED_CAPTURE) for board in group]) / (2 * len(group)) * 1e6
+        print(f"{name:>8}: casual {casual:.2f} us, forced {forced:.2f} us per call ({forced / casual - 1:+.0%})")
+
+    sets = {
+        'suite': [(position, color == YELLOW) for position, color in map(fen_position, POSITIONS.values())],
+        'captures': capture_positions(args.positions, args.seed),
+    }
+    print(f"\nsearch to depth {args.depth}, no quiescence")
+    print(f"{'positions':>10} {'rules':>7} {'nodes':>10} {'seconds':>8} {'moves/node':>10}")
+    for name, positions in sets.items():
+        for rules in (CASUAL, FORCED_CAPTURE):
+            nodes, seconds, branching = search_counts(
+                [(with_rules(position, rules), max_player) for position, max_player in positions], args.depth)
+            print(f"{name:>10} {rules.name:>7} {nodes:>10} {seconds:>8.2f} {branching:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
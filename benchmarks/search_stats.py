@@ -0,0 +1,169 @@
+"""
+Measures what the statistics hooks of search_position cost: with statistics disabled against
+a copy of the search without any hook, and with a SearchStats collecting everything.
+Optionally writes the statistics of one search as JSON, a flamegraph trace and a cProfile profile.
+
+Run from the repository root:
+    python -m benchmarks.search_stats --repeat 7
+    python -m benchmarks.search_stats --json stats.json --collapsed search.folded --profile search.prof
+"""
+import argparse
+import time
+
+from checker.zobrist import SIDE_KEY
+from minimax.algorithm import (NodeCounter, search_position, order_moves, store_result,
+                               SearchTimeout, EXACT, LOWER, NO_MOVE, YELLOW, PURPLE)
+from minimax.search import search
+from minimax.stats import SearchStats, profile
+from minimax.transposition import TranspositionTable
+from benchmarks.positions import POSITIONS, fen_position
+
+DEPTH = 7
+
+
+def plain_search_position(position, depth, max_player, alpha, beta, counter=None, tt=None, ply=0, deadline=None,
+                          tablebase=None):
+    """
+    search_position as it was before the statistics hooks, kept as the reference the
+    disabled hooks are timed against.
+    """
+    if counter is not None:
+        counter.nodes += 1  # Count this position as visited
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+
+    # Few pieces left: the tablebase knows the exact result (the root still searches, to return a move)
+    if tablebase is not None and ply > 0:
+        score = tablebase.probe(position, max_player)
+        if score is not None:
+            return score, None
+
+    # Base case: check if depth is 0 or if the game is over
+    if depth == 0 or position.winner() is not None:
+        return position.evaluate(), None  # Return the board evaluation
+
+    tt_move = NO_MOVE  # Best move found by an earlier search of this position, tried first
+    original_alpha, original_beta = alpha, beta
+    if tt is not None:
+        key = position.zobrist ^ SIDE_KEY if max_player else position.zobrist
+        entry = tt.probe(key)
+        if entry is not None:
+            stored_depth, bound, score, tt_move = entry
+            if ply > 0 and stored_depth >= depth:  # Deep enough to reuse the stored score
+                if bound == EXACT:
+                    return score, None
+                elif bound == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score, None
+
+    # Maximizing player's logic (AI player)
+    if max_player:
+        maxEval = float('-inf')  # Initialize maximum evaluation
+        best_move = None  # Placeholder for the best move
+        for move in order_moves(position, position.get_all_moves(YELLOW), tt_move):  # Best-looking moves first
+            undo = position.make_move(move)  # Play the move on the board itself
+            try:
+                # Recursively call the search for the next depth with the minimizing player's turn
+                evaluation = plain_search_position(position, depth - 1, False, alpha, beta, counter, tt, ply + 1,
+                                                   deadline, tablebase)[0]
+            finally:
+                position.unmake_move(undo)  # Take the move back, even when the search is interrupted
+            if evaluation > maxEval or best_move is None:
+                maxEval = evaluation  # Keep the first move reaching the best evaluation
+                best_move = move
+            alpha = max(alpha, maxEval)  # Raise the lower bound
+            if alpha >= beta:
+                break  # The minimizing player will never allow this line, so stop searching it
+
+        store_result(tt, position, max_player, depth, maxEval, best_move, original_alpha, original_beta)
+        return maxEval, best_move  # Return the maximum evaluation and the corresponding move
+    else:  # Minimizing player's logic (Human player)
+        minEval = float('inf')  # Initialize minimum evaluation
+        best_move = None  # Placeholder for the best move
+        for move in order_moves(position, position.get_all_moves(PURPLE), tt_move):  # Best-looking moves first
+            undo = position.make_move(move)  # Play the move on the board itself
+            try:
+                # Recursively call the search for the next depth with the maximizing player's turn
+                evaluation = plain_search_position(position, depth - 1, True, alpha, beta, counter, tt, ply + 1,
+                                                   deadline, tablebase)[0]
+            finally:
+                position.unmake_move(undo)  # Take the move back, even when the search is interrupted
+            if evaluation < minEval or best_move is None:
+                minEval = evaluation  # Keep the first move reaching the best evaluation
+                best_move = move
+            beta = min(beta, minEval)  # Lower the upper bound
+            if alpha >= beta:
+                break  # The maximizing player will never allow this line, so stop searching it
+
+        store_result(tt, position, max_player, depth, minEval, best_move, original_alpha, original_beta)
+        return minEval, best_move  # Return the minimum evaluation and the corresponding move
+
+
+def time_search(function, position, max_player, **extra):
+    """
+    Returns the time of one search of a position to DEPTH, and its node count.
+    """
+    counter = NodeCounter()
+    start = time.perf_counter()
+    function(position, DEPTH, max_player, float('-inf'), float('inf'), counter, TranspositionTable(), **extra)
+    return time.perf_counter() - start, counter.nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='write the statistics of a timed search of the start position')
+    parser.add_argument('--collapsed', help='write the flamegraph trace (collapsed stacks) of that search')
+    parser.add_argument('--profile', help='write a cProfile profile of that search')
+    parser.add_argument('--time-ms', type=float, default=2000)
+    args = parser.parse_args()
+
+    positions = []
+    for fen in POSITIONS.values():
+        position, color = fen_position(fen)
+        positions.append((position, color == YELLOW))
+    variants = (('no hooks', plain_search_position, False),
+                ('stats=None', search_position, False),
+                ('SearchStats', search_position, True))
+    # The variants take turns on every position, and the fastest of the repeats of each
+    # position counts, so that drifts in machine load hit the variants alike
+    totals = {name: [0.0, 0] for name, _, _ in variants}
+    for position, max_player in positions:
+        best = {name: float('inf') for name, _, _ in variants}
+        for _ in range(args.repeat):
+            for name, function, collect in variants:
+                extra = {'stats': SearchStats()} if collect else {}
+                seconds, nodes = time_search(function, position, max_player, **extra)
+                best[name] = min(best[name], seconds)
+        for name in best:
+            totals[name][0] += best[name]
+            totals[name][1] += nodes
+    reference = totals['no hooks'][0]
+    print(f"depth {DEPTH} from {len(positions)} positions, fastest of {args.repeat} per position")
+    for name, (seconds, nodes) in totals.items():
+        print(f"{name:>12}: {seconds:.3f}s  {nodes} nodes  {seconds / reference - 1:+.1%}")
+
+    if args.json or args.collapsed or args.profile:
+        position, color = fen_position(POSITIONS['start'])
+        stats = SearchStats(trace_depth=4 if args.collapsed else 0)
+        if args.profile:
+            result = profile(search, args.profile, position, time_ms=args.time_ms, max_player=color == YELLOW,
+                             stats=stats)
+            print(f"Profile written to {args.profile}")
+        else:
+            result = search(position, time_ms=args.time_ms, max_player=color == YELLOW, stats=stats)
+        print(f"Search to depth {result.depth}: {stats.nodes} nodes, branching factor {stats.branching_factor:.2f}, "
+              f"{stats.first_move_cutoffs}/{stats.cutoffs} cutoffs on the first move, pv {' '.join(stats.pv)}")
+        if args.json:
+            stats.to_json(args.json)
+            print(f"Statistics written to {args.json}")
+        if args.collapsed:
+            stats.write_collapsed(args.collapsed)
+            print(f"Trace written to {args.collapsed}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Load-tests the game server (server.py): many sessions play random legal moves at once,
+and the move latency (p50/p99), the moves answered per second, the median search depth
+and how evenly the sessions were served are reported for each number of concurrent sessions.
+
+The latency of a move runs from sending it to receiving the AI's reply. Sessions turned
+away while the server is saturated connect again after the delay it suggests; "busy"
+counts those refusals. A server is started for the test unless --port names a running one.
+
+Run from the repository root:
+    python -m benchmarks.server_load --sessions 100 300 1000 --seconds 20 --time-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which a fraction of the sorted values lie.
+    """
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+async def request(reader, writer, message):
+    """
+    Sends one request and returns the reply.
+    """
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError('the server closed the session')
+    return json.loads(line)
+
+
+async def play(host, port, end, rng, latencies, stats):
+    """
+    Plays random moves in one session until the end time, starting new games as they finish.
+
+    Returns:
+        int: The moves the session had answered.
+    """
+    while True:
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        state = json.loads(await reader.readline())
+        if state.get('error') != 'busy':
+            break
+        writer.close()
+        stats['busy'] += 1
+        if time.perf_counter() > end:
+            return 0
+        await asyncio.sleep(state['retry_ms'] / 1000 * (0.5 + rng.random()))  # Spread the reconnections
+    moves = 0
+    try:
+        while time.perf_counter() < end:
+            if state['result'] is not None:
+                state = await request(reader, writer, {'new': True})
+                stats['games'] += 1
+                continue
+            move, sent = rng.choice(state['moves']), time.perf_counter()
+            reply = await request(reader, writer, {'move': move})
+            if 'error' in reply:
+                raise RuntimeError(f"move {move} refused: {reply['error']}")
+            latencies.append(time.perf_counter() - sent)
+            stats['queued_ms'].append(reply.get('queued_ms', 0.0))
+            stats['depth'].append(reply.get('depth', 0))
+            state, moves = reply, moves + 1
+    finally:
+        writer.close()
+    return moves
+
+
+async def load(host, port, sessions, seconds, seed):
+    """
+    Runs a number of sessions at once for a while.
+
+    Returns:
+        tuple: The latencies of the answered moves in seconds, the moves answered by each
+        session, the statistics of the run, and its length in seconds.
+    """
+    latencies, stats = [], {'busy': 0, 'games': 0, 'queued_ms': [], 'depth': []}
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(play(host, port, start + seconds, random.Random(seed * 100003 + session),
+                                         latencies, stats) for session in range(sessions)))
+    return latencies, counts, stats, time.perf_counter() - start
+
+
+def start_server(args):
+    """
+    Starts server.py on a free port and returns the process and the port.
+    """
+    command = [sys.executable, 'server.py', '--port', '0', '--time-ms', str(args.time_ms),
+               '--max-sessions', str(max(args.sessions) + 1), '--max-queued', str(args.max_queued)]
+    if args.processes:
+        command += ['--processes', str(args.processes)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()  # "listening on host:port ..."
+    if not line.startswith('listening on'):
+        server.kill()
+        raise RuntimeError(f"the server did not start: {line!r}")
+    print(line.strip())
+    return server, int(line.split()[2].rsplit(':', 1)[1])
+
+
+def stop_server(server, timeout=10):
+    """
+    Stops a server started by start_server as Ctrl+C does, so it stops its search processes
+    too, and kills it if it has not exited after a timeout.
+    """
+    server.send_signal(signal.SIGINT)
+    try:
+        server.wait(timeout)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[100, 300, 1000], help='concurrent sessions')
+    parser.add_argument('--seconds', type=float, default=20, help='length of each run')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='a running server; one is started when not given')
+    parser.add_argument('--time-ms', type=float, default=50, help='time budget per AI move of the started server')
+    parser.add_argument('--processes', type=int, help='search processes of the started server')
+    parser.add_argument('--max-queued', type=int, default=256, help='waiting searches of the started server')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server, port = start_server(args) if args.port is None else (None, args.port)
+    try:
+        print(f"{'sessions':>8} {'moves':>7} {'moves/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'queued p50':>10} {'depth':>5} "
+              f"{'per session min/med/max':>23} {'busy':>6} {'games':>6}")
+        for sessions in args.sessions:
+            latencies, counts, stats, elapsed = asyncio.run(load(args.host, port, sessions, args.seconds, args.seed))
+            latencies.sort()
+            counts.sort()
+            queued, depths = sorted(stats['queued_ms']), sorted(stats['depth'])
+            spread = f"{counts[0]}/{percentile(counts, 0.5)}/{counts[-1]}"
+            print(f"{sessions:>8} {len(latencies):>7} {len(latencies) / elapsed:>8.1f} "
+                  f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+                  f"{percentile(queued, 0.5):>10.1f} {percentile(depths, 0.5):>5} {spread:>23} {stats['busy']:>6} {stats['games']:>6}")
+    finally:
+        if server is not None:
+            stop_server(server)
+    print(f"({os.cpu_count()} CPUs available)")
+
+
+if __name__ == '__main__':
+    main()
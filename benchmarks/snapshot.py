@@ -0,0 +1,74 @@
+"""
+Measures the memory of a Board snapshot (a deep copy, as the search makes for every child
+on the Piece-object path) and the time of the move generation calls that use Piece objects.
+
+Run from the repository root:
+    python -m benchmarks.snapshot --positions 300
+"""
+import argparse
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+from checker.board import Board
+from checker.constants import YELLOW, PURPLE
+from minimax.algorithm import get_all_moves
+from benchmarks.positions import random_board
+
+
+def snapshot_bytes(board, copies=200):
+    """
+    Returns the memory allocated per deep copy of a board, averaged over many live copies.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [deepcopy(board) for _ in range(copies)]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return allocated / copies
+
+
+def best_time(function, repeat=5):
+    """
+    Returns the fastest of several runs of a function, in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    board = Board()
+    piece = board.get_all_pieces(YELLOW)[0]
+    size = sys.getsizeof(piece) + (sys.getsizeof(piece.__dict__) if hasattr(piece, '__dict__') else 0)
+    print(f"Piece: {size} bytes")
+    print(f"Board snapshot (start position): {snapshot_bytes(board):.0f} bytes allocated, "
+          f"{len(pickle.dumps(board))} bytes pickled")
+
+    rng = random.Random(args.seed)
+    boards = [random_board(rng) for _ in range(args.positions)]
+    calls = 2 * len(boards)
+    timings = {
+        'deepcopy': (lambda: [deepcopy(b) for b in boards], len(boards)),
+        'Board.get_all_moves': (lambda: [b.get_all_moves(c) for b in boards for c in (YELLOW, PURPLE)], calls),
+        'get_all_moves (deepcopy)': (lambda: [get_all_moves(b, c, None) for b in boards for c in (YELLOW, PURPLE)],
+                                     calls),
+    }
+    for name, (function, count) in timings.items():
+        print(f"{name:>25}: {best_time(function) / count * 1e6:8.1f} us per call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Runs the benchmark suite (perft node counts, fixed-depth minimax timings and
+microbenchmarks), writes the results to a JSON file and compares them with a stored baseline.
+
+Run from the repository root:
+    python -m benchmarks.suite                          # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --threshold 0.1          # fail on 10% slowdowns (default 25%)
+    python -m benchmarks.suite --save-baseline          # record the current results as the baseline
+
+The exit status is 1 when a timing got slower than the threshold allows or a perft count changed.
+Timings only compare meaningfully on the machine that recorded the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from copy import deepcopy
+
+from checker.constants import YELLOW, PURPLE
+from minimax.algorithm import NodeCounter, minimax
+from minimax.transposition import TranspositionTable
+from benchmarks.perft import perft
+from benchmarks.positions import POSITIONS, fen_position
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Depths of the perft and minimax runs for every position
+PERFT_DEPTHS = {'start': 6}
+PERFT_DEFAULT_DEPTH = 5
+MINIMAX_DEPTHS = {'start': 8}
+MINIMAX_DEFAULT_DEPTH = 7
+BOARD_MINIMAX_DEPTH = 5  # The Board (Piece objects) engine is only timed from the start position
+
+
+def best_time(function, repeat):
+    """
+    Runs a function several times and returns the fastest run, which is the least disturbed by other load.
+
+    Args:
+        function (callable): The code to time.
+        repeat (int): The number of runs.
+
+    Returns:
+        tuple: (fastest time in seconds, value returned by the last run).
+    """
+    best, value = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def run_perft(repeat):
+    """
+    Counts perft from every position.
+    """
+    results = {}
+    for name, fen in POSITIONS.items():
+        position, color = fen_position(fen)
+        depth = PERFT_DEPTHS.get(name, PERFT_DEFAULT_DEPTH)
+        seconds, nodes = best_time(lambda: perft(position, depth, color), repeat)
+        results[f'perft/{name}/{depth}'] = {'seconds': seconds, 'nodes': nodes}
+    return results
+
+
+def run_minimax(repeat):
+    """
+    Times minimax at a fixed depth from every position, with a fresh transposition table per run.
+    """
+    results = {}
+    for name, fen in POSITIONS.items():
+        position, color = fen_position(fen)
+        depth = MINIMAX_DEPTHS.get(name, MINIMAX_DEFAULT_DEPTH)
+
+        def search():
+            counter = NodeCounter()
+            minimax(position, depth, color == YELLOW, None, counter=counter, tt=TranspositionTable())
+            return counter.nodes
+
+        seconds, nodes = best_time(search, repeat)
+        results[f'minimax/{name}/{depth}'] = {'seconds': seconds, 'nodes': nodes}
+
+    board = fen_position(POSITIONS['start'])[0].to_board()
+
+    def search_board():
+        counter = NodeCounter()
+        minimax(board, BOARD_MINIMAX_DEPTH, False, None, counter=counter)
+        return counter.nodes
+
+    seconds, nodes = best_time(search_board, repeat)
+    results[f'minimax-board/start/{BOARD_MINIMAX_DEPTH}'] = {'seconds': seconds, 'nodes': nodes}
+    return results
+
+
+def run_micro(repeat, loops):
+    """
+    Times the operations the search repeats most, reported as seconds per call.
+    """
+    positions = [fen_position(fen)[0] for fen in POSITIONS.values()]
+    boards = [position.to_board() for position in positions]
+    pieces = [(board, piece) for board in boards for color in (YELLOW, PURPLE) for piece in board.get_all_pieces(color)]
+    benchmarks = {
+        'get_valid_moves': (lambda: [board.get_valid_moves(piece) for board, piece in pieces], len(pieces)),
+        'board-get_all_moves': (lambda: [board.get_all_moves(color) for board in boards for color in (YELLOW, PURPLE)],
+                                2 * len(boards)),
+        'bitboard-get_all_moves': (lambda: [position.get_all_moves(color) for position in positions
+                                            for color in (YELLOW, PURPLE)], 2 * len(positions)),
+        'board-evaluate': (lambda: [board.evaluate() for board in boards], len(boards)),
+        'bitboard-evaluate': (lambda: [position.evaluate() for position in positions], len(positions)),
+        'board-deepcopy': (lambda: [deepcopy(board) for board in boards], len(boards)),
+        'bitboard-copy': (lambda: [position.copy() for position in positions], len(positions)),
+    }
+    results = {}
+    for name, (function, calls) in benchmarks.items():
+        def run():
+            for _ in range(loops):
+                function()
+        seconds, _ = best_time(run, repeat)
+        results[f'micro/{name}'] = {'seconds': seconds / (loops * calls)}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (dict): The benchmark results of this run.
+        baseline (dict): The stored results.
+        threshold (float): The allowed slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        tuple: (report lines, True if anything regressed).
+    """
+    lines, failed = [], False
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:<32} {result['seconds']:>12.6g}s  (not in baseline)")
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        status = 'ok'
+        if ratio > 1 + threshold:
+            status, failed = 'SLOWER', True
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        if result.get('nodes') != base.get('nodes'):
+            if name.startswith('perft/'):
+                status, failed = f"COUNT CHANGED {base.get('nodes')} -> {result.get('nodes')}", True
+            else:
+                status += f" (nodes {base.get('nodes')} -> {result.get('nodes')})"  # The search itself changed
+        lines.append(f"{name:<32} {result['seconds']:>12.6g}s  {ratio:>6.2f}x  {status}")
+    return lines, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default='benchmark-results.json', help='where to write the results')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown before failing, e.g. 0.25 for 25%%')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--loops', type=int, default=1000, help='loops of each microbenchmark per run')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    results = {}
+    results.update(run_perft(args.repeat))
+    results.update(run_minimax(args.repeat))
+    results.update(run_micro(args.repeat, args.loops))
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)['results']
+    lines, failed = compare(results, baseline, args.threshold)
+    print('\n'.join(lines))
+    if failed:
+        print(f"Regression beyond {args.threshold:.0%} against {args.baseline}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
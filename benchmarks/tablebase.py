@@ -0,0 +1,108 @@
+"""
+Measures the cost of a tablebase probe and plays few-piece endgames with and without the
+tables, to see whether the engine converts won endgames instead of shuffling pieces.
+
+Generate the tables first, then run from the repository root:
+    python -m minimax.tablebase --max-pieces 4
+    python -m benchmarks.tablebase --games 20 --time-ms 100
+"""
+import argparse
+import random
+import time
+
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW, PURPLE
+from minimax.search import search
+from minimax.tablebase import TABLEBASE_DIR, Tablebase, placements, signatures
+
+
+def random_positions(tablebase, count, seed):
+    """
+    Picks random positions covered by the tables.
+    """
+    rng = random.Random(seed)
+    every = [list(placements(counts)) for counts in signatures(tablebase.max_pieces)]
+    return [(*rng.choice(rng.choice(every)), rng.random() < 0.5) for _ in range(count)]
+
+
+def probe_cost(tablebase, positions, repeat=5):
+    """
+    Returns the fastest average time of one lookup, in microseconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for yellow, purple, kings, yellow_to_move in positions:
+            tablebase.lookup(yellow, purple, kings, yellow_to_move)
+        best = min(best, time.perf_counter() - start)
+    return best / len(positions) * 1e6
+
+
+def won_endgames(tablebase, count, seed):
+    """
+    Picks positions with two YELLOW kings against one PURPLE king that YELLOW, to move, wins.
+    """
+    rng = random.Random(seed)
+    candidates = list(placements((0, 2, 0, 1)))
+    rng.shuffle(candidates)
+    games = []
+    for yellow, purple, kings in candidates:
+        outcome, distance = tablebase.lookup(yellow, purple, kings, True)
+        if outcome > 0 and distance >= 9:  # Long enough that a shallow search does not see the end
+            games.append(BitBoard(yellow, purple, kings))
+            if len(games) == count:
+                break
+    return games
+
+
+def play_out(position, time_ms, max_plies, tablebase):
+    """
+    Lets the engine play both sides from a position.
+
+    Returns:
+        tuple: (winner or None, plies played).
+    """
+    color = YELLOW
+    for ply in range(max_plies):
+        if position.winner() is not None:
+            return position.winner(), ply
+        result = search(position, time_ms=time_ms, max_player=color == YELLOW, tablebase=tablebase)
+        if result.move is None:
+            return (PURPLE if color == YELLOW else YELLOW), ply
+        position = position.apply(result.move)
+        color = YELLOW if color == PURPLE else PURPLE
+    return position.winner(), max_plies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tables', default=TABLEBASE_DIR)
+    parser.add_argument('--probes', type=int, default=20000)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--time-ms', type=float, default=100)
+    parser.add_argument('--max-plies', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tablebase = Tablebase(args.tables)
+    if not tablebase:
+        parser.error(f"no tables in {args.tables}; generate them with python -m minimax.tablebase")
+    print(f"tables up to {tablebase.max_pieces} pieces, {len(tablebase.tables)} files")
+    positions = random_positions(tablebase, args.probes, args.seed)
+    print(f"lookup: {probe_cost(tablebase, positions):.2f} us")
+
+    games = won_endgames(tablebase, args.games, args.seed)
+    print(f"{len(games)} won positions, 2 kings against 1, YELLOW to move, {args.time_ms:.0f} ms per move")
+    for label, tables in (('without tables', None), ('with tables', tablebase)):
+        wins, plies = 0, []
+        for position in games:
+            winner, played = play_out(position, args.time_ms, args.max_plies, tables)
+            if winner == YELLOW:
+                wins += 1
+                plies.append(played)
+        average = sum(plies) / len(plies) if plies else float('nan')
+        print(f"{label:>15}: {wins}/{len(games)} won, {average:.1f} plies on average")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures the cost of detecting the end of the game: per frame in the game loop, where
+Game.winner is called 60 times a second, and per leaf in the search.
+
+Per frame, the cached Board.has_moves answer (with the draw rules' history) is compared
+with generating every move of the side to move, the naive way to find a blocked side.
+Per leaf, the shift-based has_moves test is compared with the evaluation it precedes and
+with a full move generation.
+
+Run from the repository root:
+    python -m benchmarks.termination --positions 2000
+"""
+import argparse
+import random
+import time
+
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW, PURPLE
+from checker.termination import GameHistory, game_result
+from benchmarks.positions import random_board
+
+
+def per_call_us(function, items, repeat=5):
+    """
+    Returns the fastest time of calling a function on every item, in microseconds per call.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    boards = [random_board(rng) for _ in range(args.positions)]
+    turns = [(board, rng.choice((YELLOW, PURPLE))) for board in boards]
+    histories = {id(board): GameHistory(board, color == YELLOW) for board, color in turns}
+    blocked = sum(not board.get_all_moves(color) for board, color in turns)
+    print(f"{len(boards)} random positions, {blocked} with the side to move blocked")
+
+    print("\nper frame (Board), microseconds per call")
+    naive = per_call_us(lambda item: bool(item[0].get_all_moves(item[1])), turns)
+    print(f"{'generate all moves':>28} {naive:>8.2f}")
+    for board, _ in turns:
+        board.movable = [None, None]
+    first = per_call_us(lambda item: game_result(item[0], item[1], histories[id(item[0])]), turns, repeat=1)
+    print(f"{'game_result, first frame':>28} {first:>8.2f}")
+    cached = per_call_us(lambda item: game_result(item[0], item[1], histories[id(item[0])]), turns)
+    print(f"{'game_result, later frames':>28} {cached:>8.2f} ({naive / cached:.0f}x faster than generating)")
+
+    print("\nper search leaf (BitBoard), microseconds per call")
+    positions = [(BitBoard.from_board(board), color) for board, color in turns]
+    for name, function in (('has_moves', lambda item: item[0].has_moves(item[1])),
+                           ('evaluate', lambda item: item[0].evaluate()),
+                           ('generate all moves', lambda item: item[0].get_all_moves(item[1]))):
+        print(f"{name:>28} {per_call_us(function, positions):>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
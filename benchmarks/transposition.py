@@ -0,0 +1,54 @@
+"""
+Compares the number of positions searched by minimax with and without a transposition
+table, and reports the table's hit, miss and overwrite counters.
+
+Run from the repository root:
+    python -m benchmarks.transposition --min-depth 6 --max-depth 10 --memory-mb 16
+"""
+import argparse
+import random
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from minimax.algorithm import NodeCounter, minimax
+from minimax.transposition import TranspositionTable
+from benchmarks.positions import random_board
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-depth', type=int, default=6)
+    parser.add_argument('--max-depth', type=int, default=10)
+    parser.add_argument('--memory-mb', type=float, default=16)
+    parser.add_argument('--policy', choices=('depth', 'always'), default='depth')
+    parser.add_argument('--random-seed', type=int, default=None,
+                        help='search a random position instead of the start position')
+    args = parser.parse_args()
+
+    board = Board() if args.random_seed is None else random_board(random.Random(args.random_seed))
+    position = BitBoard.from_board(board)
+
+    print(f"{'depth':>5} {'nodes':>10} {'with tt':>10} {'saved':>7} {'hits':>9} {'misses':>9} "
+          f"{'overwrites':>10} {'seconds':>8} {'tt secs':>8}")
+    for depth in range(args.min_depth, args.max_depth + 1):
+        plain = NodeCounter()
+        start = time.perf_counter()
+        value, _ = minimax(position, depth, True, None, counter=plain)
+        plain_time = time.perf_counter() - start
+
+        cached = NodeCounter()
+        table = TranspositionTable(args.memory_mb, args.policy)
+        start = time.perf_counter()
+        tt_value, _ = minimax(position, depth, True, None, counter=cached, tt=table)
+        tt_time = time.perf_counter() - start
+        assert tt_value == value, f"value mismatch at depth {depth}: {tt_value} != {value}"
+
+        stats = table.stats()
+        saved = 1 - cached.nodes / plain.nodes
+        print(f"{depth:>5} {plain.nodes:>10} {cached.nodes:>10} {saved:>7.0%} {stats['hits']:>9} "
+              f"{stats['misses']:>9} {stats['overwrites']:>10} {plain_time:>8.2f} {tt_time:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# Vectorized evaluation of many positions at once; needs NumPy, which the rest of the game does not
+import numpy as np
+
+from .evaluation import DEFAULT_EVALUATOR, SCALE, NEAR_CROWNING, CONES
+from .tables import SQUARES, FULL, _DOWN_3, _DOWN_4, _DOWN_5, _UP_3, _UP_4, _UP_5
+
+# Codes of the squares of an encoded board: 0 for an empty square, 1 + the piece kind otherwise
+EMPTY, YELLOW_MAN, YELLOW_KING, PURPLE_MAN, PURPLE_KING = range(5)
+
+
+def encode(positions):
+    """
+    Encodes positions as 32-square boards.
+
+    Args:
+        positions (list): Boards or BitBoards.
+
+    Returns:
+        numpy.ndarray: An (n, 32) int8 array of square codes, square 0 first.
+    """
+    masks = np.array([(p.yellow, p.purple, p.kings) for p in positions], dtype=np.uint32).reshape(-1, 3)
+    return codes_from_masks(masks[:, 0], masks[:, 1], masks[:, 2])
+
+
+def codes_from_masks(yellow, purple, kings):
+    """
+    Encodes positions given as occupancy masks as 32-square boards.
+
+    Args:
+        yellow (numpy.ndarray): The YELLOW masks, one uint32 per position.
+        purple (numpy.ndarray): The PURPLE masks.
+        kings (numpy.ndarray): The king masks.
+
+    Returns:
+        numpy.ndarray: An (n, 32) int8 array of square codes.
+    """
+    king = _bits(kings)
+    return (_bits(yellow) * (YELLOW_MAN + king) + _bits(purple) * (PURPLE_MAN + king)).astype(np.int8)
+
+
+def masks_from_codes(boards):
+    """
+    Returns the occupancy masks of encoded boards.
+
+    Args:
+        boards (numpy.ndarray): An (n, 32) array of square codes.
+
+    Returns:
+        tuple: The yellow, purple and kings masks, one uint32 array each.
+    """
+    def pack(bits):
+        return np.packbits(bits, axis=1, bitorder='little').view('<u4').ravel()
+
+    return (pack((boards == YELLOW_MAN) | (boards == YELLOW_KING)),
+            pack((boards == PURPLE_MAN) | (boards == PURPLE_KING)),
+            pack((boards == YELLOW_KING) | (boards == PURPLE_KING)))
+
+
+def _shift_down(masks):
+    """
+    Helper that returns every square one diagonal step down from a set bit, like tables.shift_down.
+    """
+    return ((masks & np.uint32(_DOWN_3)) << np.uint32(3) | (masks & np.uint32(_DOWN_4)) << np.uint32(4)
+            | (masks & np.uint32(_DOWN_5)) << np.uint32(5))
+
+
+def _shift_up(masks):
+    """
+    Helper that returns every square one diagonal step up from a set bit, like tables.shift_up.
+    """
+    return ((masks & np.uint32(_UP_3)) >> np.uint32(3) | (masks & np.uint32(_UP_4)) >> np.uint32(4)
+            | (masks & np.uint32(_UP_5)) >> np.uint32(5))
+
+
+def _bits(masks):
+    """
+    Helper that unpacks an array of masks into an (n, 32) array of bits, square 0 first.
+    """
+    return np.unpackbits(masks.astype('<u4').view(np.uint8).reshape(-1, 4), axis=1, bitorder='little')
+
+
+def _bit_count(masks):
+    """
+    Helper that counts the set bits of every mask of an array.
+    """
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0 and later
+        return np.bitwise_count(masks).astype(np.int64)
+    return _bits(masks).sum(axis=1, dtype=np.int64)
+
+
+class BatchEvaluator:
+    """
+    Scores many positions in one call with the terms and weights of an Evaluator, giving
+    exactly the scores Evaluator.evaluate gives one position at a time. Boards are encoded
+    as 32-square arrays (see encode), so models that read the squares directly, such as
+    other piece-square tables or small linear or neural models, can be evaluated the same way.
+    """
+    def __init__(self, evaluator=None):
+        """
+        Initializes the batch evaluator.
+
+        Args:
+            evaluator (Evaluator): The terms and weights to use; DEFAULT_EVALUATOR if not given.
+        """
+        self.evaluator = evaluator or DEFAULT_EVALUATOR
+        # Score of every square code on every square; empty squares score nothing
+        self.square_table = np.zeros((5, SQUARES), dtype=np.int64)
+        self.square_table[1:] = self.evaluator.square_scores
+        # Cone in front of every square, and the squares where a man may count as a runaway
+        self.cones = tuple(np.array(cones, dtype=np.uint32) for cones in CONES)
+        self.near_crowning = tuple(_bits(np.array([mask], dtype=np.uint32))[0].astype(bool)
+                                   for mask in NEAR_CROWNING)
+
+    def evaluate(self, boards):
+        """
+        Scores encoded boards.
+
+        Args:
+            boards (numpy.ndarray): An (n, 32) array of square codes, e.g. from encode.
+
+        Returns:
+            numpy.ndarray: n float64 scores, positive when YELLOW is better.
+        """
+        boards = np.asarray(boards)
+        return self.evaluate_masks(*masks_from_codes(boards), boards=boards)
+
+    def evaluate_masks(self, yellow, purple, kings, psq=None, boards=None):
+        """
+        Scores positions given as occupancy masks, e.g. collected from BitBoards during a search.
+
+        Args:
+            yellow (numpy.ndarray): The YELLOW masks, one uint32 per position.
+            purple (numpy.ndarray): The PURPLE masks.
+            kings (numpy.ndarray): The king masks.
+            psq (numpy.ndarray): The positions' running totals of the per-piece terms, if known.
+            boards (numpy.ndarray): The same positions as square codes, if already encoded.
+
+        Returns:
+            numpy.ndarray: The float64 scores.
+        """
+        evaluator = self.evaluator
+        if psq is None:
+            if boards is None:
+                boards = codes_from_masks(yellow, purple, kings)
+            psq = self.square_table[boards, np.arange(SQUARES)].sum(axis=1)
+        score = np.asarray(psq, dtype=np.int64).copy()
+        occupied = yellow | purple
+        if evaluator.mobility:
+            empty = np.uint32(FULL) & ~occupied
+            yellow_steps = (_shift_down(yellow) | _shift_up(yellow & kings)) & empty
+            purple_steps = (_shift_up(purple) | _shift_down(purple & kings)) & empty
+            score += evaluator.mobility * (_bit_count(yellow_steps) - _bit_count(purple_steps))
+        if evaluator.runaway:
+            runaways = 0
+            for side, men, sign in ((0, yellow & ~kings, 1), (1, purple & ~kings, -1)):
+                # Men near crowning whose cone towards the crowning row is empty
+                clear = (self.cones[side] & occupied[:, None]) == 0
+                runaways += sign * (_bits(men).astype(bool) & clear & self.near_crowning[side]).sum(axis=1)
+            score += evaluator.runaway * runaways
+        return score / SCALE
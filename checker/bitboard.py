@@ -0,0 +1,285 @@
+# Compact board representation used by the search
+from .constants import ROWS, COLS, YELLOW, PURPLE, YELLOW_ID
+from .piece import Piece
+from .board import Board
+from .zobrist import PIECE_KEYS
+from .evaluation import DEFAULT_EVALUATOR
+from .tables import SQUARES, ROW_OF, COL_OF, SQUARE_OF, PROMOTION, squares
+from .movegen import UP_STEPS, DOWN_STEPS, can_move
+from .rules import CASUAL
+
+# Zobrist key of every kind of piece on every square, taken from the same table Board uses
+SQUARE_KEYS = tuple(
+    tuple(PIECE_KEYS[kind][ROW_OF[square]][COL_OF[square]] for square in range(SQUARES))
+    for kind in range(4)
+)
+
+
+class BitBoard:
+    """
+    A checkers position stored in three 32-bit integers: the YELLOW pieces, the PURPLE
+    pieces and the kings of either colour. Moves are generated with the same rules as
+    Board.get_valid_moves, but producing a child position only costs a few integer operations.
+    """
+    __slots__ = ('yellow', 'purple', 'kings', 'zobrist', 'evaluator', 'psq', 'rules')
+
+    def __init__(self, yellow=0, purple=0, kings=0, zobrist=None, evaluator=None, psq=None, rules=None):
+        """
+        Initializes the position from its three masks.
+
+        Args:
+            yellow (int): Squares occupied by YELLOW pieces.
+            purple (int): Squares occupied by PURPLE pieces.
+            kings (int): Squares occupied by kings of either colour.
+            zobrist (int): The position hash, computed from the masks when not given.
+            evaluator (Evaluator): The evaluation weights; DEFAULT_EVALUATOR if not given.
+            psq (int): The evaluator's running total, computed from the masks when not given.
+            rules (Rules): The rules moves are generated with; CASUAL if not given.
+        """
+        self.yellow = yellow
+        self.purple = purple
+        self.kings = kings
+        if zobrist is None:
+            zobrist = 0
+            for kind, mask in enumerate((yellow & ~kings, yellow & kings, purple & ~kings, purple & kings)):
+                for square in squares(mask):
+                    zobrist ^= SQUARE_KEYS[kind][square]
+        self.zobrist = zobrist  # Same value as Board.zobrist for the same position
+        self.evaluator = evaluator or DEFAULT_EVALUATOR
+        if psq is None:
+            psq = self.evaluator.piece_sum(yellow, purple, kings)
+        self.psq = psq  # Per-piece evaluation terms, updated on every move like Board.psq
+        self.rules = rules or CASUAL
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Builds a BitBoard from a Board of Piece objects.
+
+        Args:
+            board (Board): The board to convert.
+
+        Returns:
+            BitBoard: The same position as three masks.
+        """
+        yellow = purple = kings = 0
+        for row in board.board:
+            for piece in row:
+                if piece != 0:
+                    bit = 1 << SQUARE_OF[(piece.row, piece.col)]
+                    if piece.side == YELLOW_ID:
+                        yellow |= bit
+                    else:
+                        purple |= bit
+                    if piece.king:
+                        kings |= bit
+        return cls(yellow, purple, kings, board.zobrist, board.evaluator, board.psq, board.rules)
+
+    def to_board(self):
+        """
+        Builds a Board of Piece objects holding this position, e.g. for the GUI.
+
+        Returns:
+            Board: A new board with the same pieces, kings and counters.
+        """
+        board = Board(self.evaluator, self.rules)
+        board.board = [[0] * COLS for _ in range(ROWS)]
+        for color, mask in ((YELLOW, self.yellow), (PURPLE, self.purple)):
+            for square in squares(mask):
+                piece = Piece(ROW_OF[square], COL_OF[square], color)
+                if self.kings >> square & 1:
+                    piece.make_king()
+                board.board[piece.row][piece.col] = piece
+        board.refresh()  # Counters, hash and evaluation terms of the new pieces
+        return board
+
+    # Counters with the same names and meaning as the ones kept by Board
+    @property
+    def white_left(self):
+        return self.yellow.bit_count()
+
+    @property
+    def red_left(self):
+        return self.purple.bit_count()
+
+    @property
+    def white_kings(self):
+        return (self.yellow & self.kings).bit_count()
+
+    @property
+    def red_kings(self):
+        return (self.purple & self.kings).bit_count()
+
+    def evaluate(self):
+        """
+        Evaluates the position exactly like Board.evaluate.
+
+        Returns:
+            float: The evaluation score of the board.
+        """
+        return self.evaluator.evaluate(self)
+
+    def winner(self):
+        """
+        Checks if there is a winner based on the number of pieces left, like Board.winner.
+
+        Returns:
+            tuple or None: The winner's color (YELLOW or PURPLE), or None if no winner yet.
+        """
+        if not self.purple:
+            return YELLOW
+        elif not self.yellow:
+            return PURPLE
+        return None
+
+    def get_valid_moves(self, square):
+        """
+        Returns the valid moves of the piece on a square, following the same rules as
+        Board.get_valid_moves (including which captures a multi-jump records).
+
+        Args:
+            square (int): The square of the piece to move.
+
+        Returns:
+            dict: Maps each landing square to the mask of captured pieces.
+        """
+        if self.yellow >> square & 1:
+            return self.rules.piece_moves(square, self.yellow, self.purple, self.kings, DOWN_STEPS)
+        return self.rules.piece_moves(square, self.purple, self.yellow, self.kings, UP_STEPS)
+
+    def get_all_moves(self, color):
+        """
+        Returns every move available to one side, in the order get_all_moves visits them on a Board.
+
+        Args:
+            color (tuple): The side to move (YELLOW or PURPLE).
+
+        Returns:
+            list: (from square, to square, captured mask) tuples.
+        """
+        if color == YELLOW:
+            return self.rules.generate(self.yellow, self.purple, self.kings, DOWN_STEPS)
+        return self.rules.generate(self.purple, self.yellow, self.kings, UP_STEPS)
+
+    def has_moves(self, color):
+        """
+        Returns whether one side has any legal move, without generating the moves.
+        The search asks this once per leaf, so unlike Board the answer is not cached.
+
+        Args:
+            color (tuple): The side to move (YELLOW or PURPLE).
+
+        Returns:
+            bool: False if the side is blocked or has no pieces left.
+        """
+        if color == YELLOW:
+            return can_move(self.yellow, self.purple, self.kings, DOWN_STEPS)
+        return can_move(self.purple, self.yellow, self.kings, UP_STEPS)
+
+    def _after(self, move):
+        """
+        Helper that computes the masks reached by making a move, handling captures and promotion.
+
+        Args:
+            move (tuple): A (from square, to square, captured mask) tuple from get_all_moves.
+
+        Returns:
+            tuple: The new (yellow, purple, kings, zobrist, psq) values.
+        """
+        start, end, captured = move
+        moved = (1 << start) | (1 << end)
+        yellow, purple, kings, zobrist, psq = self.yellow, self.purple, self.kings, self.zobrist, self.psq
+        scores = self.evaluator.square_scores
+        if yellow >> start & 1:
+            yellow ^= moved
+            purple &= ~captured
+            kind, enemy = 0, 2
+        else:
+            purple ^= moved
+            yellow &= ~captured
+            kind, enemy = 2, 0
+        for square in squares(captured):
+            taken = enemy + (kings >> square & 1)
+            zobrist ^= SQUARE_KEYS[taken][square]
+            psq -= scores[taken][square]
+        kings &= ~captured
+        if kings >> start & 1:
+            kings ^= moved
+            kind += 1
+            zobrist ^= SQUARE_KEYS[kind][start] ^ SQUARE_KEYS[kind][end]
+            psq += scores[kind][end] - scores[kind][start]
+        else:
+            zobrist ^= SQUARE_KEYS[kind][start]
+            psq -= scores[kind][start]
+            if PROMOTION >> end & 1:
+                kings |= 1 << end  # Crowned on reaching the first or last row
+                kind += 1
+            zobrist ^= SQUARE_KEYS[kind][end]
+            psq += scores[kind][end]
+        return yellow, purple, kings, zobrist, psq
+
+    def apply(self, move):
+        """
+        Returns the position reached by making a move.
+
+        Args:
+            move (tuple): A (from square, to square, captured mask) tuple from get_all_moves.
+
+        Returns:
+            BitBoard: The new position; this one is left unchanged.
+        """
+        yellow, purple, kings, zobrist, psq = self._after(move)
+        return BitBoard(yellow, purple, kings, zobrist, self.evaluator, psq, self.rules)
+
+    def make_move(self, move):
+        """
+        Plays a move in place, like Board.make_move.
+
+        Args:
+            move (tuple): A (from square, to square, captured mask) tuple from get_all_moves.
+
+        Returns:
+            tuple: The undo record, i.e. the masks, hash and evaluation total before the move.
+        """
+        undo = (self.yellow, self.purple, self.kings, self.zobrist, self.psq)
+        self.yellow, self.purple, self.kings, self.zobrist, self.psq = self._after(move)
+        return undo
+
+    def unmake_move(self, undo):
+        """
+        Takes back a move played with make_move.
+
+        Args:
+            undo (tuple): The undo record returned by make_move.
+        """
+        self.yellow, self.purple, self.kings, self.zobrist, self.psq = undo
+
+    def children(self, color):
+        """
+        Returns the positions reachable by one move of the given side.
+
+        Args:
+            color (tuple): The side to move (YELLOW or PURPLE).
+
+        Returns:
+            list: The child positions, in move generation order.
+        """
+        return [self.apply(move) for move in self.get_all_moves(color)]
+
+    def copy(self):
+        """
+        Returns an independent copy of the position.
+
+        Returns:
+            BitBoard: The copy; making moves on it leaves this position unchanged.
+        """
+        return BitBoard(self.yellow, self.purple, self.kings, self.zobrist, self.evaluator, self.psq, self.rules)
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and (self.yellow, self.purple, self.kings) == (other.yellow, other.purple, other.kings)
+
+    def __hash__(self):
+        return hash((self.yellow, self.purple, self.kings))
+
+    def __repr__(self):
+        return f"BitBoard(yellow={self.yellow:#010x}, purple={self.purple:#010x}, kings={self.kings:#010x})"
@@ -1,31 +1,70 @@
-import pygame
-from .constants import WHITE, ROWS, PINK, SQUARE_SIZE, COLS, YELLOW, PURPLE
+from .constants import ROWS, COLS, YELLOW, PURPLE, YELLOW_ID, PURPLE_ID, COLOR_IDS
 from .piece import Piece
+from .zobrist import piece_key
+from .tables import SQUARE_OF, ROW_OF, COL_OF
+from .movegen import UP_STEPS, DOWN_STEPS, can_move
+from .evaluation import DEFAULT_EVALUATOR
+from .rules import CASUAL
 
 class Board:
     """
     The Board class represents the checkers game board and contains methods
     to manage the state of the board, move pieces, calculate valid moves, and more.
     """
-    def __init__(self):
+    def __init__(self, evaluator=None, rules=None):
         """
         Initializes the board by creating a 2D list of pieces and sets up the
         number of pieces left for both players. Calls create_board to set up the board.
+
+        Args:
+            evaluator (Evaluator): The evaluation weights to use; DEFAULT_EVALUATOR if not given.
+            rules (Rules): The rules moves are generated with; CASUAL if not given.
         """
         self.board = []  # 2D list to store the pieces on the board
         self.red_left = self.white_left = 12  # Each player starts with 12 pieces
         self.red_kings = self.white_kings = 0  # Tracks the number of kings for each player
+        self.evaluator = evaluator or DEFAULT_EVALUATOR  # Scores positions for the AI
+        self.rules = rules or CASUAL  # Decides which moves are legal
         self.create_board()  # Initializes the board with pieces
+        self.refresh()  # Computes the hash, occupancy masks and evaluation total
+
+    def refresh(self):
+        """
+        Recomputes everything derived from the pieces on the board: the piece and king
+        counters, the Zobrist hash, the occupancy masks and the running evaluation total.
+        move and remove keep these up to date, so this is only needed after the
+        board has been filled by hand.
+        """
+        self.red_left = self.white_left = self.red_kings = self.white_kings = 0
+        self.zobrist = 0  # Position hash
+        self.yellow = self.purple = self.kings = 0  # Occupied squares, one bit per dark square
+        for row in self.board:
+            for piece in row:
+                if piece != 0:
+                    bit = 1 << SQUARE_OF[(piece.row, piece.col)]
+                    if piece.side == YELLOW_ID:
+                        self.white_left += 1
+                        self.white_kings += piece.king
+                        self.yellow |= bit
+                    else:
+                        self.red_left += 1
+                        self.red_kings += piece.king
+                        self.purple |= bit
+                    if piece.king:
+                        self.kings |= bit
+                    self.zobrist ^= piece_key(piece)
+        self.psq = self.evaluator.piece_sum(self.yellow, self.purple, self.kings)  # Per-piece evaluation terms
+        self.movable = [None, None]  # Whether each side (by ID) has a legal move; None until asked
 
     def evaluate(self):
         """
-        Evaluates the current state of the board for AI. It calculates a score
-        based on the number of pieces left and the number of kings.
+        Evaluates the current state of the board for AI. It calculates a weighted score
+        from the number of pieces and kings left and the positional terms of the evaluator.
 
         Returns:
             float: The evaluation score of the board.
         """
-        return self.white_left - self.red_left + (self.white_kings * 0.5 - self.red_kings * 0.5)
+        return self.evaluator.evaluate(self)
 
     def get_all_pieces(self, color):
         """
@@ -37,10 +76,11 @@ class Board:
         Returns:
             list: A list of pieces of the given color.
         """
+        side = COLOR_IDS[color]  # Pieces store the integer ID of their color
         pieces = []
         for row in self.board:  # Iterate through each row of the board
             for piece in row:  # Iterate through each column in the row
-                if piece != 0 and piece.color == color:  # Check if the piece matches the color
+                if piece != 0 and piece.side == side:  # Check if the piece matches the color
                     pieces.append(piece)  # Add the piece to the list
         return pieces  # Return the list of pieces
 
@@ -51,10 +91,8 @@ class Board:
         Args:
             win (pygame.Surface): The window surface to draw the squares.
         """
-        win.fill(PINK)  # Fill the background with the pink color
-        for row in range(ROWS):  # Loop through the rows
-            for col in range(row % 2, COLS, 2):  # Loop through columns with alternating colors
-                pygame.draw.rect(win, WHITE, (row * SQUARE_SIZE, col * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        from . import render  # Loaded on first draw so the game rules never need pygame
+        render.draw_squares(win)
 
     def move(self, piece, row, col):
         """
@@ -65,17 +103,111 @@ class Board:
             row (int): The row to move the piece to.
             col (int): The column to move the piece to.
         """
+        self.zobrist ^= piece_key(piece)  # Take the piece off its old square in the hash
+        start, end = SQUARE_OF[(piece.row, piece.col)], SQUARE_OF[(row, col)]
+        # Side IDs follow the order of the piece kinds, so the kind is 2 * side + king
+        self.psq -= self.evaluator.square_scores[2 * piece.side + piece.king][start]
+        moved = (1 << start) | (1 << end)
+        if piece.side == YELLOW_ID:
+            self.yellow ^= moved
+        else:
+            self.purple ^= moved
+        if piece.king:
+            self.kings ^= moved
         # Swap the piece on the board with the destination square
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)  # Update the piece's position
 
-        # If the piece reaches the last row, it is promoted to a king
-        if row == ROWS - 1 or row == 0:
+        # If the piece reaches the last row, it is promoted to a king (kings are only counted once)
+        if (row == ROWS - 1 or row == 0) and not piece.king:
             piece.make_king()
-            if piece.color == YELLOW:
+            if piece.side == YELLOW_ID:
                 self.white_kings += 1  # Increase the count of white kings
             else:
                 self.red_kings += 1  # Increase the count of red kings
+            self.kings |= 1 << end
+        self.zobrist ^= piece_key(piece)  # Put the piece (possibly now a king) on its new square in the hash
+        self.psq += self.evaluator.square_scores[2 * piece.side + piece.king][end]
+        self.movable = [None, None]  # Both sides' moves may have changed
+
+    def make_move(self, move):
+        """
+        Plays a move in place and returns what is needed to take it back with unmake_move.
+        This lets the search walk the game tree on a single board instead of copying it.
+
+        Args:
+            move (tuple): A (piece, row, col, skipped) tuple, as returned by get_all_moves.
+
+        Returns:
+            tuple: The undo record (piece, from row, from col, captured pieces, promoted flag, counters).
+        """
+        piece, row, col, skipped = move
+        counters = (self.red_left, self.white_left, self.red_kings, self.white_kings, self.zobrist,
+                    self.yellow, self.purple, self.kings, self.psq)
+        from_row, from_col, was_king = piece.row, piece.col, piece.king
+        self.move(piece, row, col)  # Move the piece, promoting it if it reaches the last row
+        if skipped:
+            self.remove(skipped)  # Remove the captured pieces
+        return piece, from_row, from_col, skipped, piece.king and not was_king, counters
+
+    def unmake_move(self, undo):
+        """
+        Takes back a move played with make_move, restoring the board exactly.
+
+        Args:
+            undo (tuple): The undo record returned by make_move.
+        """
+        piece, row, col, skipped, promoted, counters = undo
+        self.board[piece.row][piece.col] = 0  # Lift the piece from its destination
+        self.board[row][col] = piece  # Put it back on its original square
+        piece.move(row, col)
+        if promoted:
+            piece.king = False  # Undo the promotion
+        for captured in skipped:
+            self.board[captured.row][captured.col] = captured  # Captured pieces still know their square
+        (self.red_left, self.white_left, self.red_kings, self.white_kings, self.zobrist,
+         self.yellow, self.purple, self.kings, self.psq) = counters
+        self.movable = [None, None]
+
+    def get_all_moves(self, color):
+        """
+        Returns every move available to the pieces of one color.
+
+        Args:
+            color (tuple): The color of the pieces to move (YELLOW or PURPLE).
+
+        Returns:
+            list: (piece, row, col, skipped) tuples that can be passed to make_move.
+        """
+        if color == YELLOW:
+            found = self.rules.generate(self.yellow, self.purple, self.kings, DOWN_STEPS)
+        else:
+            found = self.rules.generate(self.purple, self.yellow, self.kings, UP_STEPS)
+        board = self.board
+        return [(board[ROW_OF[start]][COL_OF[start]], ROW_OF[end], COL_OF[end],
+                 self._pieces_on(captured) if captured else [])
+                for start, end, captured in found]
+
+    def has_moves(self, color):
+        """
+        Returns whether one side has any legal move, without generating the moves. The
+        answer is kept until the next move or capture, so asking every frame costs nothing.
+
+        Args:
+            color (tuple): The side to move (YELLOW or PURPLE).
+
+        Returns:
+            bool: False if the side is blocked or has no pieces left.
+        """
+        side = COLOR_IDS[color]
+        movable = self.movable[side]
+        if movable is None:
+            if side == YELLOW_ID:
+                movable = can_move(self.yellow, self.purple, self.kings, DOWN_STEPS)
+            else:
+                movable = can_move(self.purple, self.yellow, self.kings, UP_STEPS)
+            self.movable[side] = movable
+        return movable
 
     def get_piece(self, row, col):
         """
@@ -118,12 +250,8 @@ class Board:
         Args:
             win (pygame.Surface): The window surface to draw the board and pieces on.
         """
-        self.draw_squares(win)  # Draw the squares on the board
-        for row in range(ROWS):  # Loop through the rows
-            for col in range(COLS):  # Loop through the columns
-                piece = self.board[row][col]  # Get the piece at the current position
-                if piece != 0:  # If there is a piece, draw it
-                    piece.draw(win)
+        from . import render  # Loaded on first draw so the game rules never need pygame
+        render.draw_board(win, self)
 
     def remove(self, pieces):
         """
@@ -135,10 +263,22 @@ class Board:
         for piece in pieces:  # Loop through the captured pieces
             self.board[piece.row][piece.col] = 0  # Set the captured piece's position to empty
             if piece != 0:  # If the piece exists
-                if piece.color == PURPLE:
+                self.zobrist ^= piece_key(piece)  # Remove the captured piece from the hash
+                square = SQUARE_OF[(piece.row, piece.col)]
+                self.psq -= self.evaluator.square_scores[2 * piece.side + piece.king][square]
+                cleared = ~(1 << square)
+                self.yellow &= cleared
+                self.purple &= cleared
+                self.kings &= cleared
+                self.movable = [None, None]
+                if piece.side == PURPLE_ID:
                     self.red_left -= 1  # Decrease the count of red pieces
+                    if piece.king:
+                        self.red_kings -= 1  # A captured king no longer counts as a king
                 else:
                     self.white_left -= 1  # Decrease the count of yellow pieces
+                    if piece.king:
+                        self.white_kings -= 1  # A captured king no longer counts as a king
 
     def winner(self):
         """
@@ -156,7 +296,8 @@ class Board:
     def get_valid_moves(self, piece):
         """
         Returns a dictionary of valid moves for the specified piece. The keys are positions,
-        and the values are lists of skipped pieces (if any).
+        and the values are lists of skipped pieces (if any). Under forced-capture rules the
+        dictionary is empty when another piece has to capture.
 
         Args:
             piece (Piece): The piece for which valid moves are to be calculated.
@@ -164,113 +305,30 @@ class Board:
         Returns:
             dict: A dictionary of valid moves.
         """
-        moves = {}  # Dictionary to store valid moves
-        left = piece.col - 1  # Left column offset
-        right = piece.col + 1  # Right column offset
-        row = piece.row  # Current row of the piece
-
-        # Handle moves for purple or king pieces (moving upwards)
-        if piece.color == PURPLE or piece.king:
-            moves.update(self._traverse_left(row - 1, max(row - 3, -1), -1, piece.color, left))  # Traverse left
-            moves.update(self._traverse_right(row - 1, max(row - 3, -1), -1, piece.color, right))  # Traverse right
-
-        # Handle moves for yellow or king pieces (moving downwards)
-        if piece.color == YELLOW or piece.king:
-            moves.update(self._traverse_left(row + 1, min(row + 3, ROWS), 1, piece.color, left))  # Traverse left
-            moves.update(self._traverse_right(row + 1, min(row + 3, ROWS), 1, piece.color, right))  # Traverse right
-
-        return moves  # Return the dictionary of valid moves
-
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
-        """
-        Helper function to traverse left and calculate valid moves, including captures.
-
-        Args:
-            start (int): The starting row for traversal.
-            stop (int): The stopping row for traversal.
-            step (int): The step for row iteration (either -1 or 1).
-            color (str): The color of the piece being moved.
-            left (int): The left column offset.
-            skipped (list): A list of pieces that were captured.
-
-        Returns:
-            dict: A dictionary of valid moves from the current position.
-        """
+        square = SQUARE_OF[(piece.row, piece.col)]
+        if piece.side == YELLOW_ID:
+            found = self.rules.piece_moves(square, self.yellow, self.purple, self.kings, DOWN_STEPS)
+        else:
+            found = self.rules.piece_moves(square, self.purple, self.yellow, self.kings, UP_STEPS)
         moves = {}
-        last = []  # Tracks the last piece encountered (for captures)
-        for r in range(start, stop, step):  # Iterate over the rows
-            if left < 0:  # If left goes out of bounds, break
-                break
-            
-            current = self.board[r][left]  # Get the piece at the current position
-            if current == 0:  # If it's an empty square
-                if skipped and not last:  # If there's a capture but no last piece
-                    break
-                elif skipped:  # If there's a captured piece, add it to the moves
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last  # Add the current path of moves
-                
-                if last:  # If a capture was made, look further ahead
-                    if step == -1:  # If moving up
-                        row = max(r - 3, 0)
-                    else:  # If moving down
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, left - 1, skipped=last))  # Traverse further left
-                    moves.update(self._traverse_right(r + step, row, step, color, left + 1, skipped=last))  # Traverse further right
-                break
-            elif current.color == color:  # If the piece is the same color, stop
-                break
-            else:
-                last = [current]  # Mark this as a captured piece
-
-            left -= 1  # Move left by 1
-        
+        for landing, captured in found.items():
+            moves[(ROW_OF[landing], COL_OF[landing])] = self._pieces_on(captured)
         return moves
 
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
+    def _pieces_on(self, mask):
         """
-        Helper function to traverse right and calculate valid moves, including captures.
+        Helper that returns the pieces standing on the squares of a mask.
 
         Args:
-            start (int): The starting row for traversal.
-            stop (int): The stopping row for traversal.
-            step (int): The step for row iteration (either -1 or 1).
-            color (str): The color of the piece being moved.
-            right (int): The right column offset.
-            skipped (list): A list of pieces that were captured.
+            mask (int): The squares to look at.
 
         Returns:
-            dict: A dictionary of valid moves from the current position.
+            list: The pieces, lowest square first.
         """
-        moves = {}
-        last = []  # Tracks the last piece encountered (for captures)
-        for r in range(start, stop, step):  # Iterate over the rows
-            if right >= COLS:  # If right goes out of bounds, break
-                break
-            
-            current = self.board[r][right]  # Get the piece at the current position
-            if current == 0:  # If it's an empty square
-                if skipped and not last:  # If there's a capture but no last piece
-                    break
-                elif skipped:  # If there's a captured piece, add it to the moves
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last  # Add the current path of moves
-                
-                if last:  # If a capture was made, look further ahead
-                    if step == -1:  # If moving up
-                        row = max(r - 3, 0)
-                    else:  # If moving down
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, right - 1, skipped=last))  # Traverse further left
-                    moves.update(self._traverse_right(r + step, row, step, color, right + 1, skipped=last))  # Traverse further right
-                break
-            elif current.color == color:  # If the piece is the same color, stop
-                break
-            else:
-                last = [current]  # Mark this as a captured piece
-
-            right += 1  # Move right by 1
-        
-        return moves
+        pieces = []
+        while mask:
+            low = mask & -mask
+            square = low.bit_length() - 1
+            pieces.append(self.board[ROW_OF[square]][COL_OF[square]])
+            mask ^= low
+        return pieces
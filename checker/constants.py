@@ -13,8 +13,6 @@
 
 # CROWN=pygame.transform.scale(pygame.image.load('assets/crown.png'), (44,25))
 
-import pygame
-
 WIDTH, HEIGHT = 800, 800
 ROWS, COLS = 8, 8
 SQUARE_SIZE = WIDTH//COLS
@@ -30,4 +28,19 @@ BLACK = (0, 0, 0)
 BLUE = (0, 0, 255)
 GREY = (225, 204, 229)
 
-CROWN = pygame.transform.scale(pygame.image.load('assets/crown.png'), (44, 25))
\ No newline at end of file
+# Small integer IDs of the two sides, stored in pieces instead of the RGB tuples.
+# They follow the order of the Zobrist and evaluation piece kinds (YELLOW first).
+YELLOW_ID, PURPLE_ID = 0, 1
+COLORS = (YELLOW, PURPLE)  # The RGB colour of each side ID
+COLOR_IDS = {YELLOW: YELLOW_ID, PURPLE: PURPLE_ID}
+
+
+def __getattr__(name):
+    """
+    Loads CROWN on first access only, so that importing the constants needs neither
+    pygame nor the image assets (see checker.render).
+    """
+    if name == 'CROWN':
+        from .render import crown
+        return crown()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,166 @@
+# Weighted, incrementally updated board evaluation
+from .constants import ROWS
+from .tables import SQUARES, FULL, ROW_OF, COL_OF, shift_down, shift_up, squares
+
+# Weight of every evaluation term. All terms are counted for YELLOW minus PURPLE,
+# so positive scores favour YELLOW (the AI).
+DEFAULT_WEIGHTS = {
+    'material': 1.0,  # Every piece on the board
+    'king': 0.5,  # Extra value of a king over a man
+    'back_rank': 0.1,  # Men still guarding their own back row against promotions
+    'centre': 0.05,  # Pieces on the eight central squares
+    'mobility': 0.02,  # Empty squares a side can step to
+    'runaway': 0.3,  # Men within three rows of crowning with a completely empty path
+    'tempo': 0.01,  # Rows the men have advanced in total
+}
+
+# Weights that reproduce the original material-and-kings evaluation
+MATERIAL_WEIGHTS = dict(DEFAULT_WEIGHTS, back_rank=0.0, centre=0.0, mobility=0.0, runaway=0.0, tempo=0.0)
+
+SCALE = 1000  # Scores are summed as integers in thousandths so incremental updates stay exact
+
+# Piece kinds, in the same order as the Zobrist tables
+YELLOW_MAN, YELLOW_KING, PURPLE_MAN, PURPLE_KING = 0, 1, 2, 3
+
+CENTRE = sum(1 << square for square in range(SQUARES) if 2 <= ROW_OF[square] <= 5 and 2 <= COL_OF[square] <= 5)
+
+# Men far from their crowning row are never counted as runaways
+NEAR_CROWNING = (
+    sum(1 << square for square in range(SQUARES) if ROWS - 4 <= ROW_OF[square] < ROWS - 1),  # YELLOW
+    sum(1 << square for square in range(SQUARES) if 0 < ROW_OF[square] <= 3),  # PURPLE
+)
+
+# Squares a man has to cross to be crowned: the cone of rows in front of it
+CONES = tuple(
+    tuple(
+        sum(1 << other for other in range(SQUARES)
+            if 0 < (ROW_OF[other] - ROW_OF[square]) * forward
+            and abs(COL_OF[other] - COL_OF[square]) <= (ROW_OF[other] - ROW_OF[square]) * forward)
+        for square in range(SQUARES)
+    )
+    for forward in (1, -1)  # YELLOW men move down the board, PURPLE men move up
+)
+
+
+class Evaluator:
+    """
+    Scores positions as a weighted sum of terms. The terms that only depend on where each
+    piece stands (material, kings, back rank, centre, tempo) are kept as a running total
+    that Board and BitBoard update on every move and capture; mobility and runaway men are
+    derived from the boards' occupancy masks with a few bit operations.
+    """
+    def __init__(self, weights=None):
+        """
+        Initializes the evaluator and precomputes the score of every piece on every square.
+
+        Args:
+            weights (dict): Term weights overriding DEFAULT_WEIGHTS.
+        """
+        unknown = set(weights or ()) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"unknown evaluation terms: {', '.join(sorted(unknown))}")
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.square_scores = tuple(
+            tuple(self._piece_square(kind, square) for square in range(SQUARES)) for kind in range(4)
+        )
+        self.mobility = round(self.weights['mobility'] * SCALE)
+        self.runaway = round(self.weights['runaway'] * SCALE)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Builds an evaluator from a JSON file mapping term names to weights.
+
+        Args:
+            path (str): The path of the weights file.
+
+        Returns:
+            Evaluator: The configured evaluator.
+        """
+        import json  # Only needed here; keeps the engine's import time low
+
+        with open(path) as file:
+            return cls(json.load(file))
+
+    def _piece_square(self, kind, square):
+        """
+        Helper that computes the weighted score of one kind of piece standing on one square.
+
+        Args:
+            kind (int): YELLOW_MAN, YELLOW_KING, PURPLE_MAN or PURPLE_KING.
+            square (int): The square index.
+
+        Returns:
+            int: The score in thousandths, positive for YELLOW pieces and negative for PURPLE ones.
+        """
+        weights = self.weights
+        king = kind in (YELLOW_KING, PURPLE_KING)
+        yellow = kind in (YELLOW_MAN, YELLOW_KING)
+        row = ROW_OF[square]
+        score = weights['material']
+        if king:
+            score += weights['king']
+        else:
+            home = 0 if yellow else ROWS - 1
+            if row == home:
+                score += weights['back_rank']
+            score += weights['tempo'] * abs(row - home)  # Rows advanced from the home row
+        if CENTRE >> square & 1:
+            score += weights['centre']
+        score = round(score * SCALE)
+        return score if yellow else -score
+
+    def piece_sum(self, yellow, purple, kings):
+        """
+        Computes the running total of the per-piece terms from scratch.
+
+        Args:
+            yellow (int): Mask of the YELLOW pieces.
+            purple (int): Mask of the PURPLE pieces.
+            kings (int): Mask of the kings.
+
+        Returns:
+            int: The total in thousandths.
+        """
+        total = 0
+        for kind, mask in enumerate((yellow & ~kings, yellow & kings, purple & ~kings, purple & kings)):
+            for square in squares(mask):
+                total += self.square_scores[kind][square]
+        return total
+
+    def evaluate(self, position):
+        """
+        Scores a position that keeps yellow, purple, kings and psq (the running total) up to date.
+
+        Args:
+            position: A Board or a BitBoard.
+
+        Returns:
+            float: The evaluation score, positive when YELLOW is better.
+        """
+        score = position.psq
+        if self.mobility or self.runaway:
+            yellow, purple, kings = position.yellow, position.purple, position.kings
+            occupied = yellow | purple
+            if self.mobility:
+                empty = FULL & ~occupied
+                yellow_steps = (shift_down(yellow) | shift_up(yellow & kings)) & empty
+                purple_steps = (shift_up(purple) | shift_down(purple & kings)) & empty
+                score += self.mobility * (yellow_steps.bit_count() - purple_steps.bit_count())
+            if self.runaway:
+                runaways = 0
+                for men, cones, sign in ((yellow & ~kings & NEAR_CROWNING[0], CONES[0], 1),
+                                         (purple & ~kings & NEAR_CROWNING[1], CONES[1], -1)):
+                    while men:
+                        low = men & -men
+                        if not cones[low.bit_length() - 1] & occupied:
+                            runaways += sign
+                        men ^= low
+                score += self.runaway * runaways
+        return score / SCALE
+
+    def __deepcopy__(self, memo):
+        return self  # Evaluators never change after construction, so boards can share them
+
+
+DEFAULT_EVALUATOR = Evaluator()  # Used by boards that are not given an evaluator
@@ -1,34 +1,67 @@
-# Importing necessary libraries and constants
-import pygame
-from .constants import PINK, YELLOW, BLUE, SQUARE_SIZE, PURPLE
+# Importing necessary libraries and constants; drawing lives in checker.render
+import time  # For timing book moves
+from .constants import YELLOW, PURPLE
 from checker.board import Board  # Importing the Board class to manage the game state
+from checker.bitboard import BitBoard  # Integer board the AI's result is applied on
+from minimax.search import SearchResult  # What the AI reports about its move
+from minimax.worker import SearchWorker, snapshot  # Background process for the AI search
+from . import record  # Binary game records for saving and the move log
+from .termination import GameHistory, game_result, irreversible, DRAW  # When the game is over
 
 class Game:
     """
     The Game class controls the logic for the Checkers game.
     It handles the game's state, including piece selection, valid moves, and turn management.
     """
-    def __init__(self, win):
+    def __init__(self, win, evaluator=None, tablebase_dir=None, book=None, rules=None, cache_mb=16, ponder=False,
+                 log=None):
         """
         Initializes the Game class with the game window.
 
         Args:
             win (pygame.Surface): The Pygame window to display the game.
+            evaluator (Evaluator): The evaluation weights used by the AI; the defaults if not given.
+            tablebase_dir (str): The directory of the endgame tables the AI probes, or None.
+            book (OpeningBook): The opening book the AI plays from before searching, or None.
+            rules (Rules): The rules of the game; CASUAL if not given.
+            cache_mb (float): The memory cap of the search state the AI keeps between its moves; 0 for none.
+            ponder (bool): Whether the AI keeps searching the expected position while the human thinks.
+            log (MoveLog): The log every move of every game is appended to, or None.
         """
+        self.evaluator = evaluator  # Passed on to every new board
+        self.rules = rules
+        self.cache_mb = cache_mb
+        self.ponder = ponder
+        self.tablebase_dir = tablebase_dir
+        self.book = book
+        self.log = log
         self._init()  # Calls the _init method to initialize the game state
         self.win = win  # Stores the window surface to draw on
+        self.renderer = None  # Draws the changed squares of each frame, created on first draw
+        self.worker = None  # Background AI search, started on the AI's first turn
 
     def update(self):
         """
         Updates the game window by drawing the board and the valid moves.
-        This method is called each frame to redraw the game state.
+        This method is called each frame; only the squares that changed since the last
+        frame are redrawn and pushed to the screen.
 
         Returns:
             None
         """
-        self.board.draw(self.win)  # Draw the current state of the board
-        self.draw_valid_moves(self.valid_moves)  # Highlight valid moves for the selected piece
-        pygame.display.update()  # Update the display to reflect the changes
+        from . import render  # Loaded on first draw so headless games never need pygame
+        if self.renderer is None:
+            self.renderer = render.BoardRenderer()
+        # Repaint the squares whose piece or valid move highlight changed
+        rects = self.renderer.draw(self.win, self.board, self.valid_moves)
+        render.update_display(rects)  # Push only those squares to the screen
+
+    def redraw(self):
+        """
+        Makes the next update repaint the whole window, e.g. when it was uncovered or drawn over.
+        """
+        if self.renderer is not None:
+            self.renderer.invalidate()
 
     def _init(self):
         """
@@ -40,18 +73,26 @@ class Game:
             None
         """
         self.selected = None  # No piece is selected initially
-        self.board = Board()  # Create a new board instance
+        self.board = Board(self.evaluator, self.rules)  # Create a new board instance
         self.turn = PURPLE  # Start the game with the PURPLE player's turn
         self.valid_moves = {}  # No valid moves initially
+        self.book_result = None  # AI move taken from the opening book, applied on the next poll
+        # The moves played so far, for saving; the log gets each of them as it is played
+        self.record = record.GameRecord(self.board.yellow, self.board.purple, self.board.kings, False, self.board.rules)
+        self.history = GameHistory(self.board, yellow_to_move=False)  # Positions seen, for the draw rules
+        if self.log is not None:
+            self.log.start(self.board, yellow_to_move=False)
 
     def winner(self):
         """
-        Returns the winner of the game if one exists.
+        Returns the result of the game once it is over: the side to move loses when it has
+        no legal move left (or no pieces), and the game is drawn by repetition or when
+        nobody makes progress. Cheap enough to call every frame (see checker.termination).
 
         Returns:
-            str or None: The winner color (PURPLE or YELLOW), or None if no winner yet.
+            tuple, str or None: The winner color (PURPLE or YELLOW), DRAW, or None if the game goes on.
         """
-        return self.board.winner()  # Calls the Board class method to determine if there's a winner
+        return game_result(self.board, self.turn, self.history)
 
     def reset(self):
         """
@@ -60,6 +101,11 @@ class Game:
         Returns:
             None
         """
+        if self.worker is not None:
+            self.worker.cancel()  # A search of the old game must not be applied to the new one
+            self.worker.clear_cache()  # Nor what the AI learned in it
+        if self.log is not None:
+            self.log.end(record.UNFINISHED, self.board)
         self._init()  # Re-initialize the game state using the _init method
 
     def select(self, row, col):
@@ -102,11 +148,14 @@ class Game:
         piece = self.board.get_piece(row, col)  # Get the piece at the target position
         # If a piece is selected and the target square is empty and within valid moves
         if self.selected and piece == 0 and (row, col) in self.valid_moves:
-            self.board.move(self.selected, row, col)  # Move the selected piece
             skipped = self.valid_moves[(row, col)]  # Get any captured piece during the move
+            move = record.board_move(self.selected, row, col, skipped)  # Taken before the piece leaves its square
+            reset = irreversible(self.board, move)
+            self.board.move(self.selected, row, col)  # Move the selected piece
             if skipped:
                 self.board.remove(skipped)  # Remove the captured piece
             self.change_turn()  # Switch the turn to the other player
+            self._played(move, reset)
         else:
             return False  # If the move is invalid, return False
 
@@ -120,11 +169,8 @@ class Game:
             moves (dict): A dictionary of valid moves, where keys are move positions
                           and values are the captured pieces (if any).
         """
-        for move in moves:  # Loop through each valid move
-            row, col = move  # Extract the row and column for the move
-            # Draw a blue circle to indicate the valid move position
-            pygame.draw.circle(self.win, BLUE, (col * SQUARE_SIZE + SQUARE_SIZE // 2, 
-                                                row * SQUARE_SIZE + SQUARE_SIZE // 2), 15)
+        from . import render  # Loaded on first draw so headless games never need pygame
+        render.draw_valid_moves(self.win, moves)
 
     def change_turn(self):
         """
@@ -158,3 +204,170 @@ class Game:
         """
         self.board = board  # Update the game board with the new state
         self.change_turn()  # Switch the turn to the other player (human player)
+
+    def play(self, move):
+        """
+        Plays a move of the side to move given as a BitBoard move tuple, e.g. one read from
+        move text by a headless client (see server.py) rather than clicked on the board.
+
+        Args:
+            move (tuple): A legal move of the side to move (from square, to square, captured mask).
+        """
+        reset = irreversible(self.board, move)
+        self.selected = None
+        self.ai_move(BitBoard.from_board(self.board).apply(move).to_board())  # Applies it and passes the turn
+        self._played(move, reset)
+
+    def start_ai_move(self, time_ms=200, max_depth=20, collect_stats=False):
+        """
+        Starts searching for the AI's move in a background process, so the window keeps
+        rendering and handling events. Does nothing if a search is already running or the game is over.
+        When the position is in the opening book the book move is used and nothing is searched.
+
+        Args:
+            time_ms (float): The time budget for the move, in milliseconds.
+            max_depth (int): The deepest iteration to run.
+            collect_stats (bool): Whether the search result should carry detailed SearchStats.
+        """
+        if self.ai_thinking() or self.winner() is not None:
+            return
+        if self.book is not None:
+            start = time.perf_counter()
+            move = self.book.choose(self.board, yellow_to_move=True)
+            if move is not None:
+                board = BitBoard.from_board(self.board).apply(move).to_board()
+                # Reported like a search that visited no node
+                self.book_result = SearchResult(board.evaluate(), move, board, 0, 0, time.perf_counter() - start, [move])
+                return
+        if self.worker is None:
+            self.worker = SearchWorker(tablebase_dir=self.tablebase_dir, cache_mb=self.cache_mb)
+        self.worker.start(self.board, max_player=True, time_ms=time_ms, max_depth=max_depth, collect_stats=collect_stats)
+
+    def ai_thinking(self):
+        """
+        Returns True while the AI's move is being searched or a book move waits to be applied.
+        """
+        return self.book_result is not None or (self.worker is not None and self.worker.pending())
+
+    def poll_ai_move(self):
+        """
+        Applies the AI's move if the background search has finished or the move came from the book. Never blocks.
+
+        Returns:
+            SearchResult or None: The result that was applied (depth 0 and no nodes for a book move),
+            or None if there is nothing to apply yet.
+        """
+        if self.book_result is not None:
+            result, self.book_result = self.book_result, None
+            reset = irreversible(self.board, result.move)
+            self.ai_move(result.board)
+            self._played(result.move, reset)
+            return result
+        if self.worker is None:
+            return None
+        finished = self.worker.poll()
+        if finished is None:
+            return None
+        position, result = finished
+        if self.turn != YELLOW or position != snapshot(self.board):
+            return None  # The board changed while searching (e.g. a reset): the result is stale
+        board = BitBoard(*position, evaluator=self.board.evaluator, rules=self.board.rules).apply(result.move)
+        reset = irreversible(self.board, result.move)
+        self.ai_move(board.to_board())
+        self._played(result.move, reset)
+        if self.ponder and len(result.pv) > 1:
+            # Search on from the human's expected reply while the human thinks
+            self.worker.ponder(board.apply(result.pv[1]), max_player=True)
+        return result
+
+    def keep_pondering(self):
+        """
+        Lets the background pondering go on during the human's turn; call it every frame. Never blocks.
+        """
+        if self.worker is not None:
+            self.worker.poll()  # Submits the next pondering slice when the last one is done
+
+    def _played(self, move, reset):
+        """
+        Helper that records a move just played on the board, once the turn has passed, and
+        ends the game in the log when it is over.
+
+        Args:
+            move (tuple): The move as a BitBoard move tuple.
+            reset (bool): Whether the move was irreversible (see checker.termination.irreversible).
+        """
+        self.record.moves.append(move)
+        self.history.push(self.board, self.turn == YELLOW, reset)
+        if self.log is not None:
+            self.log.move(move)
+            if self.winner() is not None:
+                self.log.end(self._result(), self.board)
+
+    def _result(self):
+        """
+        Helper that returns the result of the game so far as stored in game records.
+        """
+        winner = self.winner()
+        if winner is None:
+            return record.UNFINISHED
+        if winner == DRAW:
+            return record.DRAW
+        return record.YELLOW_WINS if winner == YELLOW else record.PURPLE_WINS
+
+    def save(self, path):
+        """
+        Saves the game in the compact binary format of checker.record: the first position
+        and the moves played, a few bytes each.
+
+        Args:
+            path (str): The save file; replaced if it exists.
+        """
+        self.record.result = self._result()
+        self.record.final = (self.board.yellow, self.board.purple, self.board.kings)
+        record.save(path, self.record)
+
+    def load(self, path):
+        """
+        Replaces the game with a saved one, replaying its moves on a new board.
+
+        Args:
+            path (str): The save file.
+
+        Raises:
+            ValueError: If the file is not a valid save or its moves do not replay.
+        """
+        saved = record.load(path)
+        board = record.replay(saved, self.evaluator)  # Checked before the current game is dropped
+        if self.worker is not None:
+            self.worker.cancel()  # As for reset: nothing of the old game may carry over
+            self.worker.clear_cache()
+        if self.log is not None:
+            self.log.end(record.UNFINISHED, self.board)
+        self.rules = saved.rules  # Kept by later resets
+        self.selected, self.valid_moves, self.book_result = None, {}, None
+        self.board = board
+        # The side that moved first moves again after an even number of moves
+        self.turn = YELLOW if saved.yellow_to_move != (len(saved.moves) % 2 == 1) else PURPLE
+        saved.final, saved.result = None, record.UNFINISHED
+        self.record = saved
+        # The draw rules need the positions of the saved game as well
+        position = BitBoard(*saved.start, rules=saved.rules)
+        self.history = GameHistory(position, saved.yellow_to_move)
+        yellow_to_move = saved.yellow_to_move
+        for move in saved.moves:
+            reset = irreversible(position, move)
+            position.make_move(move)
+            yellow_to_move = not yellow_to_move
+            self.history.push(position, yellow_to_move, reset)
+        if self.log is not None:
+            self.log.resume(saved)
+
+    def close(self):
+        """
+        Stops the background AI search, e.g. when the window is closed.
+        """
+        if self.log is not None:
+            self.log.end(self._result(), self.board)
+        if self.worker is not None:
+            self.worker.shutdown()
+            self.worker = None
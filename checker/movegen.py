@@ -0,0 +1,287 @@
+# Table-driven move generation shared by Board and BitBoard
+from .tables import (SQUARES, FULL, EVEN_ROWS, ODD_ROWS, UP, DOWN, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT,
+                     NEIGHBOURS, JUMPS, ROW_OF, _DOWN_3, _DOWN_4, _DOWN_5, _UP_3, _UP_4, _UP_5)
+
+
+def _steps(directions):
+    """
+    Helper that lists the (direction, neighbour, jump landing) triples of every square for
+    the given directions, leaving out the directions that leave the board.
+    """
+    return tuple(
+        tuple((direction, NEIGHBOURS[direction][square], JUMPS[direction][square])
+              for direction in directions if NEIGHBOURS[direction][square] >= 0)
+        for square in range(SQUARES)
+    )
+
+
+# Steps available to PURPLE men, YELLOW men and kings on every square
+UP_STEPS = _steps(UP)  # PURPLE men
+DOWN_STEPS = _steps(DOWN)  # YELLOW men
+KING_STEPS = _steps(UP + DOWN)  # Kings look up first, like Board always did
+
+
+def _jumps(origin, square, direction, opponent, empty, skipped, moves, seen):
+    """
+    Helper that follows a capture from the square it landed on, continuing in the same
+    vertical direction (to the left first, then to the right) while there is something to take.
+
+    Args:
+        origin (int): The square the capturing piece started from.
+        square (int): The landing square of the last jump.
+        direction (int): The direction of the last jump.
+        opponent (int): Mask of the opponent's pieces.
+        empty (int): Mask of the empty squares.
+        skipped (int): Mask of the piece captured by the last jump.
+        moves (list): The moves found so far, updated in place.
+        seen (dict): Index in moves of each landing square the piece already reaches by a capture.
+    """
+    for follow, neighbour, landing in (UP_STEPS if direction in UP else DOWN_STEPS)[square]:
+        # Only a jump can continue a capture, and a continued upward jump never lands on the top row
+        if (opponent >> neighbour & 1 and landing >= 0 and empty >> landing & 1
+                and not (follow in UP and ROW_OF[landing] == 0)):
+            bit = 1 << neighbour
+            _add(moves, seen, (origin, landing, bit | skipped))  # Only the last two captured pieces are recorded
+            _jumps(origin, landing, follow, opponent, empty, bit, moves, seen)
+
+
+def _add(moves, seen, move):
+    """
+    Helper that records a capture. A landing square reached a second time keeps its place
+    in the list but takes the captures of the later path, like the dict updates of the
+    original generator did.
+    """
+    index = seen.get(move[1])
+    if index is None:
+        seen[move[1]] = len(moves)
+        moves.append(move)
+    else:
+        moves[index] = move
+
+
+def _generate(movers, own, opponent, kings, forward):
+    """
+    Helper that lists the moves of some of one side's pieces.
+
+    Args:
+        movers (int): Mask of the pieces to generate moves for.
+        own (int): Mask of all the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        list: (from square, to square, captured mask) tuples.
+    """
+    empty = ~(own | opponent)
+    moves = []
+    while movers:
+        low = movers & -movers
+        square = low.bit_length() - 1
+        movers ^= low
+        seen = None
+        for direction, neighbour, landing in (KING_STEPS if kings & low else forward)[square]:
+            if empty >> neighbour & 1:
+                moves.append((square, neighbour, 0))
+            elif opponent >> neighbour & 1 and landing >= 0 and empty >> landing & 1:
+                if seen is None:
+                    seen = {}  # Plain steps never share a landing square with a capture
+                bit = 1 << neighbour
+                _add(moves, seen, (square, landing, bit))
+                _jumps(square, landing, direction, opponent, empty, bit, moves, seen)
+    return moves
+
+
+def piece_moves(square, own, opponent, kings, forward):
+    """
+    Returns the moves of the piece on one square, with the same rules and in the same
+    order as the original Board.get_valid_moves.
+
+    Args:
+        square (int): The square of the piece to move.
+        own (int): Mask of the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        dict: Maps each landing square to the mask of captured pieces (0 for a plain step).
+    """
+    return {landing: captured for _, landing, captured in _generate(1 << square, own, opponent, kings, forward)}
+
+
+def generate_moves(own, opponent, kings, forward):
+    """
+    Returns every move of one side as compact tuples, pieces taken from the lowest square up.
+
+    Args:
+        own (int): Mask of the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        list: (from square, to square, captured mask) tuples.
+    """
+    return _generate(own, own, opponent, kings, forward)
+
+
+# Forced-capture rules (checker.rules.FORCED_CAPTURE): when any piece can capture, only
+# captures are legal, and a capture goes on until the capturing piece cannot jump again.
+# Unlike the casual jumps above, which keep the limits the game was first written with, a
+# king may change direction partway through a capture, and a man may land on the crown row
+# at the end of it. Two captures ending on the same square are separate moves.
+
+def _has_jump(direction, rows):
+    """
+    Helper that returns the squares of some rows whose jump in a direction stays on the board.
+    """
+    return sum(1 << square for square in range(SQUARES) if JUMPS[direction][square] >= 0) & rows
+
+
+# Squares that can jump in each direction, split by row parity since the step to the
+# neighbour depends on it (see tables.SHIFTS); two steps in one direction are 7 or 9 squares
+_UP_LEFT_EVEN, _UP_LEFT_ODD = _has_jump(UP_LEFT, EVEN_ROWS), _has_jump(UP_LEFT, ODD_ROWS)
+_UP_RIGHT_EVEN, _UP_RIGHT_ODD = _has_jump(UP_RIGHT, EVEN_ROWS), _has_jump(UP_RIGHT, ODD_ROWS)
+_DOWN_LEFT_EVEN, _DOWN_LEFT_ODD = _has_jump(DOWN_LEFT, EVEN_ROWS), _has_jump(DOWN_LEFT, ODD_ROWS)
+_DOWN_RIGHT_EVEN, _DOWN_RIGHT_ODD = _has_jump(DOWN_RIGHT, EVEN_ROWS), _has_jump(DOWN_RIGHT, ODD_ROWS)
+
+
+def capturers(own, opponent, kings, forward):
+    """
+    Returns the pieces of one side that can capture, with a few whole-board shifts per direction:
+    a piece can capture where its neighbour holds an opponent and the square behind is empty.
+
+    Args:
+        own (int): Mask of the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        int: Mask of the pieces with at least one jump.
+    """
+    empty = FULL & ~(own | opponent)
+    backward = own & kings  # Only kings capture backwards
+    up, down = (own, backward) if forward is UP_STEPS else (backward, own)
+    found = 0
+    if up:
+        found = up & (
+            (((opponent << 4) & _UP_LEFT_EVEN) | ((opponent << 5) & _UP_LEFT_ODD)) & (empty << 9)
+            | (((opponent << 3) & _UP_RIGHT_EVEN) | ((opponent << 4) & _UP_RIGHT_ODD)) & (empty << 7))
+    if down:
+        found |= down & (
+            (((opponent >> 4) & _DOWN_LEFT_EVEN) | ((opponent >> 3) & _DOWN_LEFT_ODD)) & (empty >> 7)
+            | (((opponent >> 5) & _DOWN_RIGHT_EVEN) | ((opponent >> 4) & _DOWN_RIGHT_ODD)) & (empty >> 9))
+    return found
+
+
+def can_move(own, opponent, kings, forward):
+    """
+    Returns whether one side has any legal move, without generating the moves: a piece
+    that can step to an empty neighbour, or one that can capture. This holds under both
+    rules, since forced captures only restrict which of the moves are legal.
+
+    Args:
+        own (int): Mask of the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        bool: False if the side is blocked or has no pieces left.
+    """
+    empty = FULL & ~(own | opponent)
+    backward = own & kings  # Only kings step backwards
+    up, down = (own, backward) if forward is UP_STEPS else (backward, own)
+    # One step up or down from every piece, as tables.shift_up and shift_down, written out for speed
+    if (((up & _UP_3) >> 3) | ((up & _UP_4) >> 4) | ((up & _UP_5) >> 5)) & empty:
+        return True
+    if (((down & _DOWN_3) << 3) | ((down & _DOWN_4) << 4) | ((down & _DOWN_5) << 5)) & empty:
+        return True
+    return bool(capturers(own, opponent, kings, forward))
+
+
+def _sequences(origin, square, steps, opponent, empty, captured, moves, seen):
+    """
+    Helper that follows a capture to every square where it has to stop, recording every
+    piece taken on the way. The piece jumps in every direction of its steps table, so a
+    king may turn back partway, and a man stops on the crown row, where it has no step
+    left. A piece already taken stays on the board until the move ends and is never
+    jumped twice.
+    """
+    ended = True
+    for _, neighbour, landing in steps[square]:
+        if (opponent >> neighbour & 1 and not captured >> neighbour & 1 and landing >= 0
+                and empty >> landing & 1):
+            ended = False
+            _sequences(origin, landing, steps, opponent, empty, captured | 1 << neighbour, moves, seen)
+    if ended:
+        move = (origin, square, captured)
+        if move not in seen:  # A king can take the same pieces in another order
+            seen.add(move)
+            moves.append(move)
+
+
+def _captures(movers, own, opponent, kings, forward):
+    """
+    Helper that lists the complete captures of some of one side's pieces.
+    """
+    empty = ~(own | opponent)
+    moves = []
+    seen = set()
+    while movers:
+        low = movers & -movers
+        square = low.bit_length() - 1
+        movers ^= low
+        steps = KING_STEPS if kings & low else forward
+        for _, neighbour, landing in steps[square]:
+            if opponent >> neighbour & 1 and landing >= 0 and empty >> landing & 1:
+                # The square the piece left is empty for the rest of its jumps
+                _sequences(square, landing, steps, opponent, empty | low, 1 << neighbour, moves, seen)
+    return moves
+
+
+def generate_forced(own, opponent, kings, forward):
+    """
+    Returns every legal move of one side under the forced-capture rules. Captures are looked
+    for first, and the plain steps are only generated when no piece can capture.
+
+    Args:
+        own (int): Mask of the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        list: (from square, to square, captured mask) tuples; a capture's mask holds every piece it takes.
+    """
+    jumpers = capturers(own, opponent, kings, forward)
+    if jumpers:
+        return _captures(jumpers, own, opponent, kings, forward)
+    return _generate(own, own, opponent, kings, forward)  # Without captures every move is a plain step
+
+
+def piece_moves_forced(square, own, opponent, kings, forward):
+    """
+    Returns the legal moves of the piece on one square under the forced-capture rules: none
+    when another piece has to capture instead.
+
+    Args:
+        square (int): The square of the piece to move.
+        own (int): Mask of the moving side's pieces.
+        opponent (int): Mask of the opponent's pieces.
+        kings (int): Mask of the kings of either colour.
+        forward (tuple): The steps table of the side's men, UP_STEPS or DOWN_STEPS.
+
+    Returns:
+        dict: Maps each landing square to the mask of captured pieces (0 for a plain step).
+    """
+    jumpers = capturers(own, opponent, kings, forward)
+    if not jumpers:
+        return {landing: captured for _, landing, captured in _generate(1 << square, own, opponent, kings, forward)}
+    found = {}
+    for _, landing, captured in _captures(jumpers & 1 << square, own, opponent, kings, forward):
+        if captured.bit_count() > found.get(landing, 0).bit_count():
+            found[landing] = captured  # Two captures ending on one square: the longer one is offered
+    return found
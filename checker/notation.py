@@ -0,0 +1,211 @@
+# Text notation for squares and moves
+from .constants import YELLOW, PURPLE
+from .tables import SQUARES, FULL, NEIGHBOURS, JUMPS
+
+# The dark squares are numbered 1 to 32 row by row from the top of the board,
+# i.e. square index + 1, so a move reads like "9-13" or, for a capture, "22x15".
+# A multi-jump may list every square it lands on ("18x9x2"), which tells apart two
+# captures from the same square to the same square.
+
+
+def square_name(square):
+    """
+    Returns the number of a square as used in move text.
+
+    Args:
+        square (int): The square index (0 to 31).
+
+    Returns:
+        str: The square number (1 to 32).
+    """
+    return str(square + 1)
+
+
+def parse_square(text):
+    """
+    Reads a square number.
+
+    Args:
+        text (str): The square number (1 to 32).
+
+    Returns:
+        int: The square index.
+
+    Raises:
+        ValueError: If the text is not a square number.
+    """
+    number = int(text)
+    if not 1 <= number <= SQUARES:
+        raise ValueError(f"no such square: {text}")
+    return number - 1
+
+
+def move_to_text(move, position=None):
+    """
+    Writes a BitBoard move tuple as text.
+
+    Args:
+        move (tuple): A (from square, to square, captured mask) tuple.
+        position (BitBoard): The position the move is played in; when given, a multi-jump is
+            written with every square it lands on (see capture_path).
+
+    Returns:
+        str: The move, e.g. "9-13", "22x15" or "18x9x2".
+    """
+    start, end, captured = move
+    if not captured:
+        return square_name(start) + '-' + square_name(end)
+    path = capture_path(position, move) if position is not None and captured & captured - 1 else None
+    return 'x'.join(square_name(square) for square in [start] + (path or [end]))
+
+
+def capture_path(position, move):
+    """
+    Finds the squares a capture lands on, one jump over each captured piece in turn.
+
+    Args:
+        position (BitBoard): The position the move is played in.
+        move (tuple): A capture as a (from square, to square, captured mask) tuple.
+
+    Returns:
+        list: The landing squares, ending with the move's destination, or None when no such
+        path exists (a casual capture only records the last two pieces it takes).
+    """
+    start, end, captured = move
+    empty = FULL & ~(position.yellow | position.purple) | 1 << start
+
+    def follow(square, left):
+        if not left:
+            return [] if square == end else None
+        for direction in range(4):
+            over, landing = NEIGHBOURS[direction][square], JUMPS[direction][square]
+            if landing >= 0 and left >> over & 1 and empty >> landing & 1:
+                rest = follow(landing, left & ~(1 << over))
+                if rest is not None:
+                    return [landing] + rest
+        return None
+
+    return follow(start, captured)
+
+
+def _jumped(squares):
+    """
+    Helper that returns the mask of the squares jumped over by a chain of single jumps
+    between the given squares, or None when one of the steps is not a jump.
+    """
+    jumped = 0
+    for square, landing in zip(squares, squares[1:]):
+        over = next((NEIGHBOURS[direction][square] for direction in range(4)
+                     if JUMPS[direction][square] == landing >= 0), None)
+        if over is None:
+            return None
+        jumped |= 1 << over
+    return jumped
+
+
+def parse_move(position, text, color):
+    """
+    Finds the legal move of one side described by a move text. A multi-jump written with
+    every landing square ("1x10x19") must take exactly the pieces on that path; written
+    with only its first and last squares it must be the only such move.
+
+    Args:
+        position (BitBoard): The position the move is played in.
+        text (str): The move text.
+        color (tuple): The side to move (YELLOW or PURPLE).
+
+    Returns:
+        tuple: The matching move tuple from position.get_all_moves.
+
+    Raises:
+        ValueError: If the text is malformed, or the move is not legal or is ambiguous.
+    """
+    parts = text.strip().replace('x', '-').split('-')
+    if len(parts) < 2:
+        raise ValueError(f"not a move: {text!r}")
+    squares = [parse_square(part) for part in parts]
+    path = _jumped(squares)
+    if path is None and len(squares) > 2:
+        raise ValueError(f"not a chain of jumps: {text!r}")
+    matches = [move for move in position.get_all_moves(color) if move[0] == squares[0] and move[1] == squares[-1]]
+    if path is not None:
+        # Every capture of the forced rules records all the pieces it takes; a casual one only its last two
+        exact = [move for move in matches
+                 if move[2] == path or (not position.rules.forced_capture and move[2] and not move[2] & ~path)]
+        if exact or len(squares) > 2:
+            matches = exact  # Else two squares a jump apart may still be the ends of a longer capture
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        raise ValueError(f"ambiguous move {text!r}: write every square it lands on")
+    side = 'YELLOW' if color == YELLOW else 'PURPLE' if color == PURPLE else str(color)
+    raise ValueError(f"illegal move for {side}: {text!r}")
+
+
+# FEN-style position text, as in PDN: side to move, then the pieces of each side, e.g.
+# "W:W21,22,K30:B1,2,3". Kings are prefixed with K and ranges like 1-12 may be used.
+# B is the side on squares 1-12 at the start (YELLOW), W the side on squares 21-32 (PURPLE).
+FEN_COLORS = {'B': YELLOW, 'W': PURPLE}
+FEN_LETTERS = {YELLOW: 'B', PURPLE: 'W'}
+
+
+def to_fen(position, color):
+    """
+    Writes a position as FEN text.
+
+    Args:
+        position: A Board or a BitBoard.
+        color (tuple): The side to move (YELLOW or PURPLE).
+
+    Returns:
+        str: The FEN text, with squares in increasing order.
+    """
+    yellow, purple, kings = position.yellow, position.purple, position.kings
+    fields = [FEN_LETTERS[color]]
+    for letter, mask in (('W', purple), ('B', yellow)):
+        names = [('K' if kings >> square & 1 else '') + square_name(square)
+                 for square in range(SQUARES) if mask >> square & 1]
+        fields.append(letter + ','.join(names))
+    return ':'.join(fields)
+
+
+def parse_fen(text):
+    """
+    Reads FEN text into the masks of a position.
+
+    Args:
+        text (str): The FEN text; surrounding brackets, quotes and a trailing period are ignored.
+
+    Returns:
+        tuple: (yellow, purple, kings, side to move).
+
+    Raises:
+        ValueError: If the text is not a valid FEN position, or a side has no pieces.
+    """
+    fields = text.strip().strip('[]').replace('FEN', '').strip().strip('"').rstrip('.').split(':')
+    if len(fields) != 3 or fields[0].upper() not in FEN_COLORS:
+        raise ValueError(f"not a FEN position: {text!r}")
+    masks = {YELLOW: 0, PURPLE: 0}
+    kings = 0
+    for field in fields[1:]:
+        letter, pieces = field[:1].upper(), field[1:]
+        if letter not in FEN_COLORS:
+            raise ValueError(f"unknown side {letter!r} in FEN {text!r}")
+        for item in filter(None, (part.strip() for part in pieces.split(','))):
+            king = item[0].upper() == 'K'
+            if king:
+                item = item[1:]
+            first, _, last = item.partition('-')
+            first, last = parse_square(first), parse_square(last or first)
+            if first > last:
+                raise ValueError(f"reversed range {item!r} in FEN {text!r}")
+            for square in range(first, last + 1):
+                bit = 1 << square
+                if (masks[YELLOW] | masks[PURPLE]) & bit:
+                    raise ValueError(f"square {square_name(square)} is used twice in FEN {text!r}")
+                masks[FEN_COLORS[letter]] |= bit
+                if king:
+                    kings |= bit
+    if not masks[YELLOW] or not masks[PURPLE]:
+        raise ValueError(f"a side has no pieces in FEN {text!r}")  # The game would already be over
+    return masks[YELLOW], masks[PURPLE], kings, FEN_COLORS[fields[0].upper()]
@@ -0,0 +1,308 @@
+"""
+Streaming import of PDN game collections into a compact columnar file of positions, e.g.
+for building opening books or tuning the evaluator.
+
+read_games reads a PDN file line by line and yields one game at a time, so files of any
+size are read in constant memory. import_pdn checks every move of every game against the
+legal moves of the rules (the generator behind Board.get_valid_moves), spreading the games
+over a process pool in batches, and writes every position played in a valid game, with the
+move played from it and the game's result, as column blocks (see write_positions).
+
+As in PDN and FEN (see checker.notation), squares are numbered 1 to 32 from the side that
+starts on squares 1-12 (B, YELLOW here), which moves first unless a FEN tag says otherwise.
+Results are scored for that side: "1-0" (or "2-0") is a YELLOW win.
+
+Import a collection from the repository root:
+    python -m checker.pdn games.pdn --out positions.ckp --processes 4
+"""
+import argparse
+import os
+import re
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+
+from .bitboard import BitBoard
+from .board import Board
+from .constants import YELLOW, PURPLE
+from .notation import parse_move, parse_fen
+from .rules import rules_named
+
+MAGIC = b'CKP1'
+# Columns of the positions file and their array type codes
+COLUMNS = (
+    ('yellow', 'I'), ('purple', 'I'), ('kings', 'I'),  # The position
+    ('yellow_to_move', 'B'),
+    ('start', 'B'), ('end', 'B'),  # Squares of the move played from the position
+    ('result', 'b'),  # 1 if YELLOW won the game, -1 if PURPLE won, 0 for a draw
+    ('game', 'I'), ('ply', 'H'),  # Number of the game in the PDN file, and of the move in the game
+)
+COUNT = 'I'  # Array type of the row count at the start of every block
+BATCH = 200  # Games validated per task of the process pool
+
+RESULTS = {'1-0': 1, '2-0': 1, '0-1': -1, '0-2': -1, '1/2-1/2': 0, '1-1': 0, '*': None}
+TAG = re.compile(r'\[\s*(\w+)\s+"([^"]*)"\s*\]')
+TOKEN = re.compile(r'[{}()]|[^\s{}()]+')
+MOVE = re.compile(r'(?:\d+\.+)?(\d+(?:[-x]\d+)+)[!?]*$')  # A move, possibly glued to its move number
+
+
+class PdnGame:
+    """
+    A game as read from a PDN file: its tags, its move texts and the result text.
+    """
+    __slots__ = ('index', 'tags', 'moves', 'result')
+
+    def __init__(self, index, tags, moves, result):
+        self.index = index  # Position of the game in the file, from 0
+        self.tags = tags
+        self.moves = moves
+        self.result = result
+
+    def __repr__(self):
+        return f"PdnGame({self.index}, {len(self.moves)} moves, {self.result})"
+
+
+def read_games(lines):
+    """
+    Reads the games of a PDN file one at a time. Comments, variations, move numbers and
+    move annotations are skipped; a game ends at its result or at the next tag section.
+
+    Args:
+        lines: The lines of the file, e.g. the open file itself.
+
+    Yields:
+        PdnGame: Every game with at least one tag or move, in order. Its result is the
+        result token ending the movetext, else the Result tag, else "*".
+    """
+    tags, moves, index = {}, [], 0
+    comment = variation = 0  # Depths of the open comments and variations
+    for line in lines:
+        if not comment and not variation and line.lstrip().startswith('['):
+            if moves:
+                # A tag section after moves starts the next game
+                yield PdnGame(index, tags, moves, tags.get('Result', '*'))
+                tags, moves, index = {}, [], index + 1
+            for name, value in TAG.findall(line):
+                tags[name] = value
+            continue
+        for token in TOKEN.findall(line):
+            if token == '{':
+                comment += 1
+            elif token == '}':
+                comment = max(comment - 1, 0)
+            elif comment:
+                continue
+            elif token == '(':
+                variation += 1
+            elif token == ')':
+                variation = max(variation - 1, 0)
+            elif variation:
+                continue
+            elif token in RESULTS:
+                yield PdnGame(index, tags, moves, token)
+                tags, moves, index = {}, [], index + 1
+            else:
+                move = MOVE.match(token)
+                if move:
+                    moves.append(move.group(1))
+    if tags or moves:
+        yield PdnGame(index, tags, moves, tags.get('Result', '*'))
+
+
+def validate(game, rules):
+    """
+    Plays a game through, checking every move against the legal moves.
+
+    Args:
+        game (PdnGame): The game.
+        rules (Rules): The rules the game was played with.
+
+    Returns:
+        list: A (yellow, purple, kings, yellow to move, start, end, ply) row for the position
+        before every move.
+
+    Raises:
+        ValueError: If the setup is invalid or a move is not legal.
+    """
+    if 'FEN' in game.tags:
+        yellow, purple, kings, color = parse_fen(game.tags['FEN'])
+        position = BitBoard(yellow, purple, kings, rules=rules)
+    else:
+        position, color = BitBoard.from_board(Board(rules=rules)), YELLOW
+    rows = []
+    for ply, text in enumerate(game.moves):
+        try:
+            move = parse_move(position, text, color)
+        except ValueError as error:
+            raise ValueError(f"move {ply // 2 + 1} ({text}): {error}") from None
+        rows.append((position.yellow, position.purple, position.kings, color == YELLOW, move[0], move[1], ply))
+        position.make_move(move)
+        color = YELLOW if color == PURPLE else PURPLE
+    return rows
+
+
+def validate_batch(games, rules_name):
+    """
+    Validates a batch of games, e.g. in a worker process.
+
+    Args:
+        games (list): (index, tags, moves, result) tuples.
+        rules_name (str): The name of the rules.
+
+    Returns:
+        tuple: The columns of the positions of the valid games, as arrays in COLUMNS order,
+        and the (index, message) of every game that was skipped.
+    """
+    rules = rules_named(rules_name)
+    columns = [array(code) for _, code in COLUMNS]
+    yellow, purple, kings, to_move, start, end, result, number, plies = columns
+    skipped = []
+    for index, tags, moves, result_text in games:
+        score = RESULTS.get(result_text.strip())
+        if score is None:
+            skipped.append((index, f"no result ({result_text})"))
+            continue
+        try:
+            rows = validate(PdnGame(index, tags, moves, result_text), rules)
+        except ValueError as error:
+            skipped.append((index, str(error)))
+            continue
+        for row in rows:
+            yellow.append(row[0])
+            purple.append(row[1])
+            kings.append(row[2])
+            to_move.append(row[3])
+            start.append(row[4])
+            end.append(row[5])
+            result.append(score)
+            number.append(index)
+            plies.append(row[6])
+    return columns, skipped
+
+
+def write_positions(file, columns):
+    """
+    Appends a block of positions to a positions file: the row count, then every column
+    as a contiguous array, so a reader can load any column without parsing rows.
+
+    Args:
+        file: A binary file opened for writing, after MAGIC.
+        columns (list): Equal-length arrays in COLUMNS order.
+    """
+    array(COUNT, [len(columns[0])]).tofile(file)
+    for column in columns:
+        column.tofile(file)
+
+
+def read_positions(path):
+    """
+    Reads a positions file block by block.
+
+    Args:
+        path (str): The positions file.
+
+    Yields:
+        dict: Maps every column name to an array, for one block of positions.
+
+    Raises:
+        ValueError: If the file is not a positions file.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a positions file: {path}")
+        while True:
+            count = array(COUNT)
+            try:
+                count.fromfile(file, 1)
+            except EOFError:
+                return
+            block = {}
+            for name, code in COLUMNS:
+                block[name] = array(code)
+                block[name].fromfile(file, count[0])
+            yield block
+
+
+def import_pdn(source, out, rules=None, processes=None, batch=BATCH, errors=None):
+    """
+    Imports a PDN file into a positions file. Games are read as a stream and validated in
+    batches, at most two batches per process at a time, so the memory used does not grow
+    with the size of the file. Blocks are written in the order of the games.
+
+    Args:
+        source (str): The PDN file.
+        out (str): The positions file to write.
+        rules (Rules): The rules the games were played with; forced captures if not given,
+            as in tournament checkers.
+        processes (int): Worker processes; 1 validates in this process, None uses every CPU.
+        batch (int): Games per batch.
+        errors (list): Receives the (game index, message) of every skipped game, when given.
+
+    Returns:
+        tuple: The numbers of games read, games written and positions written.
+    """
+    rules_name = (rules or rules_named('forced')).name
+    processes = processes or os.cpu_count() or 1
+    games = written = positions = 0
+
+    def batches(pdn):
+        chunk = []
+        for game in read_games(pdn):
+            chunk.append((game.index, game.tags, game.moves, game.result))
+            if len(chunk) == batch:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def store(columns, skipped, size):
+        nonlocal games, written, positions
+        games += size
+        written += size - len(skipped)
+        positions += len(columns[0])
+        write_positions(file, columns)
+        if errors is not None:
+            errors.extend(skipped)
+
+    with open(source, encoding='utf-8', errors='replace') as pdn, open(out, 'wb') as file:
+        file.write(MAGIC)
+        if processes == 1:
+            for chunk in batches(pdn):
+                store(*validate_batch(chunk, rules_name), len(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                pending = deque()
+                for chunk in batches(pdn):
+                    pending.append((executor.submit(validate_batch, chunk, rules_name), len(chunk)))
+                    if len(pending) >= 2 * processes:
+                        future, size = pending.popleft()  # The oldest batch, to keep the order of the games
+                        store(*future.result(), size)
+                while pending:
+                    future, size = pending.popleft()
+                    store(*future.result(), size)
+    return games, written, positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='the PDN file')
+    parser.add_argument('--out', required=True, help='the positions file to write')
+    parser.add_argument('--rules', choices=('casual', 'forced'), default='forced')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=BATCH, help='games per task of the process pool')
+    args = parser.parse_args()
+
+    errors, start = [], time.perf_counter()
+    games, written, positions = import_pdn(args.source, args.out, rules_named(args.rules), args.processes,
+                                           args.batch, errors)
+    elapsed = time.perf_counter() - start
+    for index, message in errors[:10]:
+        print(f"game {index + 1} skipped: {message}")
+    print(f"{games} games read, {written} imported ({positions} positions), {games - written} skipped "
+          f"in {elapsed:.2f}s ({games / elapsed if elapsed else 0:.0f} games/s); "
+          f"{os.path.getsize(args.source)} bytes of PDN -> {os.path.getsize(args.out)} bytes")
+
+
+if __name__ == '__main__':
+    main()
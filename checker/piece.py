@@ -1,13 +1,18 @@
-# Import necessary constants and pygame for drawing
-from .constants import PURPLE, YELLOW, SQUARE_SIZE, GREY, CROWN
-import pygame
+# Import necessary constants; pygame is only needed for drawing (see checker.render)
+from .constants import COLORS, COLOR_IDS, SQUARE_SIZE
 
 class Piece:
     """
     Represents a single game piece in the checkers game.
     Handles piece attributes like position, color, and king status,
     as well as drawing and movement on the board.
+
+    Pieces are created and moved constantly by the search, so a piece only stores its
+    square, an integer side ID and its king flag in __slots__; the RGB colour and the
+    pixel position are derived from them when they are needed for drawing.
     """
+    __slots__ = ('row', 'col', 'side', 'king')
+
     PADDING = 15  # Padding around the piece for visual separation
     OUTLINE = 5  # Outline thickness for the piece's border
 
@@ -18,23 +23,33 @@ class Piece:
         Args:
             row (int): The initial row of the piece on the board.
             col (int): The initial column of the piece on the board.
-            color (tuple): The RGB color of the piece.
+            color (tuple): The RGB color of the piece (PURPLE or YELLOW).
         """
         self.row = row  # Row position of the piece on the board
         self.col = col  # Column position of the piece on the board
-        self.color = color  # Color of the piece (PURPLE or YELLOW)
+        self.side = COLOR_IDS[color]  # Side of the piece (YELLOW_ID or PURPLE_ID)
         self.king = False  # Flag to indicate if the piece is a king
-        self.x = 0  # x-coordinate for drawing the piece (calculated later)
-        self.y = 0  # y-coordinate for drawing the piece (calculated later)
-        self.calc_pos()  # Calculate initial screen position based on row/col
 
-    def calc_pos(self):
+    @property
+    def color(self):
+        """
+        The RGB color of the piece (PURPLE or YELLOW), shared by all pieces of its side.
+        """
+        return COLORS[self.side]
+
+    @property
+    def x(self):
+        """
+        The x-coordinate of the piece's center in pixels, computed when drawing.
+        """
+        return SQUARE_SIZE * self.col + SQUARE_SIZE // 2
+
+    @property
+    def y(self):
         """
-        Calculates the pixel position of the piece's center based on its row and column.
-        This is used for drawing the piece at the correct location.
+        The y-coordinate of the piece's center in pixels, computed when drawing.
         """
-        self.x = SQUARE_SIZE * self.col + SQUARE_SIZE // 2  # x-coordinate of the center
-        self.y = SQUARE_SIZE * self.row + SQUARE_SIZE // 2  # y-coordinate of the center
+        return SQUARE_SIZE * self.row + SQUARE_SIZE // 2
 
     def make_king(self):
         """
@@ -50,18 +65,8 @@ class Piece:
         Args:
             win: The Pygame window surface where the piece will be drawn.
         """
-        # Radius of the piece (slightly smaller than a square for padding)
-        radius = SQUARE_SIZE // 2 - self.PADDING
-
-        # Draw the outer border of the piece (GREY outline)
-        pygame.draw.circle(win, GREY, (self.x, self.y), radius + self.OUTLINE)
-        # Draw the inner circle representing the piece (color-filled)
-        pygame.draw.circle(win, self.color, (self.x, self.y), radius)
-        
-        # If the piece is a king, draw the crown symbol at its center
-        if self.king:
-            # Center the crown image on the piece
-            win.blit(CROWN, (self.x - CROWN.get_width() // 2, self.y - CROWN.get_height() // 2))
+        from . import render  # Loaded on first draw so the game rules never need pygame
+        render.draw_piece(win, self)
 
     def move(self, row, col):
         """
@@ -73,7 +78,15 @@ class Piece:
         """
         self.row = row  # Update the row
         self.col = col  # Update the column
-        self.calc_pos()  # Recalculate the screen position for drawing
+
+    def __deepcopy__(self, memo):
+        """
+        Copies the piece without the generic slot-by-slot machinery of copy.deepcopy,
+        which boards copied for the search would otherwise go through for every piece.
+        """
+        piece = Piece.__new__(Piece)
+        piece.row, piece.col, piece.side, piece.king = self.row, self.col, self.side, self.king
+        return piece
 
     def __repr__(self):
         """
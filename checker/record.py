@@ -0,0 +1,479 @@
+"""
+Compact binary game records, used both for saved games and for the append-only move log
+the game writes as it is played. A save file is a header and one game; a log is a header
+and every game played since it was created, one after the other.
+
+After the header (MAGIC and a version byte), a game is a stream of records:
+    start  b'G', then POSITION: the masks, side to move and rules of the first position
+    move   2 bytes for a step, from and to square; a capture adds 32 to the from square
+           and is followed by the captured squares as a 32-bit mask
+    end    b'E', the result, then POSITION of the final position, so a replay can check it
+A game whose end record is missing (e.g. a log cut short by a crash) reads as unfinished.
+
+Replay and check archived games from the repository root:
+    python -m checker.record replay games.ckr
+    python -m checker.record show games.ckr
+    python -m checker.record convert selfplay.jsonl --out games.ckr
+"""
+import argparse
+import json
+import os
+import struct
+import time
+
+from .bitboard import BitBoard
+from .board import Board
+from .constants import YELLOW, PURPLE, YELLOW_ID, PURPLE_ID
+from .notation import move_to_text, parse_move
+from .rules import CASUAL, rules_named
+from .tables import SQUARE_OF, ROW_OF, COL_OF, squares
+
+MAGIC = b'CKGR'
+VERSION = 1
+POSITION = struct.Struct('<IIIB')  # Yellow, purple and king masks, then flags: 13 bytes
+CAPTURED = struct.Struct('<I')
+GAME, END = b'G'[0], b'E'[0]
+CAPTURE = 32  # Added to the from square of a move that captures
+YELLOW_TO_MOVE = 1  # Flag bit of POSITION; the rules are stored in the bits above it
+RULE_NAMES = ('casual', 'forced')  # Rules by their code in the flags
+BLOCK = 1 << 20  # Bytes read at a time when streaming a file
+
+# Results of a game as stored in its end record
+YELLOW_WINS, PURPLE_WINS, DRAW, UNFINISHED = range(4)
+RESULT_NAMES = ('yellow', 'purple', 'draw', 'unfinished')
+
+
+class GameRecord:
+    """
+    A game as it is stored: the first position, the moves played from it as BitBoard move
+    tuples (from square, to square, captured mask), the result, and the final position.
+    """
+    def __init__(self, yellow, purple, kings, yellow_to_move=False, rules=None, moves=None,
+                 result=UNFINISHED, final=None):
+        """
+        Initializes a game record.
+
+        Args:
+            yellow (int): The YELLOW pieces of the first position, one bit per square.
+            purple (int): The PURPLE pieces.
+            kings (int): The kings of both sides.
+            yellow_to_move (bool): True if YELLOW makes the first move.
+            rules (Rules): The rules of the game; CASUAL if not given.
+            moves (list): The moves played, in order.
+            result (int): YELLOW_WINS, PURPLE_WINS, DRAW or UNFINISHED.
+            final (tuple): The (yellow, purple, kings) masks after the last move, if known.
+        """
+        self.start = (yellow, purple, kings)
+        self.yellow_to_move = yellow_to_move
+        self.rules = rules or CASUAL
+        self.moves = moves if moves is not None else []
+        self.result = result
+        self.final = final
+
+    def board(self, evaluator=None):
+        """
+        Returns a Board holding the first position of the game.
+
+        Args:
+            evaluator (Evaluator): The evaluation weights of the board; the defaults if not given.
+        """
+        return BitBoard(*self.start, evaluator=evaluator, rules=self.rules).to_board()
+
+    def to_bytes(self):
+        """
+        Encodes the whole game: start record, moves and, when the final position is known, end record.
+        """
+        parts = [encode_start(*self.start, self.yellow_to_move, self.rules)]
+        parts.extend(encode_move(move) for move in self.moves)
+        if self.final is not None:
+            parts.append(encode_end(self.result, *self.final))
+        return b''.join(parts)
+
+    def __repr__(self):
+        return f"GameRecord({len(self.moves)} moves, {RESULT_NAMES[self.result]}, {self.rules.name} rules)"
+
+
+def encode_position(yellow, purple, kings, yellow_to_move, rules):
+    """
+    Encodes a position in POSITION's 13 bytes.
+    """
+    flags = (YELLOW_TO_MOVE if yellow_to_move else 0) | RULE_NAMES.index(rules.name) << 1
+    return POSITION.pack(yellow, purple, kings, flags)
+
+
+def encode_start(yellow, purple, kings, yellow_to_move, rules):
+    """
+    Encodes the start record of a game.
+
+    Args:
+        yellow (int): The YELLOW pieces of the first position.
+        purple (int): The PURPLE pieces.
+        kings (int): The kings.
+        yellow_to_move (bool): True if YELLOW moves first.
+        rules (Rules): The rules of the game.
+
+    Returns:
+        bytes: The 14-byte record.
+    """
+    return bytes((GAME,)) + encode_position(yellow, purple, kings, yellow_to_move, rules)
+
+
+def encode_move(move):
+    """
+    Encodes a move record.
+
+    Args:
+        move (tuple): A BitBoard move tuple (from square, to square, captured mask).
+
+    Returns:
+        bytes: 2 bytes for a step, 6 for a capture.
+    """
+    start, end, captured = move
+    if captured:
+        return bytes((CAPTURE + start, end)) + CAPTURED.pack(captured)
+    return bytes((start, end))
+
+
+def encode_end(result, yellow, purple, kings):
+    """
+    Encodes the end record of a game.
+
+    Args:
+        result (int): YELLOW_WINS, PURPLE_WINS, DRAW or UNFINISHED.
+        yellow (int): The YELLOW pieces of the final position.
+        purple (int): The PURPLE pieces.
+        kings (int): The kings.
+
+    Returns:
+        bytes: The 15-byte record.
+    """
+    return bytes((END, result)) + POSITION.pack(yellow, purple, kings, 0)
+
+
+def board_move(piece, row, col, skipped):
+    """
+    Returns a move made on a Board as a BitBoard move tuple, e.g. for encode_move.
+
+    Args:
+        piece (Piece): The piece that moves, still on its square.
+        row (int): The row it moves to.
+        col (int): The column it moves to.
+        skipped (list): The pieces it captures.
+
+    Returns:
+        tuple: (from square, to square, captured mask).
+    """
+    captured = 0
+    for taken in skipped:
+        captured |= 1 << SQUARE_OF[(taken.row, taken.col)]
+    return SQUARE_OF[(piece.row, piece.col)], SQUARE_OF[(row, col)], captured
+
+
+def write_header(file):
+    """
+    Writes the header every save file and log starts with.
+    """
+    file.write(MAGIC + bytes((VERSION,)))
+
+
+def _record_size(tag):
+    """
+    Helper that returns the length of the record starting with a tag byte.
+    """
+    if tag < CAPTURE:
+        return 2
+    if tag < 2 * CAPTURE:
+        return 2 + CAPTURED.size
+    return 1 + POSITION.size if tag == GAME else 2 + POSITION.size
+
+
+def read_games(file):
+    """
+    Reads the games of a save file or log, streaming it in blocks so that archives of any
+    size can be read.
+
+    Args:
+        file: A binary file object positioned at the start of the file.
+
+    Yields:
+        GameRecord: Every game, in order; a game without an end record is UNFINISHED.
+
+    Raises:
+        ValueError: If the file is not a game record file of a known version, or is corrupt.
+    """
+    header = file.read(len(MAGIC) + 1)
+    if len(header) <= len(MAGIC) or header[:len(MAGIC)] != MAGIC:
+        raise ValueError('not a game record file')
+    if header[len(MAGIC)] > VERSION:
+        raise ValueError(f"game record version {header[len(MAGIC)]} is newer than this reader ({VERSION})")
+    data, index, game = b'', 0, None
+    longest = 2 + POSITION.size  # The longest record, the end record
+    while True:
+        if len(data) - index < longest:
+            # Keep the unread tail and read the next block after it
+            block = file.read(BLOCK)
+            data, index = data[index:] + block, 0
+            if not data:
+                break
+            if len(data) < _record_size(data[0]):
+                raise ValueError('game record file cut short in the middle of a record')
+        tag = data[index]
+        if game is None and tag != GAME:
+            raise ValueError(f"corrupt game record: tag {tag} outside of a game")
+        if tag < 2 * CAPTURE and data[index + 1] >= 32:
+            raise ValueError(f"corrupt game record: move to square {data[index + 1]}")
+        if tag < CAPTURE:
+            game.moves.append((tag, data[index + 1], 0))
+            index += 2
+        elif tag < 2 * CAPTURE:
+            game.moves.append((tag - CAPTURE, data[index + 1], CAPTURED.unpack_from(data, index + 2)[0]))
+            index += 2 + CAPTURED.size
+        elif tag == GAME:
+            if game is not None:
+                yield game
+            yellow, purple, kings, flags = POSITION.unpack_from(data, index + 1)
+            if flags >> 1 >= len(RULE_NAMES):
+                raise ValueError(f"corrupt game record: unknown rules {flags >> 1}")
+            game = GameRecord(yellow, purple, kings, bool(flags & YELLOW_TO_MOVE), rules_named(RULE_NAMES[flags >> 1]))
+            index += 1 + POSITION.size
+        elif tag == END:
+            if data[index + 1] >= len(RESULT_NAMES):
+                raise ValueError(f"corrupt game record: unknown result {data[index + 1]}")
+            game.result = data[index + 1]
+            game.final = POSITION.unpack_from(data, index + 2)[:3]
+            index += 2 + POSITION.size
+            yield game
+            game = None
+        else:
+            raise ValueError(f"corrupt game record: unknown tag {tag}")
+    if game is not None:
+        yield game
+
+
+def save(path, record):
+    """
+    Writes a game to a save file, replacing it.
+
+    Args:
+        path (str): The save file.
+        record (GameRecord): The game; its final position should be set so load can check it.
+    """
+    with open(path, 'wb') as file:
+        write_header(file)
+        file.write(record.to_bytes())
+
+
+def load(path):
+    """
+    Reads the game of a save file.
+
+    Args:
+        path (str): The save file.
+
+    Returns:
+        GameRecord: The saved game.
+
+    Raises:
+        ValueError: If the file holds no game.
+    """
+    with open(path, 'rb') as file:
+        for record in read_games(file):
+            return record
+    raise ValueError(f"no game in {path}")
+
+
+class MoveLog:
+    """
+    The append-only log of the games played: every move is written and flushed as soon
+    as it is played, so a game survives the program stopping in the middle of it.
+    """
+    def __init__(self, path):
+        """
+        Opens the log for appending, creating it with a header if it does not exist.
+
+        Args:
+            path (str): The log file.
+        """
+        self.path = path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            write_header(self.file)
+            self.file.flush()
+        self.playing = False  # Whether a started game has no end record yet
+
+    def start(self, board, yellow_to_move):
+        """
+        Writes the start of a new game. A game started before without an end record
+        reads back as unfinished.
+
+        Args:
+            board: The first position (a Board or a BitBoard).
+            yellow_to_move (bool): True if YELLOW moves first.
+        """
+        self._write(encode_start(board.yellow, board.purple, board.kings, yellow_to_move, board.rules))
+        self.playing = True
+
+    def resume(self, record):
+        """
+        Starts a new game that continues a recorded one, e.g. a loaded save, writing its moves so far.
+
+        Args:
+            record (GameRecord): The game; its end record is not written.
+        """
+        self._write(GameRecord(*record.start, record.yellow_to_move, record.rules, record.moves).to_bytes())
+        self.playing = True
+
+    def move(self, move):
+        """
+        Writes a move of the current game.
+
+        Args:
+            move (tuple): A BitBoard move tuple.
+        """
+        self._write(encode_move(move))
+
+    def end(self, result, board):
+        """
+        Writes the end of the current game; does nothing if no game is being played.
+
+        Args:
+            result (int): YELLOW_WINS, PURPLE_WINS, DRAW or UNFINISHED.
+            board: The final position.
+        """
+        if self.playing:
+            self._write(encode_end(result, board.yellow, board.purple, board.kings))
+            self.playing = False
+
+    def close(self):
+        """
+        Closes the log; an unfinished game stays without an end record.
+        """
+        self.file.close()
+
+    def _write(self, data):
+        """
+        Helper that appends a record and flushes it to the operating system.
+        """
+        self.file.write(data)
+        self.file.flush()
+
+
+def replay(record, evaluator=None, check_legal=False):
+    """
+    Plays a recorded game back on a Board through Board.move and Board.remove, checking
+    every move against the board, and the final position against the end record.
+
+    Args:
+        record (GameRecord): The game.
+        evaluator (Evaluator): The evaluation weights of the board; the defaults if not given.
+        check_legal (bool): Also check every move against the legal moves of the rules,
+            which takes a move generation per move.
+
+    Returns:
+        Board: The board after the last move.
+
+    Raises:
+        ValueError: If a move does not fit the board or the final position differs.
+    """
+    board, side = record.board(evaluator), YELLOW_ID if record.yellow_to_move else PURPLE_ID
+    grid = board.board
+    for number, move in enumerate(record.moves, 1):
+        start, end, captured = move
+        piece = grid[ROW_OF[start]][COL_OF[start]]
+        if piece == 0 or piece.side != side or grid[ROW_OF[end]][COL_OF[end]] != 0:
+            raise ValueError(f"move {number} ({move_to_text(move)}) does not fit the board")
+        if check_legal:
+            position = BitBoard(board.yellow, board.purple, board.kings, rules=board.rules)
+            if move not in position.get_all_moves(YELLOW if side == YELLOW_ID else PURPLE):
+                raise ValueError(f"move {number} ({move_to_text(move)}) is not legal")
+        board.move(piece, ROW_OF[end], COL_OF[end])
+        if captured:
+            skipped = [grid[ROW_OF[square]][COL_OF[square]] for square in squares(captured)]
+            if any(taken == 0 or taken.side == side for taken in skipped):
+                raise ValueError(f"move {number} ({move_to_text(move)}) captures no opposing piece")
+            board.remove(skipped)
+        side ^= 1
+    if record.final is not None and record.final != (board.yellow, board.purple, board.kings):
+        raise ValueError('the final position differs from the recorded one')
+    return board
+
+
+def convert_selfplay(source, out):
+    """
+    Converts the games of a selfplay.py results file (one JSON record per line) to a log.
+
+    Returns:
+        int: The number of games written.
+    """
+    count = 0
+    with open(source) as lines, open(out, 'wb') as file:
+        write_header(file)
+        for line in lines:
+            if not line.strip():
+                continue
+            game = json.loads(line)
+            rules = rules_named(game.get('rules', 'casual'))
+            position, color = BitBoard.from_board(Board(rules=rules)), PURPLE
+            record = GameRecord(position.yellow, position.purple, position.kings, False, rules)
+            for text in game['moves']:
+                move = parse_move(position, text, color)
+                record.moves.append(move)
+                position.make_move(move)
+                color = YELLOW if color == PURPLE else PURPLE
+            if game['result'] == 'draw':
+                record.result = DRAW
+            else:
+                record.result = YELLOW_WINS if game['result'] == game['yellow'] else PURPLE_WINS
+            record.final = (position.yellow, position.purple, position.kings)
+            file.write(record.to_bytes())
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    replay_parser = commands.add_parser('replay', help='replay and check every game of files')
+    replay_parser.add_argument('files', nargs='+')
+    replay_parser.add_argument('--legal', action='store_true', help='also check every move is legal')
+    show = commands.add_parser('show', help='list the games of a file')
+    show.add_argument('file')
+    convert = commands.add_parser('convert', help='convert selfplay.py results to a log')
+    convert.add_argument('source')
+    convert.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    if args.command == 'replay':
+        games = moves = failed = 0
+        start = time.perf_counter()
+        for path in args.files:
+            with open(path, 'rb') as file:
+                try:
+                    for record in read_games(file):
+                        games += 1
+                        moves += len(record.moves)
+                        try:
+                            replay(record, check_legal=args.legal)
+                        except ValueError as error:
+                            failed += 1
+                            print(f"{path}: game {games}: {error}")
+                except ValueError as error:
+                    # The rest of a corrupt file cannot be read
+                    failed += 1
+                    print(f"{path}: {error}")
+        elapsed = time.perf_counter() - start
+        print(f"{games} games, {moves} moves replayed in {elapsed:.2f}s "
+              f"({games / elapsed if elapsed else 0:.0f} games/s), {failed} failed")
+    elif args.command == 'show':
+        with open(args.file, 'rb') as file:
+            for number, record in enumerate(read_games(file), 1):
+                print(f"{number}: {RESULT_NAMES[record.result]} after {len(record.moves)} moves, "
+                      f"{record.rules.name} rules: {' '.join(map(move_to_text, record.moves))}")
+    else:
+        size = os.path.getsize(args.source)
+        count = convert_selfplay(args.source, args.out)
+        print(f"{count} games converted, {size} bytes of JSON -> {os.path.getsize(args.out)} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+# Pygame drawing of the board and pieces. Only the GUI imports this module, so the
+# rules and the search can run without pygame or the image assets.
+import os
+
+import pygame
+from .constants import WHITE, ROWS, COLS, PINK, SQUARE_SIZE, GREY, BLUE, WIDTH, HEIGHT
+
+CROWN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'crown.png')
+_crown = None  # Crown image, loaded the first time a king is drawn
+_squares = None  # The empty checkerboard, drawn once
+EMPTY = (None, False, False)  # How BoardRenderer sees an empty square without a hint
+
+
+def crown():
+    """
+    Returns the crown image drawn on kings, loading and scaling it on first use.
+
+    Returns:
+        pygame.Surface: The crown image.
+    """
+    global _crown
+    if _crown is None:
+        _crown = pygame.transform.scale(pygame.image.load(CROWN_PATH), (44, 25))
+    return _crown
+
+
+def draw_squares(win):
+    """
+    Draws the alternating squares on the board using Pygame.
+
+    Args:
+        win (pygame.Surface): The window surface to draw the squares.
+    """
+    win.fill(PINK)  # Fill the background with the pink color
+    for row in range(ROWS):  # Loop through the rows
+        for col in range(row % 2, COLS, 2):  # Loop through columns with alternating colors
+            pygame.draw.rect(win, WHITE, (row * SQUARE_SIZE, col * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+
+
+def squares_surface():
+    """
+    Returns the empty checkerboard, drawing it onto its own surface on first use so that
+    later frames only copy the parts they need.
+
+    Returns:
+        pygame.Surface: The board without pieces, the size of the window.
+    """
+    global _squares
+    if _squares is None:
+        _squares = pygame.Surface((WIDTH, HEIGHT))
+        draw_squares(_squares)
+    return _squares
+
+
+def draw_piece(win, piece):
+    """
+    Draws a piece on the game window.
+
+    Args:
+        win (pygame.Surface): The window surface where the piece will be drawn.
+        piece (Piece): The piece to draw.
+    """
+    # Radius of the piece (slightly smaller than a square for padding)
+    radius = SQUARE_SIZE // 2 - piece.PADDING
+
+    # Draw the outer border of the piece (GREY outline)
+    pygame.draw.circle(win, GREY, (piece.x, piece.y), radius + piece.OUTLINE)
+    # Draw the inner circle representing the piece (color-filled)
+    pygame.draw.circle(win, piece.color, (piece.x, piece.y), radius)
+
+    # If the piece is a king, draw the crown symbol at its center
+    if piece.king:
+        image = crown()
+        # Center the crown image on the piece
+        win.blit(image, (piece.x - image.get_width() // 2, piece.y - image.get_height() // 2))
+
+
+def draw_board(win, board):
+    """
+    Draws the board and all the pieces on the game window.
+
+    Args:
+        win (pygame.Surface): The window surface to draw the board and pieces on.
+        board (Board): The board to draw.
+    """
+    draw_squares(win)  # Draw the squares on the board
+    for row in range(ROWS):  # Loop through the rows
+        for col in range(COLS):  # Loop through the columns
+            piece = board.board[row][col]  # Get the piece at the current position
+            if piece != 0:  # If there is a piece, draw it
+                draw_piece(win, piece)
+
+
+def draw_valid_moves(win, moves):
+    """
+    Draws the valid moves for the selected piece as circles on the board.
+
+    Args:
+        win (pygame.Surface): The window surface to draw on.
+        moves (iterable): The (row, col) positions the selected piece can move to.
+    """
+    for row, col in moves:  # Loop through each valid move
+        # Draw a blue circle to indicate the valid move position
+        pygame.draw.circle(win, BLUE, (col * SQUARE_SIZE + SQUARE_SIZE // 2,
+                                       row * SQUARE_SIZE + SQUARE_SIZE // 2), 15)
+
+
+def update_display(rects=None):
+    """
+    Pushes everything drawn so far to the screen.
+
+    Args:
+        rects (list): The areas that changed; the whole window if not given. Nothing is
+            pushed when the list is empty.
+    """
+    if rects is None:
+        pygame.display.update()
+    elif rects:
+        pygame.display.update(rects)
+
+
+class BoardRenderer:
+    """
+    Draws the board into a window frame after frame, repainting only the squares whose
+    piece or move hint changed since the last frame. The empty checkerboard is copied from
+    squares_surface, and draw returns the changed areas for update_display, so an idle
+    board costs a comparison of 64 squares per frame instead of a full repaint and flip.
+    """
+    def __init__(self):
+        """
+        Initializes the renderer; the first frame repaints the whole window.
+        """
+        self.drawn = None  # What each square showed in the last frame, row by row
+
+    def invalidate(self):
+        """
+        Makes the next frame repaint the whole window, e.g. after something else was drawn over it.
+        """
+        self.drawn = None
+
+    def draw(self, win, board, valid_moves):
+        """
+        Brings the window up to date with a board and the move hints of the selected piece.
+
+        Args:
+            win (pygame.Surface): The window surface.
+            board (Board): The board to draw.
+            valid_moves (iterable): The (row, col) squares to mark as valid moves.
+
+        Returns:
+            list: The rectangles that were repainted, for update_display.
+        """
+        # What every square shows: (side, king, hint), with side None on an empty square
+        shown = []
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = board.board[row][col]
+                shown.append(EMPTY if piece == 0 else (piece.side, piece.king, False))
+        for row, col in valid_moves:
+            side, king, _ = shown[row * COLS + col]
+            shown[row * COLS + col] = (side, king, True)
+        background = squares_surface()
+        if self.drawn is None:
+            # Everything: the board, then the squares with a piece or hint like any changed square
+            win.blit(background, (0, 0))
+            changed = [index for index, square in enumerate(shown) if square != EMPTY]
+            rects = [pygame.Rect(0, 0, WIDTH, HEIGHT)]
+        else:
+            changed = [index for index, square in enumerate(shown) if square != self.drawn[index]]
+            rects = []
+        for index in changed:
+            row, col = divmod(index, COLS)
+            rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+            if self.drawn is not None:
+                win.blit(background, rect, rect)  # Only pieces and hints fit inside their square
+                rects.append(rect)
+            piece = board.board[row][col]
+            if piece != 0:
+                draw_piece(win, piece)
+            if shown[index][2]:
+                draw_valid_moves(win, ((row, col),))
+        self.drawn = shown
+        return rects
@@ -0,0 +1,60 @@
+# Rule variants the game can be played with
+from .movegen import generate_moves, piece_moves, generate_forced, piece_moves_forced
+
+
+class Rules:
+    """
+    A variant of the rules. Boards carry their rules like their evaluator, so move
+    generation, the search and everything built on them follow the variant of the game
+    being played without extra arguments.
+    """
+    def __init__(self, name, forced_capture):
+        """
+        Initializes the variant.
+
+        Args:
+            name (str): The name used on the command line and when positions are sent to other processes.
+            forced_capture (bool): Whether a side that can capture must capture, and keep jumping
+                until the capturing piece cannot jump any further.
+        """
+        self.name = name
+        self.forced_capture = forced_capture
+        # Move generators with the signatures of movegen.generate_moves and movegen.piece_moves
+        self.generate = generate_forced if forced_capture else generate_moves
+        self.piece_moves = piece_moves_forced if forced_capture else piece_moves
+
+    def __repr__(self):
+        return f"Rules({self.name!r})"
+
+    def __reduce__(self):
+        return rules_named, (self.name,)  # Unpickles to the shared instance, so rules compare by identity
+
+    def __deepcopy__(self, memo):
+        return self  # Rules never change, so copied boards share them
+
+
+# Captures are optional and a multi-jump may stop on any landing square: how the game was first written
+CASUAL = Rules('casual', forced_capture=False)
+# Captures are mandatory and multi-jumps are played to the end, as in English draughts
+FORCED_CAPTURE = Rules('forced', forced_capture=True)
+
+RULES = {rules.name: rules for rules in (CASUAL, FORCED_CAPTURE)}
+
+
+def rules_named(name):
+    """
+    Returns the rules of a name.
+
+    Args:
+        name (str): A key of RULES.
+
+    Returns:
+        Rules: The shared instance.
+
+    Raises:
+        ValueError: If there are no such rules.
+    """
+    try:
+        return RULES[name]
+    except KeyError:
+        raise ValueError(f"unknown rules {name!r}; expected one of {', '.join(RULES)}") from None
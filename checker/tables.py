@@ -0,0 +1,115 @@
+# Square numbering and precomputed move tables shared by Board, BitBoard and the evaluator
+from .constants import ROWS, COLS
+
+# The 32 dark squares are numbered row by row: square = row * 4 + col // 2.
+# Pieces only ever stand on dark squares, so one bit per dark square is enough.
+SQUARES = 32
+FULL = (1 << SQUARES) - 1  # Every dark square
+
+# Diagonal directions, named after the row and column change of a step
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = 0, 1, 2, 3
+UP = (UP_LEFT, UP_RIGHT)  # Directions a PURPLE man (or a king) may move in
+DOWN = (DOWN_LEFT, DOWN_RIGHT)  # Directions a YELLOW man (or a king) may move in
+
+# Row and column of every square, and the square of every dark (row, col)
+ROW_OF = tuple(square // 4 for square in range(SQUARES))
+COL_OF = tuple(2 * (square % 4) + (1 - (square // 4) % 2) for square in range(SQUARES))
+SQUARE_OF = {(ROW_OF[square], COL_OF[square]): square for square in range(SQUARES)}
+
+# Bits of the squares on even and odd rows; the diagonal shift depends on the row parity
+EVEN_ROWS = sum(1 << square for square in range(SQUARES) if ROW_OF[square] % 2 == 0)
+ODD_ROWS = FULL & ~EVEN_ROWS
+
+# Shift applied to a square index to reach its diagonal neighbour, as (even row, odd row)
+SHIFTS = {
+    UP_LEFT: (-4, -5),
+    UP_RIGHT: (-3, -4),
+    DOWN_LEFT: (4, 3),
+    DOWN_RIGHT: (5, 4),
+}
+
+# Squares that have a neighbour in each direction (the others would fall off the board)
+MASKS = {
+    direction: sum(
+        1 << square for square in range(SQUARES)
+        if 0 <= ROW_OF[square] + (1 if direction in DOWN else -1) < ROWS
+        and 0 <= COL_OF[square] + (1 if direction in (UP_RIGHT, DOWN_RIGHT) else -1) < COLS
+    )
+    for direction in SHIFTS
+}
+
+# Top and bottom rows, where pieces are crowned
+PROMOTION = sum(1 << square for square in range(SQUARES) if ROW_OF[square] in (0, ROWS - 1))
+
+
+def shift(mask, direction):
+    """
+    Moves every set bit of a mask one diagonal step in the given direction.
+    Bits that would leave the board are dropped.
+
+    Args:
+        mask (int): The squares to move.
+        direction (int): One of UP_LEFT, UP_RIGHT, DOWN_LEFT or DOWN_RIGHT.
+
+    Returns:
+        int: The mask of neighbouring squares.
+    """
+    even, odd = SHIFTS[direction]
+    mask &= MASKS[direction]
+    even_part, odd_part = mask & EVEN_ROWS, mask & ODD_ROWS
+    even_part = even_part << even if even > 0 else even_part >> -even
+    odd_part = odd_part << odd if odd > 0 else odd_part >> -odd
+    return even_part | odd_part
+
+
+# Masks of the squares whose step in a direction is a shift by 3, 4 or 5, for whole-board shifts
+_DOWN_3 = MASKS[DOWN_LEFT] & ODD_ROWS
+_DOWN_4 = (MASKS[DOWN_LEFT] & EVEN_ROWS) | (MASKS[DOWN_RIGHT] & ODD_ROWS)
+_DOWN_5 = MASKS[DOWN_RIGHT] & EVEN_ROWS
+_UP_3 = MASKS[UP_RIGHT] & EVEN_ROWS
+_UP_4 = (MASKS[UP_LEFT] & EVEN_ROWS) | (MASKS[UP_RIGHT] & ODD_ROWS)
+_UP_5 = MASKS[UP_LEFT] & ODD_ROWS
+
+
+def shift_down(mask):
+    """
+    Returns every square one diagonal step down (towards the last row) from a set bit, in
+    either direction. Equivalent to shift(mask, DOWN_LEFT) | shift(mask, DOWN_RIGHT), but faster.
+    """
+    return ((mask & _DOWN_3) << 3) | ((mask & _DOWN_4) << 4) | ((mask & _DOWN_5) << 5)
+
+
+def shift_up(mask):
+    """
+    Returns every square one diagonal step up (towards the first row) from a set bit, in
+    either direction. Equivalent to shift(mask, UP_LEFT) | shift(mask, UP_RIGHT), but faster.
+    """
+    return ((mask & _UP_3) >> 3) | ((mask & _UP_4) >> 4) | ((mask & _UP_5) >> 5)
+
+
+# Neighbour and jump-landing square of every square in every direction, or -1 if off the board
+NEIGHBOURS = tuple(
+    tuple((shift(1 << square, direction).bit_length() - 1) for square in range(SQUARES))
+    for direction in range(4)
+)
+JUMPS = tuple(
+    tuple(NEIGHBOURS[direction][NEIGHBOURS[direction][square]] if NEIGHBOURS[direction][square] >= 0 else -1
+          for square in range(SQUARES))
+    for direction in range(4)
+)
+
+
+def squares(mask):
+    """
+    Yields the square index of every set bit in a mask, lowest square first.
+
+    Args:
+        mask (int): The mask to iterate over.
+
+    Yields:
+        int: The square indices.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
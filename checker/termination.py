@@ -0,0 +1,93 @@
+# When a game is over: a side to move without a legal move loses, and repeated positions
+# or a long run of moves without progress are drawn
+from .constants import YELLOW, PURPLE
+from .zobrist import SIDE_KEY
+
+DRAW = 'draw'  # Result of a drawn game, alongside the winning colours YELLOW and PURPLE
+REPETITIONS = 3  # The same position with the same side to move this often is a draw
+QUIET_PLIES = 80  # Moves in a row without a capture or a man moving (40 per side) draw the game
+
+
+def irreversible(position, move):
+    """
+    Returns whether a move can never be undone by later moves: a capture, or a man's move
+    (men only move forwards). Positions from before such a move cannot occur again.
+
+    Args:
+        position: The position before the move (a Board or a BitBoard).
+        move (tuple): A BitBoard move tuple (from square, to square, captured mask).
+
+    Returns:
+        bool: True for a capture or a man's move.
+    """
+    return bool(move[2]) or not position.kings >> move[0] & 1
+
+
+class GameHistory:
+    """
+    The positions of a game since its last irreversible move, kept as counts of position
+    hashes, for the draw rules: a position repeated REPETITIONS times, or QUIET_PLIES moves
+    without a capture or a man's move. Each move costs a dictionary update.
+    """
+    def __init__(self, position, yellow_to_move):
+        """
+        Starts the history of a game.
+
+        Args:
+            position: The first position (a Board or a BitBoard).
+            yellow_to_move (bool): True if YELLOW moves first.
+        """
+        self.counts = {}  # Position key -> times seen since the last irreversible move
+        self.quiet = 0  # Moves since the last irreversible move
+        self.draw = None  # Why the game is drawn ('repetition' or 'no progress'), or None
+        self._count(position, yellow_to_move)
+
+    def push(self, position, yellow_to_move, reset):
+        """
+        Records the position reached by a move.
+
+        Args:
+            position: The position after the move.
+            yellow_to_move (bool): True if YELLOW is to move in it.
+            reset (bool): Whether the move was irreversible (see irreversible), so that no
+                earlier position can come back.
+        """
+        if reset:
+            self.counts.clear()
+            self.quiet = 0
+        else:
+            self.quiet += 1
+            if self.quiet >= QUIET_PLIES:
+                self.draw = 'no progress'
+        self._count(position, yellow_to_move)
+
+    def _count(self, position, yellow_to_move):
+        """
+        Helper that counts a position and notes a draw by repetition.
+        """
+        key = position.zobrist ^ SIDE_KEY if yellow_to_move else position.zobrist
+        seen = self.counts.get(key, 0) + 1
+        self.counts[key] = seen
+        if seen >= REPETITIONS:
+            self.draw = 'repetition'
+
+
+def game_result(position, color, history=None):
+    """
+    Returns the result of a game if it is over. The side to move loses when it has no
+    legal move, which includes having no pieces left. Both checks are cheap: has_moves uses
+    no move generation, and the history notes draws as the moves are pushed.
+
+    Args:
+        position: The current position (a Board or a BitBoard).
+        color (tuple): The side to move (YELLOW or PURPLE).
+        history (GameHistory): The game so far, for the draw rules; None to ignore draws.
+
+    Returns:
+        YELLOW or PURPLE for the winner, DRAW, or None while the game goes on.
+    """
+    if not position.has_moves(color):
+        return PURPLE if color == YELLOW else YELLOW
+    if history is not None and history.draw is not None:
+        return DRAW
+    return None
@@ -0,0 +1,63 @@
+# Zobrist hashing of board positions
+from .constants import ROWS, COLS, PURPLE
+
+MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(seed):
+    """
+    Generates pseudo-random 64-bit keys with SplitMix64. It is a few lines of integer
+    arithmetic, so hashing does not pull in the random module at import time.
+
+    Args:
+        seed (int): The starting state.
+
+    Yields:
+        int: The next 64-bit key.
+    """
+    state = seed
+    while True:
+        state = (state + 0x9E3779B97F4A7C15) & MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        yield z ^ (z >> 31)
+
+
+# One random 64-bit key per (kind of piece, row, col); the kinds are
+# YELLOW man, YELLOW king, PURPLE man and PURPLE king, in that order.
+# A fixed seed keeps hashes identical between runs and processes.
+_keys = _splitmix64(0x5EED)
+PIECE_KEYS = tuple(
+    tuple(tuple(next(_keys) for _ in range(COLS)) for _ in range(ROWS))
+    for _ in range(4)
+)
+SIDE_KEY = next(_keys)  # Mixed in when the maximizing (YELLOW) player is to move
+
+
+def kind(color, king):
+    """
+    Returns the index of a kind of piece in PIECE_KEYS.
+
+    Args:
+        color (tuple): The color of the piece (YELLOW or PURPLE).
+        king (bool): Whether the piece is a king.
+
+    Returns:
+        int: 0 to 3.
+    """
+    return (2 if color == PURPLE else 0) + (1 if king else 0)
+
+
+def piece_key(piece):
+    """
+    Returns the key of a piece standing on its current square.
+
+    Args:
+        piece (Piece): The piece to hash.
+
+    Returns:
+        int: The 64-bit key.
+    """
+    return PIECE_KEYS[2 * piece.side + piece.king][piece.row][piece.col]  # Side IDs follow the kind order
+
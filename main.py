@@ -1,12 +1,18 @@
 import pygame  # For graphics and game functionality
 from checker.constants import WIDTH, HEIGHT, SQUARE_SIZE, PURPLE, YELLOW, BLACK, FONT_SIZE  # Constants used in the game
 from checker.game import Game  # Game class to manage game logic
-from minimax.algorithm import minimax  # Minimax algorithm for AI decisions
+from checker.evaluation import Evaluator  # Weighted evaluation used by the AI
+from minimax.tablebase import TABLEBASE_DIR  # Endgame tables, used when they have been generated
+from minimax.book import BOOK_FILE, OpeningBook  # Opening book, used when it has been built
+from checker.rules import rules_named  # Casual or forced-capture rules
+from checker.record import MoveLog  # Append-only binary log of the games played
+from checker.termination import DRAW  # Result of a drawn game
+import time  # For measuring frame times
 import gtts
 import playsound as py
 from os import path
 import os
-import pickle
+import json
 
 def speak(msg):
     vd = gtts.gTTS(msg, lang='en-au')
@@ -16,8 +22,17 @@ def speak(msg):
     vd.save('temp_audio.mp3')
     py.playsound('temp_audio.mp3')
 
-Frame rate per second for smooth gameplay
+# Frame rate per second for smooth gameplay
 FPS = 60
+AI_TIME_MS = 200  # Time budget for each AI move, in milliseconds
+WEIGHTS_FILE = 'weights.json'  # Evaluation weights for the AI, used when the file exists
+SEARCH_STATS_FILE = None  # Set to e.g. 'search-stats.jsonl' to log detailed statistics of every AI search
+RULES = 'casual'  # Set to 'forced' to make captures mandatory and multi-jumps go to the end
+SEARCH_CACHE_MB = 16  # Memory cap of the search state the AI keeps between its moves (0 for none)
+PONDER = True  # Let the AI think on the expected reply during the human's turn
+MOVE_LOG_FILE = 'games.ckr'  # Every game played is appended here as it is played (None for no log)
+SAVE_FILE = 'savegame.ckr'  # Written with S and read back with L
+WINNER_NAMES = {YELLOW: 'AI', PURPLE: 'Human', DRAW: 'Draw'}  # How each result of Game.winner is shown
 
 # Creating the game window with predefined dimensions
 WIN = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -44,7 +59,7 @@ def display_winner(winner, time_taken):
     Displays the winner and the total time taken at the end of the game.
     
     Args:
-        winner (str): The winner of the game ("AI" or "Human").
+        winner (str): The winner of the game ("AI", "Human" or "Draw").
         time_taken (int): The total time the game took in seconds.
     """
     font = pygame.font.SysFont('Times New Roman', FONT_SIZE)
@@ -56,35 +71,6 @@ def display_winner(winner, time_taken):
     # speak(f"The winner is {winner}! Well played!")
     pygame.display.update()
 
-   
-def winner(self):
-    """
-    Determines the outcome of the game.
-
-    Returns:
-        str: "Human", "AI", "Draw", or None if no winner yet.
-    """
-    # Check if the human (Purple) has no pieces or cannot move
-    human_pieces = self.get_all_pieces(PURPLE)
-    if not human_pieces or not self.can_move(PURPLE):
-        if not self.can_move(YELLOW):  # If AI also cannot move, it's a draw
-            return "Draw"
-        return "AI"  # AI wins if only Human cannot move
-
-    # Check if the AI (Yellow) has no pieces or cannot move
-    ai_pieces = self.get_all_pieces(YELLOW)
-    if not ai_pieces or not self.can_move(YELLOW):
-        if not self.can_move(PURPLE):  # If Human also cannot move, it's a draw
-            return "Draw"
-        return "Human"  # Human wins if only AI cannot move
-
-    # Check for a draw when both sides have only one piece
-    if len(human_pieces) == 1 and len(ai_pieces) == 1 and not self.can_move(PURPLE) and not self.can_move(YELLOW):
-        return "Draw"
-    if len(human_pieces)==1 and not self.can_move(PURPLE):
-        return "Draw"
-
-    return None  # No winner yet
 
 # Main function to run the game loop
 def main():
@@ -111,25 +97,42 @@ def main():
     # Start the game
     run = True  # Boolean to control the main game loop
     clock = pygame.time.Clock()  # Clock to control frame rate
-    game = Game(WIN)  # Create an instance of the Game class
+    evaluator = Evaluator.load(WEIGHTS_FILE) if path.exists(WEIGHTS_FILE) else None
+    tablebase_dir = TABLEBASE_DIR if path.isdir(TABLEBASE_DIR) else None
+    book = OpeningBook(BOOK_FILE) if path.exists(BOOK_FILE) else None
+    log = MoveLog(MOVE_LOG_FILE) if MOVE_LOG_FILE else None
+    game = Game(WIN, evaluator, tablebase_dir, book, rules_named(RULES), SEARCH_CACHE_MB, PONDER, log)  # Create an instance of the Game class
 
     # Track the start time of the game
     start_time = pygame.time.get_ticks()
+    search_frames = []  # Time spent on each frame while the AI was thinking, in milliseconds
 
     # Main game loop
     while run:
         clock.tick(FPS)  # Limit the loop to the defined frames per second
+        frame_start = time.perf_counter()
+        thinking = game.ai_thinking()
 
-    # AI Move: If it's the AI's turn (Yellow), compute the best move
+    # AI Move: If it's the AI's turn (Yellow), search for the best move in the background
         if game.turn == YELLOW:
-            value, new_board = minimax(game.get_board(), 4, YELLOW, game)  # Depth set to 4
-            game.ai_move(new_board)  # Apply the best move determined by the minimax algorithm
+            # Deepens until the time budget is used; no-op while searching
+            game.start_ai_move(AI_TIME_MS, collect_stats=SEARCH_STATS_FILE is not None)
+            result = game.poll_ai_move()  # Applies the move once the search has finished
+            if result is not None and result.nodes == 0:
+                print("AI played from the opening book")
+            elif result is not None:
+                print(f"AI searched to depth {result.depth} at {result.nps:.0f} nodes/s")
+                if result.stats is not None:
+                    with open(SEARCH_STATS_FILE, 'a') as file:
+                        file.write(json.dumps(result.stats.to_dict()) + '\n')
+        else:
+            game.keep_pondering()  # No-op unless the AI is pondering the human's expected reply
 
     # Check for a winner
         winner = game.winner()  # Get the winner (if any)
         if winner is not None:
             time_taken = (pygame.time.get_ticks() - start_time) // 1000  # Calculate time in seconds
-            display_winner(winner, time_taken)  # Display winner and time
+            display_winner(WINNER_NAMES[winner], time_taken)  # Display winner and time
             pygame.time.delay(10000)  # Wait for 10 seconds before quitting
             run = False  # Exit the loop
 
@@ -137,21 +140,35 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:  # If the close button is clicked
                 run = False  # Exit the loop
+            if event.type == pygame.VIDEOEXPOSE:  # If the window was uncovered, paint all of it again
+                game.redraw()
         
-            # if event.type == pygame.KEYDOWN:
-            #     if event.key == pygame.K_s:  # Press 'S' to save the game
-            #         save_game(game)
-            #     elif event.key == pygame.K_l:  # Press 'L' to load the game
-            #         game = load_game()
-
-            if event.type == pygame.MOUSEBUTTONDOWN:  # If the mouse is clicked
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_s:  # Press 'S' to save the game
+                    game.save(SAVE_FILE)
+                elif event.key == pygame.K_l and path.exists(SAVE_FILE):  # Press 'L' to load the game
+                    try:
+                        game.load(SAVE_FILE)
+                    except ValueError as error:  # The current game goes on
+                        print(f"Could not load {SAVE_FILE}: {error}")
+
+            if event.type == pygame.MOUSEBUTTONDOWN and game.turn == PURPLE:  # If the human clicks on their turn
                 pos = pygame.mouse.get_pos()  # Get the position of the click
                 row, col = get_row_col_from_mouse(pos)  # Convert to board coordinates
                 game.select(row, col)  # Handle the selection
 
         game.update()  # Update the game state and redraw the screen
-  # Update the game state and redraw the screen
-
+        if thinking:
+            search_frames.append((time.perf_counter() - frame_start) * 1000)
+
+    game.close()  # Stop the background search before quitting
+    if log is not None:
+        log.close()
+    if search_frames:
+        search_frames.sort()
+        p99 = search_frames[min(len(search_frames) - 1, int(len(search_frames) * 0.99))]
+        print(f"Frame time while the AI was thinking: max {search_frames[-1]:.1f} ms, "
+              f"p99 {p99:.1f} ms over {len(search_frames)} frames (budget {1000 / FPS:.1f} ms)")
     pygame.quit()  # Quit the game after the loop ends
 
 # Run the main function to start the game
@@ -1,55 +1,403 @@
 # Importing necessary libraries
-from copy import deepcopy  # To create independent copies of complex objects like the board
-import pygame  # For graphical display and user interface
+import time  # For the optional search deadline
+from checker.bitboard import BitBoard, PROMOTION, COL_OF  # Integer-based board that the search can run on instead of Board
+from checker.constants import ROWS
+from checker.zobrist import SIDE_KEY  # Distinguishes the side to move in transposition table keys
+from minimax.transposition import EXACT, LOWER, UPPER, NO_MOVE
+from minimax.tablebase import WIN_SCORE  # Score of a won game, above any evaluation
+
+WIN_BOUND = WIN_SCORE / 2  # Scores beyond it are won or lost games, which keep their distance in plies
 
 # Defining the colors used in the game (RGB format)
 PURPLE = (222, 111, 161)  # Player 1's color
 YELLOW = (255, 204, 0)  # Player 2's (AI) color
 
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when its deadline has passed. The board is restored
+    to the searched position before the exception leaves search_position.
+    """
+
+
+class NodeCounter:
+    """
+    Counts the positions visited by a search so that the effect of pruning and
+    move ordering can be measured.
+    """
+    def __init__(self):
+        """
+        Initializes the counter with no visited nodes.
+        """
+        self.nodes = 0  # Number of positions visited
+
+    def reset(self):
+        """
+        Resets the counter back to zero.
+        """
+        self.nodes = 0
+
+
 # Minimax algorithm implementation
-def minimax(position, depth, max_player, game):
+def minimax(position, depth, max_player, game, alpha=float('-inf'), beta=float('inf'), counter=None, tt=None,
+            tablebase=None, stats=None, quiescence=None):
     """
     Recursive implementation of the minimax algorithm with alpha-beta pruning.
+    The tree is walked on the given board itself with make_move/unmake_move, so the
+    board is back in its original state when the search returns.
 
     Args:
-        position: The current state of the game board.
+        position: The current state of the game board (a Board or a BitBoard).
         depth: The maximum depth to explore the game tree.
         max_player: A boolean indicating whether it's the maximizing player's turn.
         game: The current game instance.
+        alpha: The best score the maximizing player is already assured of.
+        beta: The best score the minimizing player is already assured of.
+        counter: An optional NodeCounter incremented once per visited position.
+        tt: An optional TranspositionTable used to skip positions already searched.
+        tablebase: An optional Tablebase giving exact scores of positions with few pieces.
+        stats: An optional SearchStats filled with statistics of the search.
+        quiescence: An optional Quiescence that plays out the captures at the leaves before evaluating.
 
     Returns:
         A tuple (evaluation, best_move):
         - evaluation: The heuristic value of the board position.
         - best_move: The best board state for the current player.
     """
-    # Base case: check if depth is 0 or if the game is over
-    if depth == 0 or position.winner() is not None:
-        return position.evaluate(), position  # Return the board evaluation and the current position
+    if tt is not None:
+        tt.new_search()  # Entries from earlier searches may now be replaced first
+    start = time.perf_counter()
+    evaluation, move = search_position(position, depth, max_player, alpha, beta, counter, tt, tablebase=tablebase,
+                                       stats=stats, quiescence=quiescence)
+    if stats is not None:
+        stats.result(evaluation, [] if move is None else [move], time.perf_counter() - start)
+    if move is None:
+        return evaluation, position  # Nothing to play: the position itself is the result
+    return evaluation, play_move(position, move)  # Only the chosen move gets its own board
+
+def search_position(position, depth, max_player, alpha, beta, counter=None, tt=None, ply=0, deadline=None,
+                    tablebase=None, stats=None, quiescence=None, heuristics=None, batch=None):
+    """
+    Alpha-beta search on a single board, making and unmaking moves in place.
+
+    Args:
+        position: The current state of the game board (a Board or a BitBoard).
+        depth: The remaining depth to explore.
+        max_player: A boolean indicating whether it's the maximizing player's turn.
+        alpha: The best score the maximizing player is already assured of.
+        beta: The best score the minimizing player is already assured of.
+        counter: An optional NodeCounter incremented once per visited position.
+        tt: An optional TranspositionTable consulted before and updated after searching a position.
+        ply: The distance from the root; scores are never taken from the table at the root,
+            because the root has to return an actual move.
+        deadline: An optional time.perf_counter() value after which SearchTimeout is raised.
+        tablebase: An optional Tablebase; positions it covers get their exact score instead of being searched.
+        stats: An optional SearchStats; every hook below is skipped when it is None.
+        quiescence: An optional Quiescence; leaves are then scored after their captures are played out.
+        heuristics: An optional MoveHeuristics (see minimax.cache) that orders the quiet moves
+            by the cutoffs they caused, and learns from the cutoffs of this search.
+        batch: An optional LeafBatcher (see minimax.batch) that scores all the children of the
+            last ply in one vectorized call when there are enough of them; BitBoard positions
+            only, and unused with quiescence.
+
+    Returns:
+        A tuple (evaluation, best_move), where best_move is a move tuple or None at a leaf.
+    """
+    if counter is not None:
+        counter.nodes += 1  # Count this position as visited
+    if stats is not None:
+        stats.node(ply)
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+
+    # Few pieces left: the tablebase knows the exact result (the root still searches, to return a move)
+    if tablebase is not None and ply > 0:
+        score = tablebase.probe(position, max_player)
+        if score is not None:
+            if stats is not None:
+                stats.tablebase_hits += 1
+            return from_root(score, ply), None  # The tables count the plies to the win from this position
+
+    # Base case: depth is 0
+    if depth == 0:
+        # A side that cannot move has lost; tested with a few shifts, without generating the moves
+        if not position.has_moves(YELLOW if max_player else PURPLE):
+            return terminal_score(max_player, ply), None
+        # Leaves in the middle of an exchange are only evaluated once the captures are played out
+        if quiescence is not None:
+            return quiescence.search(position, max_player, alpha, beta, counter, stats), None
+        if stats is not None:
+            return stats.evaluate(position), None  # Counted and timed
+        return position.evaluate(), None  # Return the board evaluation
+
+    tt_move = NO_MOVE  # Best move found by an earlier search of this position, tried first
+    original_alpha, original_beta = alpha, beta
+    if tt is not None:
+        key = position.zobrist ^ SIDE_KEY if max_player else position.zobrist
+        entry = tt.probe(key)
+        if entry is not None:
+            if stats is not None:
+                stats.tt_hits += 1
+            stored_depth, bound, score, tt_move = entry
+            score = from_root(score, ply)  # Stored counted from the position, like the tablebase's scores
+            if ply > 0 and stored_depth >= depth:  # Deep enough to reuse the stored score
+                if bound == EXACT:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return score, None
+                elif bound == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return score, None
 
     # Maximizing player's logic (AI player)
     if max_player:
         maxEval = float('-inf')  # Initialize maximum evaluation
         best_move = None  # Placeholder for the best move
-        for move in get_all_moves(position, YELLOW, game):  # Get all possible moves for AI
-            # Recursively call minimax for the next depth with the minimizing player's turn
-            evaluation = minimax(move, depth - 1, False, game)[0]
-            maxEval = max(maxEval, evaluation)  # Update maxEval if a better evaluation is found
-            if maxEval == evaluation:
-                best_move = move  # Update best move if the current move is the best so far
-        
+        moves = position.get_all_moves(YELLOW) if stats is None else stats.generate(position, YELLOW)
+        if not moves:
+            return terminal_score(max_player, ply), None  # No legal move (or no piece) left: the game is lost
+        if heuristics is None:
+            ordered = order_moves(position, moves, tt_move)  # Best-looking moves first
+        else:
+            ordered = heuristics.order(position, moves, tt_move, ply, max_player)
+        if depth == 1 and batch is not None and quiescence is None and len(ordered) >= batch.min_size:
+            # Every child is a leaf: score them all at once
+            maxEval, best_move = batch.best_child(position, ordered, max_player, ply, counter, stats, tablebase)
+            ordered = ()
+        for move in ordered:
+            if stats is not None:
+                stats.enter(ply, move)
+            undo = position.make_move(move)  # Play the move on the board itself
+            try:
+                # Recursively call the search for the next depth with the minimizing player's turn
+                evaluation = search_position(position, depth - 1, False, alpha, beta, counter, tt, ply + 1, deadline,
+                                             tablebase, stats, quiescence, heuristics, batch)[0]
+            finally:
+                position.unmake_move(undo)  # Take the move back, even when the search is interrupted
+            if evaluation > maxEval or best_move is None:
+                maxEval = evaluation  # Keep the first move reaching the best evaluation
+                best_move = move
+            alpha = max(alpha, maxEval)  # Raise the lower bound
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(ordered.index(move))
+                if heuristics is not None:
+                    heuristics.cutoff(position, move, ply, depth, max_player)
+                break  # The minimizing player will never allow this line, so stop searching it
+
+        store_result(tt, position, max_player, depth, maxEval, best_move, original_alpha, original_beta, ply)
         return maxEval, best_move  # Return the maximum evaluation and the corresponding move
     else:  # Minimizing player's logic (Human player)
         minEval = float('inf')  # Initialize minimum evaluation
         best_move = None  # Placeholder for the best move
-        for move in get_all_moves(position, PURPLE, game):  # Get all possible moves for Human
-            # Recursively call minimax for the next depth with the maximizing player's turn
-            evaluation = minimax(move, depth - 1, True, game)[0]
-            minEval = min(minEval, evaluation)  # Update minEval if a better evaluation is found
-            if minEval == evaluation:
-                best_move = move  # Update best move if the current move is the best so far
-        
+        moves = position.get_all_moves(PURPLE) if stats is None else stats.generate(position, PURPLE)
+        if not moves:
+            return terminal_score(max_player, ply), None  # No legal move (or no piece) left: the game is lost
+        if heuristics is None:
+            ordered = order_moves(position, moves, tt_move)  # Best-looking moves first
+        else:
+            ordered = heuristics.order(position, moves, tt_move, ply, max_player)
+        if depth == 1 and batch is not None and quiescence is None and len(ordered) >= batch.min_size:
+            # Every child is a leaf: score them all at once
+            minEval, best_move = batch.best_child(position, ordered, max_player, ply, counter, stats, tablebase)
+            ordered = ()
+        for move in ordered:
+            if stats is not None:
+                stats.enter(ply, move)
+            undo = position.make_move(move)  # Play the move on the board itself
+            try:
+                # Recursively call the search for the next depth with the maximizing player's turn
+                evaluation = search_position(position, depth - 1, True, alpha, beta, counter, tt, ply + 1, deadline,
+                                             tablebase, stats, quiescence, heuristics, batch)[0]
+            finally:
+                position.unmake_move(undo)  # Take the move back, even when the search is interrupted
+            if evaluation < minEval or best_move is None:
+                minEval = evaluation  # Keep the first move reaching the best evaluation
+                best_move = move
+            beta = min(beta, minEval)  # Lower the upper bound
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(ordered.index(move))
+                if heuristics is not None:
+                    heuristics.cutoff(position, move, ply, depth, max_player)
+                break  # The maximizing player will never allow this line, so stop searching it
+
+        store_result(tt, position, max_player, depth, minEval, best_move, original_alpha, original_beta, ply)
         return minEval, best_move  # Return the minimum evaluation and the corresponding move
 
+# Scores positions where the game is over
+def terminal_score(max_player, ply):
+    """
+    Returns the score of a position whose side to move has no legal move, and so has lost:
+    WIN_SCORE (the tablebase's score of a won position) less the distance from the root,
+    so that the search prefers the quickest win and the slowest loss.
+
+    Args:
+        max_player: True if the maximizing (YELLOW) player is the one that cannot move.
+        ply: The distance of the position from the root.
+
+    Returns:
+        float: The score, from YELLOW's point of view.
+    """
+    return ply - WIN_SCORE if max_player else WIN_SCORE - ply
+
+def from_root(score, ply):
+    """
+    Converts a won or lost score counted from a position (like the tablebase's and the
+    transposition table's) into one counted from the root of the search, like terminal_score:
+    a win in d plies from a position at ply p is a win in p + d plies from the root.
+    Other scores are returned as they are.
+
+    Args:
+        score: The score counted from the position, from YELLOW's point of view.
+        ply: The distance of the position from the root.
+
+    Returns:
+        float: The score counted from the root.
+    """
+    if score > WIN_BOUND:
+        return score - ply
+    if score < -WIN_BOUND:
+        return score + ply
+    return score
+
+def to_node(score, ply):
+    """
+    Converts a won or lost score counted from the root into one counted from a position at
+    some ply, the inverse of from_root, e.g. to store it in the transposition table where the
+    position may be reached at another ply later.
+
+    Args:
+        score: The score counted from the root, from YELLOW's point of view.
+        ply: The distance of the position from the root.
+
+    Returns:
+        float: The score counted from the position.
+    """
+    if score > WIN_BOUND:
+        return score + ply
+    if score < -WIN_BOUND:
+        return score - ply
+    return score
+
+# Records a search result in the transposition table
+def store_result(tt, position, max_player, depth, value, best_move, alpha, beta, ply=0):
+    """
+    Stores the value of a searched position along with how it relates to the search window.
+
+    Args:
+        tt: The TranspositionTable, or None when the search runs without one.
+        position: The searched board.
+        max_player: True if the maximizing player was to move.
+        depth: The depth the position was searched to.
+        value: The value returned by the search.
+        best_move: The best move tuple found, or None.
+        alpha: The lower bound of the window the position was searched with.
+        beta: The upper bound of the window the position was searched with.
+        ply: The distance of the position from the root; won and lost scores are stored counted from the position.
+    """
+    if tt is None:
+        return
+    if value <= alpha:
+        bound = UPPER  # Every move failed low: the true value may be even lower
+    elif value >= beta:
+        bound = LOWER  # A cutoff happened: the true value may be even higher
+    else:
+        bound = EXACT
+    key = position.zobrist ^ SIDE_KEY if max_player else position.zobrist
+    move = NO_MOVE if best_move is None else encode_move(position, best_move)
+    tt.store(key, depth, bound, to_node(value, ply), move)
+
+# Packs a move into a small integer so it can be stored in the transposition table
+def encode_move(position, move):
+    """
+    Encodes a move as an integer made of its origin and destination squares.
+
+    Args:
+        position: The board the move is made from (a Board or a BitBoard).
+        move: A move tuple returned by position.get_all_moves.
+
+    Returns:
+        int: The encoded move.
+    """
+    if isinstance(position, BitBoard):
+        return move[0] * 32 + move[1]
+    piece, row, col, _ = move
+    return (piece.row * ROWS + piece.col) * ROWS * ROWS + row * ROWS + col
+
+# Orders candidate moves so that alpha-beta cutoffs happen as early as possible
+def order_moves(position, moves, first=NO_MOVE):
+    """
+    Sorts moves so that the most forcing ones come first: captures (more captured pieces first)
+    and promotions, followed by the remaining moves ranked by a cheap static score that
+    prefers landing near the centre of the board.
+
+    Args:
+        position: The board the moves are made from (a Board or a BitBoard).
+        moves: The move tuples returned by position.get_all_moves.
+        first: An encoded move (e.g. from the transposition table) to try before all others.
+
+    Returns:
+        A new list containing the same moves, best candidates first.
+    """
+    # sorted() is stable, so equally ranked moves keep their generation order
+    ordered = sorted(moves, key=lambda move: move_score(position, move), reverse=True)
+    if first != NO_MOVE:
+        for index, move in enumerate(ordered):
+            if encode_move(position, move) == first:
+                ordered.insert(0, ordered.pop(index))
+                break
+    return ordered
+
+def move_score(position, move):
+    """
+    Cheap ordering score of a move, computed without playing it.
+
+    Args:
+        position: The board the move is made from (a Board or a BitBoard).
+        move: A move tuple returned by position.get_all_moves.
+
+    Returns:
+        tuple: (captured pieces, promotes, centrality); larger sorts first.
+    """
+    if isinstance(position, BitBoard):
+        start, end, captured = move
+        captures = captured.bit_count()
+        promotes = not position.kings >> start & 1 and PROMOTION >> end & 1
+        col = COL_OF[end]
+    else:
+        piece, row, col, skipped = move
+        captures = len(skipped)
+        promotes = not piece.king and (row == 0 or row == ROWS - 1)
+    return captures, bool(promotes), -abs(2 * col - (ROWS - 1))
+
+# Builds the board reached by a move without touching the original
+def play_move(position, move):
+    """
+    Returns a new board with the move applied, leaving the given board unchanged.
+
+    Args:
+        position: The current state of the game board (a Board or a BitBoard).
+        move: A move tuple returned by position.get_all_moves.
+
+    Returns:
+        A new board state after the move.
+    """
+    if isinstance(position, BitBoard):
+        return position.apply(move)
+    from copy import deepcopy  # Only the Board path copies; imported here to keep the engine import light
+
+    piece, row, col, skipped = move
+    temp_board = deepcopy(position)  # One copy for the chosen move only
+    temp_piece = temp_board.get_piece(piece.row, piece.col)  # Locate the corresponding piece on the copied board
+    temp_skipped = [temp_board.get_piece(captured.row, captured.col) for captured in skipped]
+    temp_board.make_move((temp_piece, row, col, temp_skipped))
+    return temp_board
+
 # Simulates a move by updating the board state
 def simulate_move(piece, move, board, game, skip):
     """
@@ -85,6 +433,11 @@ def get_all_moves(board, color, game):
     Returns:
         A list of new board states, one for each possible move.
     """
+    if isinstance(board, BitBoard):
+        return board.children(color)  # Child positions cost a few integer operations, no copying needed
+
+    from copy import deepcopy  # Only the Board path copies; imported here to keep the engine import light
+
     moves = []  # Initialize a list to store all possible moves
     
     # Iterate over all pieces of the given color
@@ -113,6 +466,8 @@ def draw_moves(game, board, piece):
     Returns:
         None
     """
+    import pygame  # Only this debugging helper needs pygame, so the search itself never imports it
+
     valid_moves = board.get_valid_moves(piece)  # Get the valid moves for the given piece
     board.draw(game.win)  # Redraw the game board
     # Highlight the selected piece with a green circle
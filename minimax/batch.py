@@ -0,0 +1,99 @@
+# Scores the last ply of the search in batches with the vectorized evaluator; needs NumPy
+import time
+
+import numpy as np
+
+from checker.batch_evaluation import BatchEvaluator
+from checker.movegen import can_move, UP_STEPS, DOWN_STEPS
+from minimax.algorithm import terminal_score, from_root
+
+
+class LeafBatcher:
+    """
+    Collects the leaves of the search into batches. At the last ply before the leaves,
+    search_position hands every child of a node to best_child, which scores them all in one
+    vectorized call instead of one evaluate call per child. Alpha-beta cannot skip siblings
+    of a batch any more, so more leaves are scored, but each one costs a fraction as much
+    once the evaluation is richer than a handful of terms. A vectorized call has a fixed
+    cost of its own, so nodes with fewer children than min_size are searched as usual.
+    """
+    def __init__(self, min_size=24):
+        """
+        Initializes the batcher.
+
+        Args:
+            min_size (int): The fewest children worth a vectorized call; about where it beats
+                scoring them one by one with the default evaluator (see benchmarks.batch).
+        """
+        self.min_size = min_size
+        self._evaluators = {}  # BatchEvaluator of each Evaluator met
+        self.batches = 0  # Vectorized calls made
+        self.positions = 0  # Positions scored by them
+
+    def batch_evaluator(self, evaluator):
+        """
+        Returns the batch evaluator of an Evaluator, building it on first use.
+
+        Args:
+            evaluator (Evaluator): The evaluator of the searched positions.
+
+        Returns:
+            BatchEvaluator: The same terms and weights, vectorized.
+        """
+        batch_evaluator = self._evaluators.get(evaluator)
+        if batch_evaluator is None:
+            batch_evaluator = self._evaluators[evaluator] = BatchEvaluator(evaluator)
+        return batch_evaluator
+
+    def best_child(self, position, moves, max_player, ply=0, counter=None, stats=None, tablebase=None):
+        """
+        Scores the children reached by every move of a BitBoard and returns the best one,
+        exactly as searching each child to depth 0 would.
+
+        Args:
+            position (BitBoard): The position the moves are made from.
+            moves (list): The move tuples, in the order the search would try them.
+            max_player (bool): True if the maximizing (YELLOW) player makes the moves.
+            ply (int): The distance of the position from the root.
+            counter (NodeCounter): Incremented once per child, when given.
+            stats (SearchStats): Counts the children as nodes and leaves, when given.
+            tablebase (Tablebase): Endgame tables whose exact scores replace the evaluation.
+
+        Returns:
+            tuple: (best value, best move); the first move reaching the best value is kept,
+            and (-inf or inf, None) is returned when there are no moves.
+        """
+        if not moves:
+            return (float('-inf') if max_player else float('inf')), None
+        start = time.perf_counter()
+        children = [position._after(move) for move in moves]
+        count = len(children)
+        yellow = np.fromiter((child[0] for child in children), np.uint32, count)
+        purple = np.fromiter((child[1] for child in children), np.uint32, count)
+        kings = np.fromiter((child[2] for child in children), np.uint32, count)
+        psq = np.fromiter((child[4] for child in children), np.int64, count)
+        scores = self.batch_evaluator(position.evaluator).evaluate_masks(yellow, purple, kings, psq)
+        # Children whose side to move cannot move are lost for that side, as in search_position
+        for index, child in enumerate(children):
+            if max_player:
+                blocked = not can_move(child[1], child[0], child[2], UP_STEPS)
+            else:
+                blocked = not can_move(child[0], child[1], child[2], DOWN_STEPS)
+            if blocked:
+                scores[index] = terminal_score(not max_player, ply + 1)
+        if tablebase is not None:
+            for index, move in enumerate(moves):
+                score = tablebase.probe(position.apply(move), not max_player)
+                if score is not None:
+                    scores[index] = from_root(score, ply + 1)
+        index = int(scores.argmax() if max_player else scores.argmin())  # The first of equal scores
+        self.batches += 1
+        self.positions += count
+        if counter is not None:
+            counter.nodes += count
+        if stats is not None:
+            for _ in range(count):
+                stats.node(ply + 1)
+            stats.leaves += count
+            stats.evaluation_time += time.perf_counter() - start
+        return float(scores[index]), moves[index]
@@ -0,0 +1,396 @@
+"""
+Opening book: moves for the first plies of the game, chosen offline by deep searches or
+taken from self-play games, so the AI does not search again positions that never change.
+
+A book is a binary file of fixed-size (position key, move, weight) records sorted by key,
+after a header naming the rules it was built under; it gives no moves under other rules.
+It is memory-mapped and looked up with a binary search, so opening it costs nothing and
+the operating system only reads the pages that are probed.
+
+Build, merge and inspect books from the repository root:
+    python -m minimax.book search --plies 10 --depth 8 --out book.cbk
+    python -m minimax.book games selfplay.jsonl --out games.cbk
+    python -m minimax.book search --rules forced --out forced.cbk
+    python -m minimax.book merge book.cbk games.cbk --out book.cbk
+    python -m minimax.book show book.cbk
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import YELLOW, PURPLE
+from checker.notation import move_to_text, parse_move
+from checker.rules import CASUAL, rules_named
+from checker.zobrist import SIDE_KEY
+from minimax.search import search
+from minimax.transposition import TranspositionTable
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'book.cbk')
+MAGIC = b'CBK2'  # Followed by the code of the rules
+OLD_MAGIC = b'CBK1'  # Books written before the rules were stored, which are all casual
+RULE_NAMES = ('casual', 'forced')  # Rules by their code in the header
+RECORD = struct.Struct('<QBBH')  # Position key, from square, to square, weight: 12 bytes
+MAX_WEIGHT = 0xFFFF
+
+
+def position_key(position, yellow_to_move):
+    """
+    Returns the key of a position in the book; the same key the transposition table uses.
+
+    Args:
+        position: A Board or a BitBoard.
+        yellow_to_move (bool): True if YELLOW is to move.
+
+    Returns:
+        int: The 64-bit key.
+    """
+    return position.zobrist ^ SIDE_KEY if yellow_to_move else position.zobrist
+
+
+def write_book(entries, path, rules=CASUAL):
+    """
+    Writes book entries as a sorted binary file.
+
+    Args:
+        entries (dict): Maps (key, from square, to square) to a weight; weights above
+            MAX_WEIGHT are capped and zero weights are left out.
+        path (str): The file to write.
+        rules (Rules): The rules the entries were collected under.
+
+    Returns:
+        int: The number of records written.
+    """
+    records = sorted((key, start, end, min(weight, MAX_WEIGHT))
+                     for (key, start, end), weight in entries.items() if weight > 0)
+    with open(path, 'wb') as file:
+        file.write(MAGIC + bytes((RULE_NAMES.index(rules.name),)))
+        for record in records:
+            file.write(RECORD.pack(*record))
+    return len(records)
+
+
+def read_header(data, path):
+    """
+    Reads the header of a book.
+
+    Args:
+        data (bytes): The start of the file, at least as long as the header.
+        path (str): The book file, for the error message.
+
+    Returns:
+        tuple: The rules of the book and the length of its header.
+
+    Raises:
+        ValueError: If the file is not a book.
+    """
+    if data[:len(OLD_MAGIC)] == OLD_MAGIC:
+        return CASUAL, len(OLD_MAGIC)
+    if data[:len(MAGIC)] != MAGIC or len(data) <= len(MAGIC) or data[len(MAGIC)] >= len(RULE_NAMES):
+        raise ValueError(f"not an opening book: {path}")
+    return rules_named(RULE_NAMES[data[len(MAGIC)]]), len(MAGIC) + 1
+
+
+def read_book(path):
+    """
+    Reads every record of a book file.
+
+    Args:
+        path (str): The book file.
+
+    Returns:
+        tuple: The rules of the book, and a dict mapping (key, from square, to square) to the weight.
+
+    Raises:
+        ValueError: If the file is not a book.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    rules, header = read_header(data, path)
+    if (len(data) - header) % RECORD.size:
+        raise ValueError(f"not an opening book: {path}")
+    return rules, {(key, start, end): weight for key, start, end, weight in RECORD.iter_unpack(data[header:])}
+
+
+def merge_books(books):
+    """
+    Merges book entries, adding up the weights of moves found in several books.
+
+    Args:
+        books (iterable): Entry dicts as returned by read_book.
+
+    Returns:
+        dict: The merged entries.
+    """
+    merged = {}
+    for entries in books:
+        for record, weight in entries.items():
+            merged[record] = merged.get(record, 0) + weight
+    return merged
+
+
+class OpeningBook:
+    """
+    Looks up moves in a book file. The file is memory-mapped and searched in place, so
+    several processes share it and nothing is parsed at startup.
+    """
+    def __init__(self, path=BOOK_FILE):
+        """
+        Maps a book file.
+
+        Args:
+            path (str): The file written by write_book.
+
+        Raises:
+            ValueError: If the file is not a book.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            self.rules, self.header = read_header(file.read(len(MAGIC) + 1), path)
+            if (size - self.header) % RECORD.size:
+                raise ValueError(f"not an opening book: {path}")
+            # An empty mapping is not allowed, so a book without records is not mapped at all
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size > self.header else b''
+        self.records = (size - self.header) // RECORD.size
+        self.hits = 0  # Positions found in the book, for statistics
+
+    def __len__(self):
+        return self.records
+
+    def _key_at(self, index):
+        """
+        Returns the position key of a record.
+        """
+        return RECORD.unpack_from(self.data, self.header + index * RECORD.size)[0]
+
+    def entries(self, key):
+        """
+        Returns the records of a position.
+
+        Args:
+            key (int): The position key.
+
+        Returns:
+            list: (from square, to square, weight) tuples.
+        """
+        # Binary search for the first record of the key; its moves follow it
+        low, high = 0, self.records
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        offset = self.header + low * RECORD.size
+        while low < self.records:
+            record_key, start, end, weight = RECORD.unpack_from(self.data, offset)
+            if record_key != key:
+                break
+            found.append((start, end, weight))
+            low += 1
+            offset += RECORD.size
+        return found
+
+    def moves(self, position, yellow_to_move):
+        """
+        Returns the book moves of a position that are legal in it; none if the position is
+        played under other rules than the book was built under.
+
+        Args:
+            position: A Board or a BitBoard.
+            yellow_to_move (bool): True if YELLOW is to move.
+
+        Returns:
+            list: (move tuple, weight) pairs, the move tuples as from BitBoard.get_all_moves.
+        """
+        if position.rules is not self.rules:
+            return []  # The best move under one set of rules may lose, or be illegal, under the other
+        found = self.entries(position_key(position, yellow_to_move))
+        if not found:
+            return []
+        if not isinstance(position, BitBoard):
+            position = BitBoard.from_board(position)
+        # A record only stores the squares; the captured pieces come from the legal move,
+        # which also guards against a hash collision with a different position
+        legal = {move[:2]: move for move in position.get_all_moves(YELLOW if yellow_to_move else PURPLE)}
+        return [(legal[start, end], weight) for start, end, weight in found if (start, end) in legal]
+
+    def choose(self, position, yellow_to_move):
+        """
+        Returns the book move with the highest weight, or None if the position is not in the book.
+
+        Args:
+            position: A Board or a BitBoard.
+            yellow_to_move (bool): True if YELLOW is to move.
+
+        Returns:
+            tuple or None: The move tuple.
+        """
+        moves = self.moves(position, yellow_to_move)
+        if not moves:
+            return None
+        self.hits += 1
+        return max(moves, key=lambda pair: pair[1])[0]
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b''
+        self.records = 0
+
+
+_opened = {}  # Books already opened in this process, by path
+
+
+def open_book(path=BOOK_FILE):
+    """
+    Returns the book of a file, opening it only once per process.
+
+    Args:
+        path (str): The book file.
+
+    Returns:
+        OpeningBook: The book.
+    """
+    if path not in _opened:
+        _opened[path] = OpeningBook(path)
+    return _opened[path]
+
+
+def book_from_games(records, plies=10, rules=CASUAL):
+    """
+    Collects the opening moves of self-play games. A move scores 2 for every game its
+    side won and 1 for every draw; moves of the losing side are left out.
+
+    Args:
+        records (iterable): Game records as written by selfplay.py.
+        plies (int): The number of moves of each game to collect.
+        rules (Rules): The rules of the book; games played under other rules are left out.
+
+    Returns:
+        dict: Book entries, as taken by write_book.
+    """
+    entries = {}
+    for record in records:
+        names = {YELLOW: record['yellow'], PURPLE: record['purple']}
+        if rules_named(record.get('rules', 'casual')) is not rules:
+            continue
+        position, color = BitBoard.from_board(Board(rules=rules)), PURPLE
+        for text in record['moves'][:plies]:
+            move = parse_move(position, text, color)
+            if record['result'] == names[color]:
+                points = 2
+            elif record['result'] == 'draw':
+                points = 1
+            else:
+                points = 0
+            if points:
+                key = (position_key(position, color == YELLOW), move[0], move[1])
+                entries[key] = entries.get(key, 0) + points
+            position.make_move(move)
+            color = YELLOW if color == PURPLE else PURPLE
+    return entries
+
+
+def book_from_search(plies=10, depth=8, branch_plies=2, log=print, rules=CASUAL):
+    """
+    Searches the opening to a fixed depth and stores the best move of every position
+    visited. Every move is followed during the first branch_plies plies, so any reply to
+    the first moves stays in the book; after that only the best move is followed.
+
+    Args:
+        plies (int): The depth of the book in plies.
+        depth (int): The search depth for every position.
+        branch_plies (int): The plies during which every move is followed.
+        log (callable): Receives progress messages.
+        rules (Rules): The rules to play the opening under.
+
+    Returns:
+        dict: Book entries, as taken by write_book.
+    """
+    entries, seen = {}, set()
+    tt = TranspositionTable()
+    start = time.perf_counter()
+    frontier = [(BitBoard.from_board(Board(rules=rules)), PURPLE)]  # PURPLE moves first in the game
+    for ply in range(plies):
+        following = []
+        for position, color in frontier:
+            key = position_key(position, color == YELLOW)
+            if key in seen:
+                continue  # Reached by another move order
+            seen.add(key)
+            result = search(position, time_ms=float('inf'), max_depth=depth, max_player=color == YELLOW, tt=tt)
+            if result.move is None:
+                continue
+            entries[(key, result.move[0], result.move[1])] = 1
+            other = YELLOW if color == PURPLE else PURPLE
+            for move in position.get_all_moves(color) if ply < branch_plies else [result.move]:
+                following.append((position.apply(move), other))
+        log(f"ply {ply + 1}: {len(seen)} positions searched, {time.perf_counter() - start:.0f}s")
+        frontier = following
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    searched = commands.add_parser('search', help='build a book by searching the opening')
+    searched.add_argument('--plies', type=int, default=10)
+    searched.add_argument('--depth', type=int, default=8)
+    searched.add_argument('--branch-plies', type=int, default=2, help='plies during which every move is followed')
+    searched.add_argument('--out', default=BOOK_FILE)
+    searched.add_argument('--rules', choices=RULE_NAMES, default='casual')
+    games = commands.add_parser('games', help='build a book from self-play games (selfplay.py JSONL)')
+    games.add_argument('files', nargs='+')
+    games.add_argument('--plies', type=int, default=10)
+    games.add_argument('--out', default=BOOK_FILE)
+    games.add_argument('--rules', choices=RULE_NAMES, default='casual', help='rules of the games to collect')
+    merged = commands.add_parser('merge', help='merge books, adding up the weights')
+    merged.add_argument('files', nargs='+')
+    merged.add_argument('--out', default=BOOK_FILE)
+    show = commands.add_parser('show', help='list the moves of a book')
+    show.add_argument('file', nargs='?', default=BOOK_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        book = OpeningBook(args.file)
+        print(f"{args.file}: {len(book)} moves, {book.rules.name} rules")
+        # Walk the main line of the book from the starting position
+        position, color = BitBoard.from_board(Board(rules=book.rules)), PURPLE
+        while (move := book.choose(position, color == YELLOW)) is not None:
+            moves = ', '.join(f"{move_to_text(m)} ({w})" for m, w in book.moves(position, color == YELLOW))
+            print(f"{'YELLOW' if color == YELLOW else 'PURPLE'} to move: {moves}")
+            position.make_move(move)
+            color = YELLOW if color == PURPLE else PURPLE
+        return
+
+    if args.command == 'search':
+        rules = rules_named(args.rules)
+        entries = book_from_search(args.plies, args.depth, args.branch_plies, rules=rules)
+    elif args.command == 'games':
+        rules = rules_named(args.rules)
+        records = []
+        for path in args.files:
+            with open(path) as file:
+                records.extend(json.loads(line) for line in file if line.strip())
+        entries = book_from_games(records, args.plies, rules)
+    else:
+        books = [read_book(path) for path in args.files]
+        rules = books[0][0]
+        if any(other is not rules for other, _ in books):
+            parser.error('the books were built under different rules')
+        entries = merge_books(entries for _, entries in books)
+    print(f"{write_book(entries, args.out, rules)} moves written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
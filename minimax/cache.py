@@ -0,0 +1,175 @@
+# Search state kept from one AI move to the next
+from array import array
+
+from checker.zobrist import SIDE_KEY
+from minimax.algorithm import encode_move, move_score
+from minimax.transposition import TranspositionTable, ENTRY_SIZE, NO_MOVE
+
+MAX_PLY = 64  # Deepest ply that keeps killer moves
+MOVE_CODES = 4096  # encode_move gives BitBoard moves codes below 1024 and Board moves below 4096
+
+
+class MoveHeuristics:
+    """
+    Move ordering learned from the cutoffs of earlier searches: the killer moves of every
+    ply (the last two quiet moves that caused a cutoff there) and a history score of every
+    move of each side, raised by depth squared at each cutoff. Both are only used to order
+    the quiet moves, after captures and promotions.
+    """
+    def __init__(self):
+        """
+        Initializes empty heuristics.
+        """
+        self.killers = [[] for _ in range(MAX_PLY)]
+        self.history = array('l', bytes(8 * 2 * MOVE_CODES))  # PURPLE's codes first, then YELLOW's
+
+    def order(self, position, moves, first, ply, max_player):
+        """
+        Sorts moves like order_moves, with the killers and then the best history scores
+        first among moves that capture and promote alike.
+
+        Args:
+            position: The board the moves are made from (a Board or a BitBoard).
+            moves (list): The move tuples returned by position.get_all_moves.
+            first (int): An encoded move to try before all others, e.g. from the transposition table.
+            ply (int): The distance from the root.
+            max_player (bool): True if YELLOW is to move.
+
+        Returns:
+            list: The same moves, best candidates first.
+        """
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        history, side = self.history, MOVE_CODES if max_player else 0
+
+        def key(move):
+            code = encode_move(position, move)
+            captures, promotes, centre = move_score(position, move)
+            return captures, promotes, code in killers, history[side + code], centre
+
+        ordered = sorted(moves, key=key, reverse=True)
+        if first != NO_MOVE:
+            for index, move in enumerate(ordered):
+                if encode_move(position, move) == first:
+                    ordered.insert(0, ordered.pop(index))
+                    break
+        return ordered
+
+    def cutoff(self, position, move, ply, depth, max_player):
+        """
+        Learns from a move that caused a cutoff. Captures are searched first anyway, so only
+        quiet moves are remembered.
+
+        Args:
+            position: The board the move was made from.
+            move (tuple): The move tuple.
+            ply (int): The distance from the root.
+            depth (int): The remaining depth of the search of that position.
+            max_player (bool): True if YELLOW made the move.
+        """
+        if move_score(position, move)[0]:
+            return
+        code = encode_move(position, move)
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if code not in killers:
+                killers.insert(0, code)
+                del killers[2:]
+        self.history[(MOVE_CODES if max_player else 0) + code] += depth * depth
+
+    def age(self, plies):
+        """
+        Moves the heuristics to a new root: the killers of the root's ply and below move
+        up by the plies played since the last search, and the history scores are halved
+        so that recent searches count the most.
+
+        Args:
+            plies (int): The number of moves played between the two roots.
+        """
+        if plies:
+            self.killers = self.killers[plies:] + [[] for _ in range(min(plies, MAX_PLY))]
+        history = self.history
+        for index in range(len(history)):
+            if history[index]:
+                history[index] >>= 1
+
+    def clear(self):
+        """
+        Forgets everything that was learned.
+        """
+        self.__init__()
+
+
+class SearchCache:
+    """
+    What the search learns about a game, kept between the AI's moves so the next search
+    starts warm: the transposition table, the move ordering heuristics and the principal
+    variation of the last search. The human's reply usually lies in the tree just searched,
+    so much of the next search is found in the table. Everything is keyed by position hash,
+    so a reply the search did not expect only costs the entries that do not apply.
+    Clear the cache when a new game starts or the evaluator changes.
+    """
+    def __init__(self, memory_mb=16):
+        """
+        Initializes an empty cache.
+
+        Args:
+            memory_mb (float): The memory cap of the whole cache; nearly all of it goes to the
+                transposition table, the heuristics take a fixed 64 kB.
+        """
+        self.memory_mb = memory_mb
+        heuristics_mb = 8 * 2 * MOVE_CODES / (1024 * 1024)
+        self.tt = TranspositionTable(max(memory_mb - heuristics_mb, ENTRY_SIZE / (1024 * 1024)))
+        self.heuristics = MoveHeuristics()
+        self.lines = {}  # Position key -> the rest of the last principal variation from that position
+        self.root = None  # Key of the last searched root
+        self.owner = None  # What the cached scores are valid for, e.g. the evaluator and rules
+        self.ponder_key = None  # Position being pondered, and the depth its pondering completed
+        self.ponder_depth = 0
+
+    def clear(self):
+        """
+        Empties the cache, e.g. for a new game.
+        """
+        self.tt.clear()
+        self.heuristics.clear()
+        self.lines = {}
+        self.root = None
+        self.ponder_key, self.ponder_depth = None, 0
+
+    def start(self, position, max_player):
+        """
+        Prepares a search of a new root and returns the part of the last principal variation
+        that starts from it, so the first iterations search that line first.
+
+        Args:
+            position (BitBoard): The root position.
+            max_player (bool): True if YELLOW is to move.
+
+        Returns:
+            list: The expected line of play from the root as move tuples; empty if the root
+            is not on the last principal variation.
+        """
+        key = position.zobrist ^ SIDE_KEY if max_player else position.zobrist
+        line = self.lines.get(key, [])
+        if key != self.root:
+            played = self.lines.get(self.root, [])
+            # Plies between the roots: known when the root lies on the last line, else one move each
+            self.heuristics.age(len(played) - len(line) if line else 2)
+        self.root = key
+        return list(line)
+
+    def remember(self, position, max_player, pv):
+        """
+        Keeps the principal variation of a search, indexed by every position along it.
+
+        Args:
+            position (BitBoard): The root position.
+            max_player (bool): True if YELLOW is to move at the root.
+            pv (list): The principal variation as move tuples.
+        """
+        self.lines = {}
+        current = position.copy()
+        for index, move in enumerate(pv):
+            self.lines[current.zobrist ^ SIDE_KEY if max_player else current.zobrist] = pv[index:]
+            current.make_move(move)
+            max_player = not max_player
@@ -0,0 +1,147 @@
+# Root-parallel minimax search across several processes
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from checker.bitboard import BitBoard
+from minimax.algorithm import NodeCounter, search_position, order_moves, YELLOW, PURPLE
+from minimax.search import SearchResult
+from minimax.tablebase import open_tablebase
+from minimax.transposition import TranspositionTable
+from minimax.worker import snapshot, evaluator_for
+
+# State of each worker process, set up once by _init_worker
+_shared_bound = None  # Best root score found so far by any worker
+_table = None  # Transposition table private to the worker, reused between tasks
+_tablebase = None  # Endgame tables, mapped by every worker
+
+
+def _init_worker(shared_bound, memory_mb, tablebase_dir=None):
+    """
+    Runs once in every worker process to keep the shared bound and a private table.
+
+    Args:
+        shared_bound (multiprocessing.Value): The best root score found so far.
+        memory_mb (float): The memory budget of the worker's transposition table.
+        tablebase_dir (str): The directory of the endgame tables, or None to search without them.
+    """
+    global _shared_bound, _table, _tablebase
+    _shared_bound = shared_bound
+    _table = TranspositionTable(memory_mb) if memory_mb else None
+    _tablebase = open_tablebase(tablebase_dir) if tablebase_dir else None
+
+
+def _search_root_move(position, move, depth, max_player, deterministic, weights, rules=None):
+    """
+    Searches one root move inside a worker process.
+
+    Args:
+        position (tuple): The root snapshot (yellow, purple, kings).
+        move (tuple): The root move to search, as a BitBoard move tuple.
+        depth (int): The depth of the whole search, including the root move.
+        max_player (bool): True if the maximizing player is to move at the root.
+        deterministic (bool): Keep moves that tie with the best one exact, so the choice never
+            depends on which worker finished first.
+        weights (dict): The evaluation weights.
+        rules (Rules): The rules of the game, or None for CASUAL.
+
+    Returns:
+        tuple: (move, score, nodes visited).
+    """
+    board = BitBoard(*position, evaluator=evaluator_for(weights), rules=rules)
+    board.make_move(move)
+    counter = NodeCounter()
+    best = _shared_bound.value  # Best score another root move already guarantees
+    if max_player:
+        if deterministic and best != float('-inf'):
+            best = math.nextafter(best, float('-inf'))  # Just below, so a tie is still searched exactly
+        alpha, beta = best, float('inf')
+    else:
+        if deterministic and best != float('inf'):
+            best = math.nextafter(best, float('inf'))
+        alpha, beta = float('-inf'), best
+    if _table is not None:
+        _table.new_search()
+    score, _ = search_position(board, depth - 1, not max_player, alpha, beta, counter, _table, 1,
+                               tablebase=_tablebase)
+    with _shared_bound.get_lock():
+        if (score > _shared_bound.value) if max_player else (score < _shared_bound.value):
+            _shared_bound.value = score  # Tighten the window of the root moves still to be searched
+    return move, score, counter.nodes
+
+
+class ParallelSearch:
+    """
+    Splits the root moves of a search across a pool of processes. Every worker starts
+    its move with the best score any other worker has found so far, so later moves are
+    searched with a narrower window. Positions are sent to the workers as three integers.
+    """
+    def __init__(self, processes=None, memory_mb=16, tablebase_dir=None):
+        """
+        Initializes the pool.
+
+        Args:
+            processes (int): The number of worker processes; defaults to the number of CPU cores.
+            memory_mb (float): The transposition table budget of each worker (0 disables the table).
+            tablebase_dir (str): The directory of the endgame tables, or None to search without them.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.shared_bound = multiprocessing.Value('d', 0.0)
+        self.executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                            initargs=(self.shared_bound, memory_mb, tablebase_dir))
+
+    def search(self, board, depth, max_player=True, deterministic=False):
+        """
+        Searches a position to a fixed depth.
+
+        Args:
+            board: The position to search (a Board or a BitBoard). It is not modified.
+            depth (int): The search depth.
+            max_player (bool): True if the maximizing (YELLOW, AI) player is to move.
+            deterministic (bool): Always return the same move as the serial minimax for the
+                same position, whatever order the workers finish in.
+
+        Returns:
+            SearchResult: The chosen move and search statistics.
+        """
+        start = time.perf_counter()
+        position = board if isinstance(board, BitBoard) else BitBoard.from_board(board)
+        moves = order_moves(position, position.get_all_moves(YELLOW if max_player else PURPLE))
+        if depth <= 0 or position.winner() is not None or not moves:
+            return SearchResult(position.evaluate() if moves else (float('-inf') if max_player else float('inf')),
+                                None, board, 0, 1, time.perf_counter() - start, [])
+
+        self.shared_bound.value = float('-inf') if max_player else float('inf')
+        root = snapshot(position)
+        args = (depth, max_player, deterministic, position.evaluator.weights, position.rules)
+        # The first (best-looking) move is searched alone, so the others start with a real bound
+        scores = dict.fromkeys(range(len(moves)))
+        nodes = 1
+        first = self.executor.submit(_search_root_move, root, moves[0], *args)
+        _, scores[0], count = first.result()
+        nodes += count
+        futures = {self.executor.submit(_search_root_move, root, move, *args): index
+                   for index, move in enumerate(moves) if index > 0}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                _, scores[futures.pop(future)], count = future.result()
+                nodes += count
+
+        # Pick the best score, preferring the earliest move in search order on ties
+        best_index = 0
+        for index in range(1, len(moves)):
+            if (scores[index] > scores[best_index]) if max_player else (scores[index] < scores[best_index]):
+                best_index = index
+        move = moves[best_index]
+        child = position.apply(move)
+        new_board = child if isinstance(board, BitBoard) else child.to_board()
+        return SearchResult(scores[best_index], move, new_board, depth, nodes, time.perf_counter() - start, [move])
+
+    def shutdown(self):
+        """
+        Stops the worker processes.
+        """
+        self.executor.shutdown(cancel_futures=True)
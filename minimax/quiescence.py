@@ -0,0 +1,137 @@
+# Capture-only search at the leaves, so exchanges are played out before a position is evaluated
+from checker.constants import YELLOW, PURPLE
+from checker.evaluation import SCALE
+
+
+def captured_count(move):
+    """
+    Returns how many pieces a move captures, for either board type.
+
+    Args:
+        move (tuple): A BitBoard (from, to, captured mask) tuple or a Board (piece, row, col, skipped) tuple.
+
+    Returns:
+        int: The number of captured pieces.
+    """
+    return len(move[3]) if len(move) == 4 else move[2].bit_count()
+
+
+class Quiescence:
+    """
+    Extends the search at its leaves with capture moves only. Evaluating a position in the
+    middle of an exchange misjudges it badly, so the captures are played out until the
+    position is quiet. Under the casual rules captures are not compulsory, so the side to
+    move may always stop capturing and keep the static evaluation (stand pat). Captures that
+    could not lift the score to alpha even when the captured pieces are worth the most a piece
+    can be worth are skipped (delta pruning), and every leaf is limited in depth and in nodes.
+    Under forced-capture rules a pending capture has to be played, so neither applies there.
+    """
+    def __init__(self, max_depth=8, max_nodes=200, delta_margin=0.5):
+        """
+        Initializes the extension.
+
+        Args:
+            max_depth (int): The most captures played in a row below a leaf.
+            max_nodes (int): The most positions searched below a single leaf.
+            delta_margin (float): Positional gain allowed on top of the captured material in delta pruning,
+                e.g. for a promotion made by the capture.
+        """
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.delta_margin = delta_margin
+        self.remaining = 0  # Nodes left for the leaf being searched
+        self._piece_values = {}  # Highest value of one piece, per evaluator
+
+    def piece_value(self, evaluator):
+        """
+        Returns the most a single piece is worth to an evaluator, on any square.
+
+        Args:
+            evaluator (Evaluator): The evaluator of the searched boards.
+
+        Returns:
+            float: The value in evaluation units.
+        """
+        value = self._piece_values.get(evaluator)
+        if value is None:
+            value = max(abs(score) for scores in evaluator.square_scores for score in scores) / SCALE
+            self._piece_values[evaluator] = value
+        return value
+
+    def search(self, position, max_player, alpha, beta, counter=None, stats=None):
+        """
+        Scores a leaf of the main search.
+
+        Args:
+            position: The leaf position (a Board or a BitBoard); it is restored before returning.
+            max_player (bool): True if the maximizing (YELLOW) player is to move.
+            alpha (float): The best score the maximizing player is already assured of.
+            beta (float): The best score the minimizing player is already assured of.
+            counter (NodeCounter): Incremented for every capture searched, when given.
+            stats (SearchStats): Counts the evaluations and capture nodes, when given.
+
+        Returns:
+            float: The score of the leaf once the captures have been played out.
+        """
+        self.remaining = self.max_nodes
+        return self._search(position, max_player, alpha, beta, self.max_depth, counter, stats)
+
+    def _search(self, position, max_player, alpha, beta, depth, counter, stats):
+        """
+        Helper that searches the captures of one position; fail-soft alpha-beta.
+        """
+        stand_pat = position.evaluate() if stats is None else stats.evaluate(position)
+        if depth == 0 or self.remaining <= 0 or position.winner() is not None:
+            return stand_pat
+        moves = position.get_all_moves(YELLOW if max_player else PURPLE)  # Captures come with their captured pieces
+        forced = position.rules.forced_capture
+        if forced:
+            # A capture that must be played cannot be declined: no stand pat, and no pruning by
+            # material. The forced generator only returns captures when there are any.
+            if not moves or not captured_count(moves[0]):
+                return stand_pat  # Quiet position
+            best = float('-inf') if max_player else float('inf')
+        else:
+            # The side to move may decline every capture and keep the static score
+            if max_player:
+                if stand_pat >= beta:
+                    return stand_pat
+                alpha = max(alpha, stand_pat)
+            else:
+                if stand_pat <= alpha:
+                    return stand_pat
+                beta = min(beta, stand_pat)
+            best = stand_pat
+
+        captures = sorted(((captured_count(move), move) for move in moves if captured_count(move)),
+                          key=lambda pair: pair[0], reverse=True)  # Most pieces first
+        piece_value = self.piece_value(position.evaluator) if captures and not forced else 0.0
+        for count, move in captures:
+            # Delta pruning: even the best case of this capture cannot reach the window.
+            # Captures are sorted by count, so no later capture can either.
+            gain = count * piece_value + self.delta_margin
+            if not forced and ((stand_pat + gain <= alpha) if max_player else (stand_pat - gain >= beta)):
+                break
+            if self.remaining <= 0:
+                break
+            self.remaining -= 1
+            if counter is not None:
+                counter.nodes += 1
+            if stats is not None:
+                stats.quiescence_nodes += 1
+            undo = position.make_move(move)
+            try:
+                score = self._search(position, not max_player, alpha, beta, depth - 1, counter, stats)
+            finally:
+                position.unmake_move(undo)
+            if max_player:
+                if score > best:
+                    best = score
+                alpha = max(alpha, score)
+            else:
+                if score < best:
+                    best = score
+                beta = min(beta, score)
+            if alpha >= beta:
+                break
+        return best if best not in (float('-inf'), float('inf')) else stand_pat  # Out of nodes before any capture
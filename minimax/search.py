@@ -0,0 +1,220 @@
+# Iterative deepening driver for the AI turn
+import time
+
+from checker.bitboard import BitBoard
+from checker.zobrist import SIDE_KEY
+from minimax.algorithm import NodeCounter, SearchTimeout, search_position, encode_move, YELLOW, PURPLE
+from minimax.quiescence import Quiescence
+from minimax.transposition import TranspositionTable, EXACT, NO_MOVE
+
+
+class SearchResult:
+    """
+    The outcome of a timed search: the chosen move and how far the search got.
+    """
+    def __init__(self, value, move, board, depth, nodes, elapsed, pv, stats=None):
+        """
+        Initializes the result.
+
+        Args:
+            value (float): The evaluation of the chosen move at the last completed depth.
+            move (tuple): The chosen move tuple, or None if there was nothing to play.
+            board: The board after the chosen move, of the same type as the searched board.
+            depth (int): The last depth that was searched completely.
+            nodes (int): The number of positions visited over all iterations.
+            elapsed (float): The wall-clock time spent, in seconds.
+            pv (list): The principal variation (expected line of play) as move tuples.
+            stats (SearchStats): The statistics collected during the search, if any were asked for.
+        """
+        self.value = value
+        self.move = move
+        self.board = board
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.pv = pv
+        self.stats = stats
+
+    @property
+    def nps(self):
+        """
+        Nodes searched per second.
+        """
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"SearchResult(value={self.value}, depth={self.depth}, nodes={self.nodes}, "
+                f"elapsed={self.elapsed:.3f}s, nps={self.nps:.0f})")
+
+
+QUIESCENCE = Quiescence()  # Used by search unless another one (or None) is given
+
+
+def search(board, time_ms=200, max_depth=20, max_player=True, tt=None, tablebase=None, stats=None,
+           quiescence=QUIESCENCE, cache=None, batch=None):
+    """
+    Searches one ply deeper at a time until the time budget would be exceeded, and returns
+    the best move of the last depth that finished. Each iteration tries the previous
+    iteration's principal variation first, which makes the deeper searches much cheaper.
+
+    Args:
+        board: The position to search (a Board or a BitBoard). It is not modified.
+        time_ms (float): The wall-clock budget for the whole move, in milliseconds.
+        max_depth (int): The deepest iteration to run even when time is left.
+        max_player (bool): True if the maximizing (YELLOW, AI) player is to move.
+        tt (TranspositionTable): The table to use; a fresh one is created when not given.
+        tablebase (Tablebase): Endgame tables giving exact scores of positions with few pieces.
+        stats (SearchStats): Filled with detailed statistics of every iteration when given.
+        quiescence (Quiescence): Plays out the captures at the leaves; None evaluates the leaves directly.
+        cache (SearchCache): Search state kept from earlier moves of the game (see minimax.cache);
+            when given, its transposition table replaces tt and it is updated with this search.
+        batch (LeafBatcher): Scores the leaves in vectorized batches (see minimax.batch); only used
+            when quiescence is None.
+
+    Returns:
+        SearchResult: The chosen move and search statistics.
+    """
+    start = time.perf_counter()
+    deadline = start + time_ms / 1000
+    position = board if isinstance(board, BitBoard) else BitBoard.from_board(board)  # Search on integers
+    pv, heuristics = [], None
+    if cache is not None:
+        tt, heuristics = cache.tt, cache.heuristics
+        pv = cache.start(position, max_player)  # Searched first if the game followed the last expected line
+    elif tt is None:
+        tt = TranspositionTable()
+    tt.new_search()
+    counter = NodeCounter()
+
+    value, move, depth = position.evaluate(), None, 0
+    last_duration = previous_duration = 0.0
+    for current in range(1, max_depth + 1):
+        now = time.perf_counter()
+        if current > 1:
+            # Predict the next iteration from how fast the last ones grew, and stop early if it cannot finish
+            growth = last_duration / previous_duration if previous_duration > 0 else 4.0
+            if now + last_duration * max(growth, 1.0) > deadline:
+                break
+        seed_pv(position, max_player, pv, tt)
+        try:
+            # The first iteration always completes so there is a move to play
+            result = search_position(position, current, max_player, float('-inf'), float('inf'),
+                                     counter, tt, 0, None if current == 1 else deadline, tablebase, stats,
+                                     quiescence, heuristics, batch)
+        except SearchTimeout:
+            break  # Keep the move from the last completed depth
+        previous_duration, last_duration = last_duration, time.perf_counter() - now
+        value, best = result
+        depth = current
+        if best is None:
+            break  # Game over or no legal move: deeper searches cannot change anything
+        move = best
+        pv = principal_variation(position, max_player, tt, current)
+        if stats is not None:
+            stats.iteration(current, value, pv, counter.nodes, time.perf_counter() - start)
+        if tablebase is not None and (position.yellow | position.purple).bit_count() <= tablebase.max_pieces:
+            break  # Every child already has its exact tablebase score: deeper iterations add nothing
+
+    elapsed = time.perf_counter() - start
+    if stats is not None:
+        stats.elapsed += elapsed
+    if cache is not None and move is not None:
+        cache.remember(position, max_player, pv)
+    if move is None:
+        new_board = board
+    else:
+        child = position.apply(move)
+        new_board = child if isinstance(board, BitBoard) else child.to_board()
+    return SearchResult(value, move, new_board, depth, counter.nodes, elapsed, pv, stats)
+
+
+def ponder(board, max_player, cache, time_ms=50, max_depth=20, tablebase=None, quiescence=QUIESCENCE):
+    """
+    Searches a position for a short slice of time to fill a SearchCache before the position
+    is reached, e.g. the one expected after the opponent's reply while the opponent thinks.
+    Call it again for the next slice: deepening resumes at the depth the last slice of the
+    same position was working on, and an iteration cut off by the end of a slice picks up
+    the entries it already stored, so no slice starts over.
+
+    Args:
+        board: The position to search (a Board or a BitBoard). It is not modified.
+        max_player (bool): True if the maximizing (YELLOW) player is to move in it.
+        cache (SearchCache): The cache the later search of the position will use.
+        time_ms (float): The length of the slice, in milliseconds.
+        max_depth (int): The depth after which pondering has nothing left to do.
+        tablebase (Tablebase): Endgame tables giving exact scores of positions with few pieces.
+        quiescence (Quiescence): Plays out the captures at the leaves; None evaluates the leaves directly.
+
+    Returns:
+        int: The deepest depth completed for the position so far.
+    """
+    deadline = time.perf_counter() + time_ms / 1000
+    position = board if isinstance(board, BitBoard) else BitBoard.from_board(board)
+    key = position.zobrist ^ SIDE_KEY if max_player else position.zobrist
+    if cache.ponder_key != key:
+        cache.ponder_key, cache.ponder_depth = key, 0
+    pv = cache.start(position, max_player)
+    while cache.ponder_depth < max_depth and time.perf_counter() < deadline:
+        seed_pv(position, max_player, pv, cache.tt)
+        try:
+            value, best = search_position(position, cache.ponder_depth + 1, max_player, float('-inf'), float('inf'),
+                                          None, cache.tt, 0, deadline, tablebase, None, quiescence, cache.heuristics)
+        except SearchTimeout:
+            break
+        cache.ponder_depth += 1
+        if best is None:
+            cache.ponder_depth = max_depth  # Game over: nothing to ponder
+            break
+        pv = principal_variation(position, max_player, cache.tt, cache.ponder_depth)
+        cache.remember(position, max_player, pv)
+    return cache.ponder_depth
+
+
+def principal_variation(position, max_player, tt, depth):
+    """
+    Follows the best moves stored in the transposition table from a position.
+
+    Args:
+        position (BitBoard): The root position.
+        max_player (bool): True if the maximizing player is to move at the root.
+        tt (TranspositionTable): The table filled by the search.
+        depth (int): The longest line to return.
+
+    Returns:
+        list: The expected line of play as move tuples.
+    """
+    line = []
+    current = position.copy()
+    for _ in range(depth):
+        entry = tt.peek(current.zobrist ^ SIDE_KEY if max_player else current.zobrist)
+        if entry is None or entry[3] == NO_MOVE:
+            break
+        moves = current.get_all_moves(YELLOW if max_player else PURPLE)
+        move = next((m for m in moves if encode_move(current, m) == entry[3]), None)
+        if move is None:
+            break
+        line.append(move)
+        current.make_move(move)
+        max_player = not max_player
+    return line
+
+
+def seed_pv(position, max_player, pv, tt):
+    """
+    Makes sure the moves of the previous principal variation are in the transposition table,
+    so the next iteration searches them first even if their entries were overwritten.
+
+    Args:
+        position (BitBoard): The root position.
+        max_player (bool): True if the maximizing player is to move at the root.
+        pv (list): The previous principal variation.
+        tt (TranspositionTable): The table used by the search.
+    """
+    current = position.copy()
+    for move in pv:
+        key = current.zobrist ^ SIDE_KEY if max_player else current.zobrist
+        entry = tt.peek(key)
+        if entry is None:
+            tt.store(key, 0, EXACT, 0.0, encode_move(current, move))  # Depth 0: used for ordering only
+        current.make_move(move)
+        max_player = not max_player
@@ -0,0 +1,245 @@
+# Optional statistics collected while searching, to see where the time of an AI move goes
+import time
+
+from checker.notation import move_to_text, square_name
+from checker.tables import SQUARE_OF
+
+# The search only touches a SearchStats when one is passed to it; without one every hook is a
+# single "is not None" test, so searches that do not ask for statistics pay next to nothing.
+
+
+def move_name(move):
+    """
+    Writes a move of either board type as text, e.g. "9-13" or "22x15".
+
+    Args:
+        move (tuple): A BitBoard move tuple or a Board (piece, row, col, skipped) tuple,
+            taken before the move is played.
+
+    Returns:
+        str: The move text.
+    """
+    if len(move) == 3:
+        return move_to_text(move)
+    piece, row, col, skipped = move
+    return (square_name(SQUARE_OF[(piece.row, piece.col)]) + ('x' if skipped else '-')
+            + square_name(SQUARE_OF[(row, col)]))
+
+
+class SearchStats:
+    """
+    Counts what a search does: nodes per ply, leaf evaluations, move generation calls and
+    their time, branching factor, cutoffs and cache hits, and the principal variation of
+    every iteration. Pass one as the stats argument of minimax, search_position or search.
+
+    With trace_depth set, the nodes are also counted per line of moves from the root, which
+    write_collapsed exports in the collapsed-stack format read by flamegraph tools.
+    """
+    def __init__(self, trace_depth=0):
+        """
+        Initializes empty statistics.
+
+        Args:
+            trace_depth (int): How many plies of the line of moves to keep for the trace; 0 for no trace.
+        """
+        self.trace_depth = trace_depth
+        self.nodes_by_ply = []  # Positions visited at each distance from the root
+        self.leaves = 0  # Positions evaluated statically
+        self.quiescence_nodes = 0  # Captures searched below the leaves
+        self.evaluation_time = 0.0
+        self.generations = 0  # get_all_moves calls
+        self.generation_time = 0.0
+        self.moves_generated = 0
+        self.cutoffs = 0  # Nodes left early because alpha reached beta
+        self.first_move_cutoffs = 0  # ... by their first move: a measure of the move ordering
+        self.tt_hits = 0  # Transposition table entries found
+        self.tt_cutoffs = 0  # Nodes answered by the table without searching
+        self.tablebase_hits = 0
+        self.iterations = []  # One record per depth of an iterative deepening search
+        self.pv = []  # Principal variation of the last result, as move texts
+        self.value = None
+        self.elapsed = 0.0
+        self.line = []  # Moves from the root to the current node, while tracing
+        self.trace = {}  # Maps lines of moves (tuples of texts) to the nodes visited below them
+
+    @property
+    def nodes(self):
+        """
+        The total number of positions visited.
+        """
+        return sum(self.nodes_by_ply)
+
+    @property
+    def branching_factor(self):
+        """
+        The average number of moves of the positions whose moves were generated.
+        """
+        return self.moves_generated / self.generations if self.generations else 0.0
+
+    def node(self, ply):
+        """
+        Counts a visited position.
+
+        Args:
+            ply (int): Its distance from the root.
+        """
+        if ply < len(self.nodes_by_ply):
+            self.nodes_by_ply[ply] += 1
+        else:
+            self.nodes_by_ply.extend([0] * (ply - len(self.nodes_by_ply)) + [1])
+        if self.trace_depth:
+            key = tuple(self.line[:min(ply, self.trace_depth)])
+            self.trace[key] = self.trace.get(key, 0) + 1
+
+    def enter(self, ply, move):
+        """
+        Records the move about to be searched at a ply, for the trace.
+        """
+        if ply < self.trace_depth:
+            del self.line[ply:]
+            self.line.append(move_name(move))
+
+    def evaluate(self, position):
+        """
+        Evaluates a leaf position, counting and timing the evaluation.
+
+        Returns:
+            float: The evaluation.
+        """
+        start = time.perf_counter()
+        value = position.evaluate()
+        self.evaluation_time += time.perf_counter() - start
+        self.leaves += 1
+        return value
+
+    def generate(self, position, color):
+        """
+        Generates the moves of a position, counting and timing the call.
+
+        Returns:
+            list: The move tuples.
+        """
+        start = time.perf_counter()
+        moves = position.get_all_moves(color)
+        self.generation_time += time.perf_counter() - start
+        self.generations += 1
+        self.moves_generated += len(moves)
+        return moves
+
+    def cutoff(self, index):
+        """
+        Counts a cutoff.
+
+        Args:
+            index (int): The position of the move that caused it in the searched order.
+        """
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+    def iteration(self, depth, value, pv, nodes, elapsed):
+        """
+        Records a completed iteration of an iterative deepening search.
+
+        Args:
+            depth (int): The depth searched.
+            value (float): The value found.
+            pv (list): The principal variation as move tuples, taken from the root position.
+            nodes (int): The nodes visited so far.
+            elapsed (float): The seconds spent so far.
+        """
+        self.pv = [move_name(move) for move in pv]
+        self.value = value
+        self.iterations.append({'depth': depth, 'value': value, 'nodes': nodes,
+                                'seconds': round(elapsed, 6), 'pv': self.pv})
+
+    def result(self, value, pv, elapsed):
+        """
+        Records the outcome of a finished search.
+
+        Args:
+            value (float): The value of the root position.
+            pv (list): The principal variation as move tuples, taken from the root position.
+            elapsed (float): The seconds the search took.
+        """
+        self.value = value
+        self.pv = [move_name(move) for move in pv]
+        self.elapsed += elapsed
+
+    def to_dict(self):
+        """
+        Returns the statistics as a JSON-serializable dict.
+        """
+        return {
+            'nodes': self.nodes,
+            'nodes_by_ply': self.nodes_by_ply,
+            'elapsed': round(self.elapsed, 6),
+            'nps': round(self.nodes / self.elapsed) if self.elapsed > 0 else 0,
+            'leaves': self.leaves,
+            'quiescence_nodes': self.quiescence_nodes,
+            'evaluation_seconds': round(self.evaluation_time, 6),
+            'move_generations': self.generations,
+            'move_generation_seconds': round(self.generation_time, 6),
+            'branching_factor': round(self.branching_factor, 3),
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'tt_hits': self.tt_hits,
+            'tt_cutoffs': self.tt_cutoffs,
+            'tablebase_hits': self.tablebase_hits,
+            'value': self.value,
+            'pv': self.pv,
+            'iterations': self.iterations,
+        }
+
+    def to_json(self, path=None):
+        """
+        Writes the statistics as JSON.
+
+        Args:
+            path (str): The file to write, or None to only return the text.
+
+        Returns:
+            str: The JSON text.
+        """
+        import json  # Only needed for the export; imported here to keep the engine import light
+
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as file:
+                file.write(text + '\n')
+        return text
+
+    def write_collapsed(self, path, root='search'):
+        """
+        Writes the trace in the collapsed-stack format of flamegraph.pl, speedscope and
+        similar tools: one "root;move;move count" line per line of moves, weighted by nodes.
+
+        Args:
+            path (str): The file to write.
+            root (str): The name of the bottom frame.
+        """
+        with open(path, 'w') as file:
+            for line, nodes in sorted(self.trace.items()):
+                file.write(';'.join((root,) + line) + f" {nodes}\n")
+
+
+def profile(function, path, *args, **kwargs):
+    """
+    Runs a function under cProfile and saves the profile for pstats, snakeviz and similar tools.
+
+    Args:
+        function (callable): The code to profile, e.g. search.
+        path (str): The .prof file to write.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        The value returned by the function.
+    """
+    import cProfile  # Only needed when profiling; imported here to keep the engine import light
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
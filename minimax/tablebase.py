@@ -0,0 +1,413 @@
+"""
+Endgame tablebases: every position with up to a few pieces solved exactly by retrograde
+analysis, stored on disk and probed through memory maps during the search.
+
+Generate the tables once, from the repository root:
+    python -m minimax.tablebase --max-pieces 4 --out tablebase
+"""
+import argparse
+import mmap
+import os
+import time
+from array import array
+from itertools import combinations
+
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW, PURPLE
+from checker.rules import CASUAL
+from checker.tables import SQUARES, ROW_OF
+
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tablebase')
+MAGIC = b'CTB1'
+HEADER = len(MAGIC) + 4  # Magic followed by the four piece counts of the signature
+
+WIN_SCORE = 1000.0  # Above any evaluation; a win in d plies scores WIN_SCORE - d for the winner
+
+# One byte per position: 0 is a draw, 1 to 127 a win for the side to move in that many
+# plies, 128 + d a loss in d plies (128 itself: no piece or no move left).
+DRAW, LOSS = 0, 128
+MAX_DISTANCE = 127
+
+# Squares a man may stand on: a YELLOW man on the last row or a PURPLE man on the first
+# row would already have been crowned.
+YELLOW_MEN_SQUARES = tuple(square for square in range(SQUARES) if ROW_OF[square] != 7)
+PURPLE_MEN_SQUARES = tuple(square for square in range(SQUARES) if ROW_OF[square] != 0)
+
+# BINOMIAL[n][k] is n choose k, for the combinatorial index of piece placements
+_rows = [[1] + [0] * SQUARES]
+for _n in range(1, SQUARES + 1):
+    _rows.append([1] + [_rows[-1][k - 1] + _rows[-1][k] for k in range(1, SQUARES + 1)])
+BINOMIAL = tuple(map(tuple, _rows))
+
+
+def signature(yellow, purple, kings):
+    """
+    Returns the material of a position: (YELLOW men, YELLOW kings, PURPLE men, PURPLE kings).
+    """
+    return ((yellow & ~kings).bit_count(), (yellow & kings).bit_count(),
+            (purple & ~kings).bit_count(), (purple & kings).bit_count())
+
+
+def table_size(counts):
+    """
+    Returns the number of piece placements of a signature (each stored twice, once per side to move).
+
+    Args:
+        counts (tuple): The signature.
+
+    Returns:
+        int: The number of placements.
+    """
+    size, free = 1, SQUARES
+    for count in counts:
+        size *= BINOMIAL[free][count]
+        free -= count
+    return size
+
+
+def placement_index(yellow, purple, kings):
+    """
+    Returns the perfect index of a placement within its signature. The YELLOW men, YELLOW
+    kings, PURPLE men and PURPLE kings are ranked in turn among the squares still free, each
+    group as a combination in the combinatorial number system.
+
+    Args:
+        yellow (int): Mask of the YELLOW pieces.
+        purple (int): Mask of the PURPLE pieces.
+        kings (int): Mask of the kings.
+
+    Returns:
+        int: The index, from 0 to table_size(signature) - 1.
+    """
+    index, taken, free = 0, 0, SQUARES
+    for group in (yellow & ~kings, yellow & kings, purple & ~kings, purple & kings):
+        rank, count, rest = 0, 0, group
+        while rest:
+            low = rest & -rest
+            count += 1
+            # Number the square among the squares no earlier group occupies
+            rank += BINOMIAL[low.bit_length() - 1 - (taken & (low - 1)).bit_count()][count]
+            rest ^= low
+        index = index * BINOMIAL[free][count] + rank
+        taken |= group
+        free -= count
+    return index
+
+
+def table_name(counts):
+    """
+    Returns the file name of a signature's table: its four counts, e.g. '0111.ctb' for
+    one YELLOW king against one PURPLE man and one PURPLE king.
+    """
+    return ''.join(map(str, counts)) + '.ctb'
+
+
+def signatures(max_pieces):
+    """
+    Lists the signatures with at least one piece per side and at most max_pieces in total,
+    in an order where every table only depends on the ones before it: fewer pieces first
+    (captures), then fewer men (promotions).
+
+    Args:
+        max_pieces (int): The largest number of pieces on the board.
+
+    Returns:
+        list: The signatures.
+    """
+    found = []
+    for total in range(2, max_pieces + 1):
+        for yellow in range(1, total):
+            purple = total - yellow
+            for yellow_men in range(yellow + 1):
+                for purple_men in range(purple + 1):
+                    found.append((yellow_men, yellow - yellow_men, purple_men, purple - purple_men))
+    found.sort(key=lambda counts: (sum(counts), counts[0] + counts[2]))
+    return found
+
+
+def placements(counts):
+    """
+    Yields every legal placement of a signature.
+
+    Args:
+        counts (tuple): The signature.
+
+    Yields:
+        tuple: (yellow, purple, kings) masks.
+    """
+    yellow_men, yellow_kings, purple_men, purple_kings = counts
+
+    def masks(pool, count, taken):
+        for chosen in combinations([square for square in pool if not taken >> square & 1], count):
+            yield sum(1 << square for square in chosen)
+
+    every = range(SQUARES)
+    for a in masks(YELLOW_MEN_SQUARES, yellow_men, 0):
+        for b in masks(every, yellow_kings, a):
+            for c in masks(PURPLE_MEN_SQUARES, purple_men, a | b):
+                for d in masks(every, purple_kings, a | b | c):
+                    yield a | b, c | d, b | d
+
+
+def encode(win, distance):
+    """
+    Packs a won or lost position into its byte.
+    """
+    if distance > MAX_DISTANCE:
+        raise ValueError(f"distance {distance} does not fit the table format")
+    return distance if win else LOSS + distance
+
+
+def decode(value):
+    """
+    Unpacks a byte into (result for the side to move: 1 win, 0 draw, -1 loss, distance in plies).
+    """
+    if value == DRAW:
+        return 0, 0
+    if value < LOSS:
+        return 1, value
+    return -1, value - LOSS
+
+
+def solve(counts, solved):
+    """
+    Solves every position of one signature by retrograde analysis. Positions whose value
+    depends on another signature (after a capture or a promotion) look it up in the tables
+    already solved; positions never decided are draws.
+
+    Args:
+        counts (tuple): The signature.
+        solved (dict): The solved tables (bytes-like) of the signatures it depends on, by signature.
+
+    Returns:
+        bytearray: One value byte per (placement index * 2 + YELLOW to move).
+    """
+    size = 2 * table_size(counts)
+    values = bytearray(size)
+    resolved = bytearray(size)
+    remaining = array('i', bytes(4 * size))  # Successors not yet known to win for the opponent
+    longest = array('i', bytes(4 * size))  # Longest win among those known, plus one
+    successors = [None] * size
+    buckets = {}  # Distance -> positions decided at that distance, processed in increasing order
+
+    def push(distance, node, win):
+        buckets.setdefault(distance, []).append((node, win))
+
+    for yellow, purple, kings in placements(counts):
+        base = 2 * placement_index(yellow, purple, kings)
+        position = BitBoard(yellow, purple, kings)
+        for to_move in (0, 1):  # 1 when YELLOW is to move
+            node = base + to_move
+            color = YELLOW if to_move else PURPLE
+            moves = position.get_all_moves(color)
+            if not moves:
+                push(0, node, False)  # No move left: lost
+                continue
+            inside, best_win, draws, longest_loss = [], None, 0, 0
+            for move in moves:
+                after_yellow, after_purple, after_kings = position._after(move)[:3]
+                if not (after_purple if to_move else after_yellow):
+                    best_win = 1  # Captured the last piece
+                    continue
+                after = signature(after_yellow, after_purple, after_kings)
+                index = 2 * placement_index(after_yellow, after_purple, after_kings) + (1 - to_move)
+                if after == counts:
+                    inside.append(index)
+                    continue
+                result, distance = decode(solved[after][index])
+                if result < 0:
+                    best_win = distance + 1 if best_win is None else min(best_win, distance + 1)
+                elif result > 0:
+                    longest_loss = max(longest_loss, distance + 1)
+                else:
+                    draws += 1
+            if best_win is not None:
+                push(best_win, node, True)  # Tentative: a move inside the table may win sooner
+            successors[node] = inside
+            # The position can only be lost when every move, inside or outside the table, loses
+            remaining[node] = len(inside) + (size if draws or best_win is not None else 0)
+            longest[node] = longest_loss
+            if not inside and not draws and best_win is None:
+                push(longest_loss, node, False)
+
+    # Reverse edges, so each decided position can update the positions leading to it
+    predecessors = {}
+    for node, inside in enumerate(successors):
+        if inside:
+            for child in inside:
+                predecessors.setdefault(child, []).append(node)
+
+    distance = 0
+    while buckets:
+        for node, win in buckets.pop(distance, ()):
+            if resolved[node]:
+                continue
+            resolved[node] = 1
+            values[node] = encode(win, distance)
+            for parent in predecessors.get(node, ()):
+                if resolved[parent]:
+                    continue
+                if not win:
+                    push(distance + 1, parent, True)  # Moving into a lost position wins
+                else:
+                    longest[parent] = max(longest[parent], distance + 1)
+                    remaining[parent] -= 1
+                    if remaining[parent] == 0:
+                        push(longest[parent], parent, False)  # Every move leads to a win for the opponent
+        distance += 1
+    return values
+
+
+def generate(max_pieces, directory, log=print):
+    """
+    Solves and writes the tables of every signature with up to max_pieces pieces.
+
+    Args:
+        max_pieces (int): The largest number of pieces on the board.
+        directory (str): Where the table files are written.
+        log (callable): Receives a progress line per table.
+    """
+    os.makedirs(directory, exist_ok=True)
+    solved = {}
+    for counts in signatures(max_pieces):
+        start = time.perf_counter()
+        values = solve(counts, solved)
+        with open(os.path.join(directory, table_name(counts)), 'wb') as file:
+            file.write(MAGIC + bytes(counts))
+            file.write(values)
+        solved[counts] = values
+        wins = sum(1 for value in values if 0 < value < LOSS)
+        losses = sum(1 for value in values if value >= LOSS)
+        longest = max((decode(value)[1] for value in values), default=0)
+        log(f"{table_name(counts)}: {len(values)} positions, {wins} wins, {losses} losses, "
+            f"{len(values) - wins - losses} draws, longest {longest} plies, {time.perf_counter() - start:.1f}s")
+
+
+class Tablebase:
+    """
+    Probes the tables of a directory. Each table is memory-mapped, so opening the
+    tablebase is cheap, the operating system only reads the pages that are probed and
+    several processes share them.
+    """
+    def __init__(self, directory=TABLEBASE_DIR):
+        """
+        Maps every table found in the directory.
+
+        Args:
+            directory (str): The directory written by generate.
+        """
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = 0
+        self.hits = 0  # Successful probes, for statistics
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.ctb'):
+                continue
+            with open(os.path.join(directory, name), 'rb') as file:
+                table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            if table[:len(MAGIC)] != MAGIC:
+                table.close()
+                continue
+            counts = tuple(table[len(MAGIC):HEADER])
+            self.tables[counts] = table
+            self.max_pieces = max(self.max_pieces, sum(counts))
+        # Only piece counts whose tables are all present can be probed safely
+        while self.max_pieces and any(counts not in self.tables for counts in signatures(self.max_pieces)):
+            self.max_pieces -= 1
+
+    def __bool__(self):
+        return self.max_pieces > 0
+
+    def lookup(self, yellow, purple, kings, yellow_to_move):
+        """
+        Looks up a position.
+
+        Args:
+            yellow (int): Mask of the YELLOW pieces.
+            purple (int): Mask of the PURPLE pieces.
+            kings (int): Mask of the kings.
+            yellow_to_move (bool): True if YELLOW is to move.
+
+        Returns:
+            tuple or None: (result for the side to move: 1 win, 0 draw, -1 loss, distance in
+            plies), or None if the position has too many pieces.
+        """
+        own, opponent = (yellow, purple) if yellow_to_move else (purple, yellow)
+        if not own:
+            return -1, 0  # The side to move has no piece left
+        if not opponent:
+            return 1, 0  # Cannot arise in a game: the side that moved last always has a piece
+        if (yellow | purple).bit_count() > self.max_pieces:
+            return None
+        table = self.tables[signature(yellow, purple, kings)]
+        return decode(table[HEADER + 2 * placement_index(yellow, purple, kings) + yellow_to_move])
+
+    def probe(self, position, max_player):
+        """
+        Returns the exact score of a position for the search, from YELLOW's point of view.
+
+        Args:
+            position: A BitBoard or a Board.
+            max_player (bool): True if YELLOW (the maximizing player) is to move.
+
+        Returns:
+            float or None: WIN_SCORE - distance for a YELLOW win, its negation for a PURPLE
+            win, 0.0 for a draw, or None if the position is not in the tables.
+        """
+        if position.rules is not CASUAL:
+            return None  # The tables are solved with the casual rules, and are wrong for any other
+        if (position.yellow | position.purple).bit_count() > self.max_pieces:
+            return None
+        result = self.lookup(position.yellow, position.purple, position.kings, max_player)
+        if result is None:
+            return None
+        self.hits += 1
+        outcome, distance = result
+        if outcome == 0:
+            return 0.0
+        score = WIN_SCORE - distance
+        return score if (outcome > 0) == max_player else -score
+
+    def close(self):
+        """
+        Unmaps the tables.
+        """
+        for table in self.tables.values():
+            table.close()
+        self.tables.clear()
+        self.max_pieces = 0
+
+
+_opened = {}  # Tablebases already opened in this process, by directory
+
+
+def open_tablebase(directory=TABLEBASE_DIR):
+    """
+    Returns the tablebase of a directory, opening it only once per process.
+
+    Args:
+        directory (str): The directory written by generate.
+
+    Returns:
+        Tablebase or None: The tablebase, or None if the directory holds no complete set of tables.
+    """
+    if directory not in _opened:
+        tablebase = Tablebase(directory)
+        _opened[directory] = tablebase if tablebase else None
+    return _opened[directory]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-pieces', type=int, default=4)
+    parser.add_argument('--out', default=TABLEBASE_DIR)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    generate(args.max_pieces, args.out)
+    print(f"Tables up to {args.max_pieces} pieces written to {args.out} in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == '__main__':
+    main()
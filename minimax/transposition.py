@@ -0,0 +1,133 @@
+# Fixed-size transposition table for the minimax search
+from array import array
+
+# Bound types: how a stored score relates to the true value of the position
+EXACT = 0  # The score is the exact minimax value
+LOWER = 1  # The true value is at least the score (the search failed high)
+UPPER = 2  # The true value is at most the score (the search failed low)
+
+NO_MOVE = -1  # Stored when a position has no best move (leaf or no legal move)
+
+# Bytes used by one slot: key (8) + score (8) + move (4) + depth (1) + bound (1) + generation (1)
+ENTRY_SIZE = 23
+
+
+class TranspositionTable:
+    """
+    A hash table of searched positions with a fixed number of slots, stored in flat
+    typed arrays so that its memory use never grows past the configured budget.
+    Each slot holds the position hash, search depth, bound type, score and best move.
+    """
+    def __init__(self, memory_mb=16, policy='depth'):
+        """
+        Initializes an empty table.
+
+        Args:
+            memory_mb (float): The memory budget in megabytes; the number of slots is derived from it.
+            policy (str): The replacement policy when two positions share a slot:
+                'depth' keeps the deeper search unless the stored entry is from an older search,
+                'always' keeps the newest entry.
+        """
+        if policy not in ('depth', 'always'):
+            raise ValueError(f"unknown replacement policy: {policy!r}")
+        self.size = max(1, int(memory_mb * 1024 * 1024) // ENTRY_SIZE)  # Number of slots
+        self.policy = policy
+        self.keys = array('Q', bytes(8 * self.size))  # 0 marks an empty slot
+        self.scores = array('d', bytes(8 * self.size))
+        self.moves = array('l', [NO_MOVE]) * self.size
+        self.depths = array('b', bytes(self.size))
+        self.bounds = array('b', bytes(self.size))
+        self.generations = array('B', bytes(self.size))
+        self.generation = 0  # Bumped by new_search so old entries can be replaced first
+        self.hits = self.misses = self.overwrites = self.stores = 0
+
+    def new_search(self):
+        """
+        Marks the start of a new search: entries stored from now on are preferred
+        over the ones left by earlier searches.
+        """
+        self.generation = (self.generation + 1) % 256
+
+    def clear(self):
+        """
+        Empties the table and resets its counters.
+        """
+        self.__init__(self.size * ENTRY_SIZE / (1024 * 1024), self.policy)
+
+    def probe(self, key):
+        """
+        Looks up a position.
+
+        Args:
+            key (int): The 64-bit position hash.
+
+        Returns:
+            tuple or None: (depth, bound, score, move) if the position is stored, None otherwise.
+        """
+        index = key % self.size
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.depths[index], self.bounds[index], self.scores[index], self.moves[index]
+        self.misses += 1
+        return None
+
+    def peek(self, key):
+        """
+        Looks up a position like probe, without touching the hit and miss counters.
+
+        Args:
+            key (int): The 64-bit position hash.
+
+        Returns:
+            tuple or None: (depth, bound, score, move) if the position is stored, None otherwise.
+        """
+        index = key % self.size
+        if self.keys[index] == key:
+            return self.depths[index], self.bounds[index], self.scores[index], self.moves[index]
+        return None
+
+    def store(self, key, depth, bound, score, move=NO_MOVE):
+        """
+        Stores the result of searching a position, subject to the replacement policy.
+
+        Args:
+            key (int): The 64-bit position hash.
+            depth (int): The depth the position was searched to.
+            bound (int): EXACT, LOWER or UPPER.
+            score (float): The score found by the search.
+            move (int): The encoded best move, or NO_MOVE.
+        """
+        index = key % self.size
+        stored = self.keys[index]
+        if stored and stored != key:
+            # Another position lives here: only replace it if the policy allows
+            if (self.policy == 'depth' and self.generations[index] == self.generation
+                    and self.depths[index] > depth):
+                return
+            self.overwrites += 1
+        elif stored == key and move == NO_MOVE:
+            move = self.moves[index]  # Keep the best move found by an earlier search of this position
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.scores[index] = score
+        self.moves[index] = move
+        self.generations[index] = self.generation
+        self.stores += 1
+
+    def stats(self):
+        """
+        Returns the table's counters.
+
+        Returns:
+            dict: hits, misses, overwrites, stores, slots and the fraction of slots in use.
+        """
+        used = sum(1 for key in self.keys if key)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'overwrites': self.overwrites,
+            'stores': self.stores,
+            'slots': self.size,
+            'fill': used / self.size,
+        }
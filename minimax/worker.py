@@ -0,0 +1,251 @@
+# Runs the AI search in a separate process so the game loop never blocks on it
+from concurrent.futures import ProcessPoolExecutor
+
+from checker.bitboard import BitBoard
+from checker.evaluation import Evaluator
+from minimax.cache import SearchCache
+from minimax.search import search, ponder
+from minimax.stats import SearchStats
+from minimax.tablebase import open_tablebase
+
+_evaluators = {}  # Evaluators already built in this process, keyed by their weights
+_cache = None  # Search state kept between the searches run by this process
+
+
+def snapshot(board):
+    """
+    Serializes a position into a small picklable tuple.
+
+    Args:
+        board: The position (a Board or a BitBoard).
+
+    Returns:
+        tuple: The (yellow, purple, kings) masks.
+    """
+    position = board if isinstance(board, BitBoard) else BitBoard.from_board(board)
+    return position.yellow, position.purple, position.kings
+
+
+def evaluator_for(weights):
+    """
+    Returns an evaluator for the given weights, reusing the one built earlier in this process.
+
+    Args:
+        weights (dict): Term weights, or None for the defaults.
+
+    Returns:
+        Evaluator: The evaluator.
+    """
+    key = tuple(sorted(weights.items())) if weights else None
+    if key not in _evaluators:
+        _evaluators[key] = Evaluator(weights)
+    return _evaluators[key]
+
+
+def process_cache(memory_mb, weights, rules, generation=0):
+    """
+    Returns the search cache of this process, emptied first if it was filled for other
+    evaluation weights or rules, whose scores and moves would not apply, or for an
+    earlier generation of the worker that submitted the search.
+
+    Args:
+        memory_mb (float): The memory cap of the cache; a cache of another size is replaced.
+        weights (dict): The evaluation weights of the search, or None for the defaults.
+        rules (Rules): The rules of the search, or None for CASUAL.
+        generation (int): Bumped by SearchWorker.clear_cache, so every process of its pool
+            empties its cache before the next search it runs.
+
+    Returns:
+        SearchCache: The cache.
+    """
+    global _cache
+    if _cache is None or _cache.memory_mb != memory_mb:
+        _cache = SearchCache(memory_mb)
+    owner = (tuple(sorted(weights.items())) if weights else None, rules.name if rules else 'casual', generation)
+    if _cache.owner != owner:
+        _cache.clear()
+        _cache.owner = owner
+    return _cache
+
+
+def run_search(position, max_player, time_ms, max_depth, weights=None, tablebase_dir=None, collect_stats=False,
+               rules=None, cache_mb=0, generation=0, table_only=False):
+    """
+    Entry point executed inside the worker process.
+
+    Args:
+        position (tuple): The snapshot produced by snapshot().
+        max_player (bool): True if the maximizing (YELLOW, AI) player is to move.
+        time_ms (float): The time budget for the move, in milliseconds.
+        max_depth (int): The deepest iteration to run.
+        weights (dict): The evaluation weights, or None for the defaults.
+        tablebase_dir (str): The directory of the endgame tables, or None to search without them.
+        collect_stats (bool): Whether to collect SearchStats, returned as the result's stats.
+        rules (Rules): The rules of the game, or None for CASUAL.
+        cache_mb (float): The memory cap of the search cache kept by the process between
+            searches; 0 searches with a fresh table every time.
+        generation (int): The cache generation of the submitting worker, see process_cache.
+        table_only (bool): Keep only the transposition table of the cache between searches, for
+            processes that search for many games at once: its entries are keyed by position and
+            hold for any game, while the move heuristics and the last principal variation only
+            hold for the game they were learned in.
+
+    Returns:
+        SearchResult: The search result; its board is a BitBoard.
+    """
+    board = BitBoard(*position, evaluator=evaluator_for(weights), rules=rules)
+    tablebase = open_tablebase(tablebase_dir) if tablebase_dir else None  # Mapped once per process
+    stats = SearchStats() if collect_stats else None
+    cache = process_cache(cache_mb, weights, rules, generation) if cache_mb else None
+    if cache is not None and table_only:
+        return search(board, time_ms=time_ms, max_depth=max_depth, max_player=max_player, tt=cache.tt,
+                      tablebase=tablebase, stats=stats)
+    return search(board, time_ms=time_ms, max_depth=max_depth, max_player=max_player, tablebase=tablebase,
+                  stats=stats, cache=cache)
+
+
+def run_ponder(position, max_player, time_ms, max_depth, weights, tablebase_dir, rules, cache_mb, generation=0):
+    """
+    Entry point of one pondering slice executed inside the worker process; the arguments
+    are those of run_search.
+
+    Returns:
+        int: The deepest depth completed for the position so far.
+    """
+    board = BitBoard(*position, evaluator=evaluator_for(weights), rules=rules)
+    tablebase = open_tablebase(tablebase_dir) if tablebase_dir else None
+    cache = process_cache(cache_mb, weights, rules, generation)
+    return ponder(board, max_player, cache, time_ms, max_depth, tablebase)
+
+
+class SearchWorker:
+    """
+    Runs one search at a time in a background process and lets the caller poll for
+    the result without blocking. A search started for a position that is no longer
+    current can be cancelled: its result is discarded when it arrives, and because
+    every search is bounded by its time budget the worker is free again shortly after.
+
+    The worker process keeps a SearchCache between searches, so each move starts from what
+    the previous ones learned. Between the AI's moves the worker can ponder: search the
+    position expected after the opponent's reply in short slices, each submitted by poll
+    when the last one is done, so a real search never waits for more than one slice.
+    """
+    def __init__(self, processes=1, tablebase_dir=None, cache_mb=16):
+        """
+        Initializes the worker; the process pool itself is started on the first search.
+
+        Args:
+            processes (int): The number of worker processes in the pool. The cache only carries over
+                from move to move with a single process, since every process keeps its own.
+            tablebase_dir (str): The directory of the endgame tables, or None to search without them.
+            cache_mb (float): The memory cap of the search cache; 0 disables the cache and pondering.
+        """
+        self.processes = processes
+        self.tablebase_dir = tablebase_dir
+        self.cache_mb = cache_mb
+        self.executor = None  # Created lazily so that importing this module stays cheap
+        self.future = None  # The search in flight, if any
+        self.position = None  # Snapshot the search in flight was started from
+        self.pondering = None  # Arguments of the pondering slices while pondering
+        self.ponder_future = None  # The pondering slice in flight, if any
+        self.generation = 0  # Cache generation sent with every search; bumped by clear_cache
+
+    def start(self, board, max_player=True, time_ms=200, max_depth=20, collect_stats=False):
+        """
+        Starts searching a position in the background. Does nothing if a search is already running.
+
+        Args:
+            board: The position to search (a Board or a BitBoard); it is copied, not shared.
+            max_player (bool): True if the maximizing (YELLOW, AI) player is to move.
+            time_ms (float): The time budget for the move, in milliseconds.
+            max_depth (int): The deepest iteration to run.
+            collect_stats (bool): Whether the result should carry detailed SearchStats.
+        """
+        if self.future is not None:
+            return
+        self.stop_pondering()  # The slice already running finishes first; no new one is started
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        self.position = snapshot(board)
+        self.future = self.executor.submit(run_search, self.position, max_player, time_ms, max_depth,
+                                           board.evaluator.weights, self.tablebase_dir, collect_stats, board.rules,
+                                           self.cache_mb, self.generation)
+
+    def ponder(self, board, max_player=True, max_depth=20, slice_ms=50):
+        """
+        Starts pondering a position, e.g. the one expected after the opponent's reply to the
+        AI's move. Keep calling poll so the next slices are submitted; start stops pondering.
+        Does nothing when the worker has no cache.
+
+        Args:
+            board: The position to ponder (a Board or a BitBoard); it is copied, not shared.
+            max_player (bool): True if the maximizing (YELLOW, AI) player is to move in it.
+            max_depth (int): The depth after which pondering stops.
+            slice_ms (float): The length of each slice; the longest a search started meanwhile waits.
+        """
+        if not self.cache_mb:
+            return
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        self.pondering = (snapshot(board), max_player, slice_ms, max_depth, board.evaluator.weights,
+                          self.tablebase_dir, board.rules, self.cache_mb, self.generation)
+        if self.ponder_future is None:
+            self.ponder_future = self.executor.submit(run_ponder, *self.pondering)
+
+    def stop_pondering(self):
+        """
+        Stops submitting pondering slices.
+        """
+        self.pondering = None
+        if self.ponder_future is not None and self.ponder_future.cancel():
+            self.ponder_future = None  # Had not started yet
+
+    def pending(self):
+        """
+        Returns True while a search is running or waiting for its result to be collected.
+        """
+        return self.future is not None
+
+    def poll(self):
+        """
+        Collects the result of the running search if it has finished, without waiting.
+
+        Returns:
+            tuple or None: (snapshot searched, SearchResult) when a result is ready, None otherwise.
+        """
+        if self.ponder_future is not None and self.ponder_future.done():
+            depth = self.ponder_future.result()
+            self.ponder_future = None
+            if self.pondering is not None and depth < self.pondering[3]:
+                self.ponder_future = self.executor.submit(run_ponder, *self.pondering)  # Next slice
+        if self.future is None or not self.future.done():
+            return None
+        future, position = self.future, self.position
+        self.future = self.position = None
+        return position, future.result()
+
+    def cancel(self):
+        """
+        Forgets the running search, e.g. after the game was reset; its result will be ignored.
+        """
+        if self.future is not None:
+            self.future.cancel()  # Only succeeds if the search has not started yet
+        self.future = self.position = None
+        self.stop_pondering()
+
+    def clear_cache(self):
+        """
+        Empties the search caches of the worker processes, e.g. for a new game. Every search
+        started afterwards carries the next generation, so whichever process runs it empties
+        its own cache first, however many processes the pool has.
+        """
+        self.generation += 1
+
+    def shutdown(self):
+        """
+        Cancels any search and stops the worker processes without waiting for them.
+        """
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
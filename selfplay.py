@@ -0,0 +1,300 @@
+"""
+Plays batches of AI-vs-AI games between two engine configurations without a window.
+
+Each opening is played twice with the colours swapped. Games are spread over worker
+processes, every finished game is appended to a JSONL file, and the totals are printed
+with an Elo-difference estimate at the end.
+
+Run from the repository root, e.g.:
+    python selfplay.py --games 200 --a-depth 6 --b-depth 6 --b-weights weights.json --out games.jsonl
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import YELLOW, PURPLE
+from checker.notation import move_to_text, parse_move
+from checker.rules import RULES, rules_named
+from checker.termination import GameHistory, game_result, irreversible, DRAW
+from minimax.book import open_book
+from minimax.search import QUIESCENCE, search
+from minimax.tablebase import open_tablebase
+from minimax.transposition import TranspositionTable
+from minimax.worker import evaluator_for
+
+ENGINES = ('A', 'B')
+
+
+def engine_config(name, depth=None, time_ms=None, weights=None, memory_mb=16, tablebase_dir=None, book=None,
+                  quiescence=True):
+    """
+    Describes one engine of a match as a picklable dict.
+
+    Args:
+        name (str): The name used in the results ('A' or 'B').
+        depth (int): The deepest iteration per move, or None for no limit (then time_ms is required).
+        time_ms (float): The time budget per move in milliseconds, or None for no limit.
+        weights (dict): The evaluation weights, or None for the defaults.
+        memory_mb (float): The engine's transposition table budget.
+        tablebase_dir (str): The directory of the endgame tables the engine probes, or None.
+        book (str): The opening book file the engine plays from before searching, or None.
+        quiescence (bool): Whether the engine plays out captures at the leaves of its search.
+
+    Returns:
+        dict: The engine configuration.
+    """
+    if depth is None and time_ms is None:
+        raise ValueError(f"engine {name} needs a depth or a time budget")
+    return {'name': name, 'depth': depth, 'time_ms': time_ms, 'weights': weights, 'memory_mb': memory_mb,
+            'tablebase_dir': tablebase_dir, 'book': book, 'quiescence': quiescence}
+
+
+def random_openings(count, plies, seed=0, rules=None):
+    """
+    Generates distinct openings by playing random legal moves from the starting position.
+
+    Args:
+        count (int): The number of openings.
+        plies (int): The number of moves in each opening.
+        seed (int): The random seed, so the same openings are generated every run.
+        rules (Rules): The rules the moves must be legal under; CASUAL if not given.
+
+    Returns:
+        list: The openings, each a list of move texts.
+    """
+    rng = random.Random(seed)
+    openings, seen = [], set()
+    attempts = 0
+    while len(openings) < count and attempts < count * 100:
+        attempts += 1
+        position, color, line = BitBoard.from_board(Board(rules=rules)), PURPLE, []
+        for _ in range(plies):
+            moves = position.get_all_moves(color)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            line.append(move_to_text(move, position))
+            position.make_move(move)
+            color = YELLOW if color == PURPLE else PURPLE
+        if tuple(line) not in seen:
+            seen.add(tuple(line))
+            openings.append(line)
+    return openings
+
+
+def load_openings(path):
+    """
+    Reads openings from a text file with one opening per line, as space-separated
+    move texts; blank lines and lines starting with '#' are skipped.
+
+    Args:
+        path (str): The path of the openings file.
+
+    Returns:
+        list: The openings, each a list of move texts.
+    """
+    with open(path) as file:
+        return [line.split() for line in file if line.strip() and not line.startswith('#')]
+
+
+def play_game(index, opening, yellow, purple, max_plies, rules=None):
+    """
+    Plays one game between two engines. PURPLE moves first, as in the interactive game.
+
+    Args:
+        index (int): The number of the game in the match.
+        opening (list): Move texts played before the engines take over.
+        yellow (dict): The configuration of the engine playing YELLOW.
+        purple (dict): The configuration of the engine playing PURPLE.
+        max_plies (int): Moves after which the game is scored as a draw.
+        rules (Rules): The rules of the game; CASUAL if not given.
+
+    Returns:
+        dict: The game record.
+    """
+    engines = {YELLOW: yellow, PURPLE: purple}
+    tables = {color: TranspositionTable(config['memory_mb']) for color, config in engines.items()}
+    tablebases = {color: open_tablebase(config['tablebase_dir']) if config['tablebase_dir'] else None
+                  for color, config in engines.items()}
+    books = {color: open_book(config['book']) if config['book'] else None for color, config in engines.items()}
+    position, color = BitBoard.from_board(Board(rules=rules)), PURPLE
+    history = GameHistory(position, yellow_to_move=False)
+    moves, times_ms = [], []
+
+    def play(move):
+        nonlocal color
+        moves.append(move_to_text(move, position))
+        reset = irreversible(position, move)
+        position.make_move(move)
+        color = YELLOW if color == PURPLE else PURPLE
+        history.push(position, color == YELLOW, reset)
+
+    for text in opening:
+        play(parse_move(position, text, color))
+
+    winner, reason = None, 'move limit'
+    while len(moves) < max_plies:
+        outcome = game_result(position, color, history)
+        if outcome == DRAW:
+            reason = history.draw
+            break
+        if outcome is not None:
+            winner, reason = outcome, 'no pieces' if not (position.yellow and position.purple) else 'no moves'
+            break
+        config = engines[color]
+        if books[color] is not None:
+            start = time.perf_counter()
+            move = books[color].choose(position, color == YELLOW)
+            if move is not None:
+                times_ms.append(round((time.perf_counter() - start) * 1000, 2))
+                play(move)
+                continue
+        # Every engine scores positions with its own weights
+        board = BitBoard(position.yellow, position.purple, position.kings,
+                         evaluator=evaluator_for(config['weights']), rules=position.rules)
+        result = search(board, time_ms=config['time_ms'] if config['time_ms'] is not None else float('inf'),
+                        max_depth=config['depth'] or 100, max_player=color == YELLOW, tt=tables[color],
+                        tablebase=tablebases[color], quiescence=QUIESCENCE if config['quiescence'] else None)
+        times_ms.append(round(result.elapsed * 1000, 2))
+        play(result.move)
+
+    return {
+        'game': index,
+        'opening': opening,
+        'yellow': yellow['name'],
+        'purple': purple['name'],
+        'result': engines[winner]['name'] if winner is not None else 'draw',
+        'reason': reason,
+        'rules': position.rules.name,
+        'plies': len(moves),
+        'moves': moves,
+        'times_ms': times_ms,  # Engine moves only, the opening moves are not timed
+    }
+
+
+def elo_difference(wins, draws, losses):
+    """
+    Estimates the Elo difference between two engines from a match score.
+
+    Args:
+        wins (int): Games won by the first engine.
+        draws (int): Drawn games.
+        losses (int): Games lost by the first engine.
+
+    Returns:
+        tuple: (Elo difference, 95% error margin); infinite when one side scored everything.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, float('inf')
+    score = (wins + draws / 2) / games
+
+    def elo(p):
+        if p <= 0:
+            return float('-inf')
+        if p >= 1:
+            return float('inf')
+        return 400 * math.log10(p / (1 - p))
+
+    if score in (0, 1):
+        return elo(score), float('inf')
+    # Standard error of the mean score per game
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    error = 1.96 * math.sqrt(variance / games)
+    return elo(score), (elo(score + error) - elo(score - error)) / 2
+
+
+def run_match(engine_a, engine_b, games, openings, max_plies, out, processes=None, rules=None):
+    """
+    Plays a match and streams every finished game to a JSONL file.
+
+    Args:
+        engine_a (dict): The first engine configuration.
+        engine_b (dict): The second engine configuration.
+        games (int): The number of games; each opening is played with both colour assignments.
+        openings (list): The openings to cycle through.
+        max_plies (int): Moves after which a game is scored as a draw.
+        out (str): The path of the JSONL results file.
+        processes (int): The number of worker processes; defaults to the number of CPU cores.
+        rules (Rules): The rules the games are played with; CASUAL if not given.
+
+    Returns:
+        tuple: Wins, draws and losses of engine A.
+    """
+    tally = {engine_a['name']: 0, 'draw': 0, engine_b['name']: 0}
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as executor, open(out, 'w') as file:
+        futures = []
+        for index in range(games):
+            opening = openings[(index // 2) % len(openings)]
+            yellow, purple = (engine_a, engine_b) if index % 2 == 0 else (engine_b, engine_a)
+            futures.append(executor.submit(play_game, index, opening, yellow, purple, max_plies, rules))
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            file.write(json.dumps(record) + '\n')
+            file.flush()  # Results survive an interrupted match
+            tally[record['result']] += 1
+            print(f"\r{done}/{games} games  +{tally[engine_a['name']]} ={tally['draw']} -{tally[engine_b['name']]}",
+                  end='', flush=True)
+    print()
+    return tally[engine_a['name']], tally['draw'], tally[engine_b['name']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--openings', help='file with one opening per line, e.g. "9-13 22-18"')
+    parser.add_argument('--random-plies', type=int, default=4,
+                        help='length of the generated openings when no openings file is given')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=200)
+    parser.add_argument('--out', default='selfplay.jsonl')
+    parser.add_argument('--rules', choices=RULES, default='casual',
+                        help='forced: captures are mandatory and multi-jumps are played to the end')
+    for name in ENGINES:
+        prefix = name.lower()
+        parser.add_argument(f'--{prefix}-depth', type=int, default=None)
+        parser.add_argument(f'--{prefix}-time-ms', type=float, default=None)
+        parser.add_argument(f'--{prefix}-weights', help='JSON file of evaluation weights')
+        parser.add_argument(f'--{prefix}-tablebase', help='directory of endgame tables to probe')
+        parser.add_argument(f'--{prefix}-book', help='opening book file to play from')
+        parser.add_argument(f'--{prefix}-no-quiescence', action='store_true', help='evaluate the leaves directly')
+    args = parser.parse_args()
+    rules = rules_named(args.rules)
+
+    engines = []
+    for name in ENGINES:
+        prefix = name.lower()
+        depth, time_ms = getattr(args, f'{prefix}_depth'), getattr(args, f'{prefix}_time_ms')
+        weights_path = getattr(args, f'{prefix}_weights')
+        weights = None
+        if weights_path:
+            with open(weights_path) as file:
+                weights = json.load(file)
+        engines.append(engine_config(name, depth if depth or time_ms else 4, time_ms, weights,
+                                     tablebase_dir=getattr(args, f'{prefix}_tablebase'),
+                                     book=getattr(args, f'{prefix}_book'),
+                                     quiescence=not getattr(args, f'{prefix}_no_quiescence')))
+
+    if args.openings:
+        openings = load_openings(args.openings)
+    else:
+        openings = random_openings((args.games + 1) // 2, args.random_plies, args.seed, rules)
+
+    start = time.perf_counter()
+    wins, draws, losses = run_match(*engines, args.games, openings, args.max_plies, args.out, args.processes,
+                                       rules)
+    elo, margin = elo_difference(wins, draws, losses)
+    print(f"A vs B: +{wins} ={draws} -{losses} in {time.perf_counter() - start:.1f}s")
+    print(f"Elo difference (A - B): {elo:+.1f} +/- {margin:.1f}")
+    print(f"Games written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""
+Hosts many concurrent games against the AI without a window, over a local socket.
+
+Each connection is one session: a Game (see checker.game) in which the client plays
+PURPLE, moving first, and the AI plays YELLOW. The AI searches of every session run on
+one shared process pool. Searches are scheduled first come, first served. A session
+reads its next request only after the last one was answered, so it never has more than
+one search queued. Every waiting session is therefore served before any session gets a
+second search. Each move has a time budget that counts from when the move arrived, so
+time spent waiting for a process comes out of the search. While more searches are waiting
+than the server allows, new connections are turned away with a "busy" reply, and the
+client connects again after the suggested delay. The moves of the sessions already
+playing are never refused, so they keep their place in the queue.
+
+The protocol is one JSON object per line in each direction:
+    on connect                 -> {"session": 1, "fen": "W:W21,...:B1,...", "moves": ["21-17", ...],
+                                   "result": null}
+    {"move": "22-18"}          -> {"human": "22-18", "ai": "11-15", "fen": ..., "moves": [...], "result": null,
+                                   "depth": 6, "queued_ms": 0.4, "search_ms": 187.2}
+    {"new": true, "time_ms": 50}  -> a new game (with a smaller budget), answered like a connect
+    on connect when saturated  -> {"error": "busy", "retry_ms": 120}, and the connection is closed
+    on a bad request           -> {"error": "..."}
+Squares are numbered as in checker.notation. Once the game is over, "result" is "human",
+"ai" or "draw", and only "new" is accepted.
+
+Run from the repository root:
+    python server.py --port 8765 --processes 4 --time-ms 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW, PURPLE
+from checker.evaluation import Evaluator
+from checker.game import Game
+from checker.notation import move_to_text, parse_move, to_fen
+from checker.rules import RULES, rules_named
+from checker.termination import DRAW
+from minimax.worker import run_search, snapshot
+
+MIN_SEARCH_MS = 1  # Search time of a move whose budget went by in the queue; the first depth always completes
+RESULT_NAMES = {YELLOW: 'ai', PURPLE: 'human', DRAW: 'draw'}  # How each result of Game.winner is sent
+
+
+class SearchPool:
+    """
+    Runs the AI searches of all sessions on one process pool, at most one search per
+    process at a time. The others wait in a first-in, first-out queue, so the remaining
+    budget of each search is worked out when it actually starts.
+    """
+    def __init__(self, processes=None, max_queued=256, tablebase_dir=None, cache_mb=16):
+        """
+        Initializes the pool and starts its processes.
+
+        Args:
+            processes (int): The number of search processes; every CPU if not given.
+            max_queued (int): The waiting searches at which the pool counts as full (see full).
+            tablebase_dir (str): The directory of the endgame tables, or None to search without them.
+            cache_mb (float): The memory cap of the transposition table each process keeps between
+                searches. It is shared by every session the process searches for: its entries
+                are keyed by position, so the sessions do not disturb each other's scores and
+                share the openings they have in common. The move heuristics and principal
+                variation a single game keeps between moves are not kept, since consecutive
+                searches of a process are for unrelated games.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self.tablebase_dir = tablebase_dir
+        self.cache_mb = cache_mb
+        self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        self.waiting = deque()  # (future, position, weights, rules, budget_ms, received, max_depth) per search
+        self.running = 0
+        self.tasks = set()  # Searches in the pool, kept so they are not garbage collected
+        self.searches = 0
+        self.search_seconds = 0.0  # Time the finished searches took, for the retry estimates
+
+    def full(self):
+        """
+        Returns True when so many searches are waiting that no new session should be accepted.
+        """
+        return len(self.waiting) >= self.max_queued
+
+    def retry_ms(self):
+        """
+        Returns how long a turned away client should wait before connecting again: the time
+        the waiting searches need to start, judged from the searches so far.
+        """
+        average = self.search_seconds / self.searches if self.searches else 0.1
+        return round(1000 * average * (len(self.waiting) + 1) / self.processes)
+
+    async def search(self, board, budget_ms, received, max_depth=20):
+        """
+        Searches the AI's move once a process is free.
+
+        Args:
+            board (Board): The position, with YELLOW to move; it is copied, not shared.
+            budget_ms (float): The time budget of the move, in milliseconds.
+            received (float): When the move that needs the answer arrived (time.perf_counter);
+                the time since then is taken from the budget.
+            max_depth (int): The deepest iteration to run.
+
+        Returns:
+            tuple: The SearchResult, and the milliseconds it waited for a process.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.waiting.append((future, snapshot(board), board.evaluator.weights, board.rules, budget_ms, received,
+                             max_depth))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self):
+        """
+        Helper that starts waiting searches while processes are free, skipping cancelled ones.
+        """
+        while self.running < self.processes and self.waiting:
+            job = self.waiting.popleft()
+            if job[0].cancelled():
+                continue
+            self.running += 1
+            task = asyncio.ensure_future(self._run(*job))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, future, position, weights, rules, budget_ms, received, max_depth):
+        """
+        Helper that runs one search in the pool and hands its result to the waiting session.
+        """
+        started = time.perf_counter()
+        queued_ms = (started - received) * 1000
+        time_ms = max(budget_ms - queued_ms, MIN_SEARCH_MS)
+        try:
+            result = await asyncio.wrap_future(self.executor.submit(
+                run_search, position, True, time_ms, max_depth, weights, self.tablebase_dir, False, rules,
+                self.cache_mb, table_only=True))
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+        else:
+            if not future.done():
+                future.set_result((result, queued_ms))
+        finally:
+            self.searches += 1
+            self.search_seconds += time.perf_counter() - started
+            self.running -= 1
+            self._dispatch()
+
+    def shutdown(self):
+        """
+        Stops the search processes without waiting for them.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Session:
+    """
+    One game of one client.
+    """
+    def __init__(self, number, evaluator, rules, time_ms):
+        """
+        Starts a session with a new game.
+
+        Args:
+            number (int): The session number, sent to the client.
+            evaluator (Evaluator): The evaluation weights of the AI, or None for the defaults.
+            rules (Rules): The rules of the games.
+            time_ms (float): The time budget of each AI move, in milliseconds.
+        """
+        self.number = number
+        self.evaluator = evaluator
+        self.rules = rules
+        self.new_game(time_ms)
+
+    def new_game(self, time_ms):
+        """
+        Replaces the game with a new one.
+
+        Args:
+            time_ms (float): The time budget of each AI move, in milliseconds.
+        """
+        self.time_ms = time_ms
+        self.game = Game(None, self.evaluator, rules=self.rules, cache_mb=0)  # Headless: never drawn nor searched
+
+    def state(self, **fields):
+        """
+        Returns the reply describing the game: its position, the client's legal moves and the result.
+
+        Args:
+            fields: Further fields of the reply.
+
+        Returns:
+            dict: The reply.
+        """
+        winner = self.game.winner()
+        position = BitBoard.from_board(self.game.board)
+        moves = position.get_all_moves(PURPLE) if winner is None else []
+        return {'session': self.number, **fields, 'fen': to_fen(self.game.board, self.game.turn),
+                'moves': [move_to_text(move, position) for move in moves], 'result': RESULT_NAMES.get(winner)}
+
+
+class GameServer:
+    """
+    Accepts sessions on a local socket and answers their moves with the AI's.
+    """
+    def __init__(self, pool, evaluator=None, rules=None, time_ms=200, max_depth=20, max_sessions=2000):
+        """
+        Initializes the server.
+
+        Args:
+            pool (SearchPool): Where the AI moves are searched.
+            evaluator (Evaluator): The evaluation weights of the AI, or None for the defaults.
+            rules (Rules): The rules of the games; CASUAL if not given.
+            time_ms (float): The time budget of each AI move, and the most a client may ask for.
+            max_depth (int): The deepest iteration of each search.
+            max_sessions (int): The most sessions at a time; more connections are turned away,
+                as they are while the pool is full.
+        """
+        self.pool = pool
+        self.evaluator = evaluator
+        self.rules = rules or rules_named('casual')
+        self.time_ms = time_ms
+        self.max_depth = max_depth
+        self.max_sessions = max_sessions
+        self.sessions = {}  # Session number -> Session
+        self.opened = 0
+
+    async def serve(self, host='127.0.0.1', port=8765, ready=None):
+        """
+        Serves until cancelled.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on; 0 picks a free one.
+            ready (callable): Called with the (host, port) listened on once connections are accepted.
+        """
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        """
+        Runs one session: answers the requests of a connection one at a time until it closes.
+        """
+        if len(self.sessions) >= self.max_sessions or self.pool.full():
+            # Refused before anything is queued: the sessions already playing keep their share
+            await self.send(writer, {'error': 'busy', 'retry_ms': self.pool.retry_ms()})
+            writer.close()
+            return
+        self.opened += 1
+        session = Session(self.opened, self.evaluator, self.rules, self.time_ms)
+        self.sessions[session.number] = session
+        try:
+            await self.send(writer, session.state())
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                received = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("requests are JSON objects")
+                except ValueError as error:
+                    await self.send(writer, {'error': f"bad request: {error}"})
+                    continue
+                await self.send(writer, await self.respond(session, request, received))
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            pass  # The client went away, sent a line longer than the stream limit, or the server is stopping
+        finally:
+            del self.sessions[session.number]
+            session.game.close()
+            writer.close()
+
+    async def respond(self, session, request, received):
+        """
+        Answers one request of a session.
+
+        Args:
+            session (Session): The session.
+            request (dict): The request.
+            received (float): When the request arrived (time.perf_counter).
+
+        Returns:
+            dict: The reply.
+        """
+        if request.get('new'):
+            time_ms = request.get('time_ms', self.time_ms)
+            # JSON true is an int to Python, and NaN compares false with everything
+            if isinstance(time_ms, bool) or not isinstance(time_ms, (int, float)) or not time_ms > 0:
+                return {'error': f"bad time_ms: {json.dumps(time_ms)}, expected a positive number of milliseconds"}
+            session.game.close()
+            session.new_game(min(time_ms, self.time_ms))
+            return session.state()
+        text = request.get('move')
+        if not isinstance(text, str):
+            return {'error': 'expected "move" or "new"'}
+        game = session.game
+        if game.winner() is not None:
+            return {'error': 'the game is over'}
+        try:
+            move = parse_move(BitBoard.from_board(game.board), text, PURPLE)
+        except ValueError as error:
+            return {'error': str(error)}
+        game.play(move)
+        if game.winner() is not None:
+            return session.state(human=text)
+        result, queued_ms = await self.pool.search(game.board, session.time_ms, received, self.max_depth)
+        ai = move_to_text(result.move, BitBoard.from_board(game.board))
+        game.play(result.move)
+        return session.state(human=text, ai=ai, depth=result.depth,
+                             queued_ms=round(queued_ms, 1), search_ms=round(result.elapsed * 1000, 1))
+
+    @staticmethod
+    async def send(writer, reply):
+        """
+        Helper that writes one reply line, waiting while the client is slow to read.
+        """
+        writer.write(json.dumps(reply).encode() + b'\n')
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0 picks a free port')
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--time-ms', type=float, default=200, help='time budget of each AI move')
+    parser.add_argument('--max-depth', type=int, default=20)
+    parser.add_argument('--max-sessions', type=int, default=2000)
+    parser.add_argument('--max-queued', type=int, default=256, help='waiting searches that stop new sessions')
+    parser.add_argument('--cache-mb', type=float, default=16, help='transposition table of each process (0 for none)')
+    parser.add_argument('--rules', choices=RULES, default='casual')
+    parser.add_argument('--weights', default='weights.json', help='evaluation weights, used when the file exists')
+    parser.add_argument('--tablebase', help='directory of endgame tables to probe')
+    args = parser.parse_args()
+
+    evaluator = Evaluator.load(args.weights) if path.exists(args.weights) else None
+    pool = SearchPool(args.processes, args.max_queued, args.tablebase, args.cache_mb)
+    server = GameServer(pool, evaluator, rules_named(args.rules), args.time_ms, args.max_depth, args.max_sessions)
+
+    def ready(address):
+        print(f"listening on {address[0]}:{address[1]} with {pool.processes} search processes", flush=True)
+
+    async def serve():
+        # SIGTERM cancels the server like Ctrl+C, so the search processes are stopped as well
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass  # No signal handlers on Windows event loops
+        await server.serve(args.host, args.port, ready)
+
+    try:
+        asyncio.run(serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
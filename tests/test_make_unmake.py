@@ -0,0 +1,50 @@
+"""
+Checks Board.make_move/unmake_move against the deepcopy path of get_all_moves on random positions.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import random
+import unittest
+
+from checker.bitboard import BitBoard
+from checker.constants import YELLOW, PURPLE
+from minimax.algorithm import get_all_moves
+from benchmarks.positions import random_board
+
+POSITIONS = 500  # Random positions checked, with every move of both sides
+
+
+def snapshot(board):
+    """
+    Returns everything that identifies a Board position, for exact comparisons.
+    """
+    pieces = [(piece.row, piece.col, piece.x, piece.y, piece.king)
+              for row in board.board for piece in row if piece != 0]
+    counters = (board.red_left, board.white_left, board.red_kings, board.white_kings, board.zobrist)
+    return BitBoard.from_board(board), pieces, counters
+
+
+class MakeUnmakeTest(unittest.TestCase):
+    def test_matches_deepcopy(self):
+        """
+        Every make_move produces the same position as the deepcopy path, and unmake_move
+        restores the original board exactly.
+        """
+        rng = random.Random(0)
+        for _ in range(POSITIONS):
+            board = random_board(rng)
+            before = snapshot(board)
+            for color in (YELLOW, PURPLE):
+                copies = get_all_moves(board, color, None)
+                moves = board.get_all_moves(color)
+                self.assertEqual(len(moves), len(copies))
+                for move, copied in zip(moves, copies):
+                    undo = board.make_move(move)
+                    self.assertEqual(snapshot(board), snapshot(copied), 'make_move differs from the deepcopy path')
+                    board.unmake_move(undo)
+                    self.assertEqual(snapshot(board), before, 'unmake_move did not restore the board')
+
+
+if __name__ == '__main__':
+    unittest.main()
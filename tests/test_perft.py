@@ -0,0 +1,66 @@
+"""
+Checks the table-driven move generators of Board and BitBoard against the original recursive
+generator on random positions, and their perft counts from the starting position.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import random
+import unittest
+
+from checker.bitboard import BitBoard
+from checker.board import Board
+from checker.constants import YELLOW, PURPLE
+from benchmarks.perft import legacy_valid_moves, legacy_all_moves, perft
+from benchmarks.positions import random_board
+
+POSITIONS = 500  # Random positions checked, with every move of both sides
+# Positions after every sequence of 1, 2, ... moves from the start with the casual rules
+START_PERFT = (7, 49, 379, 2872, 23582)
+
+
+def same_moves(found, expected):
+    """
+    Compares two (piece, row, col, skipped) lists: same moves, same order, same captured pieces.
+    """
+    return len(found) == len(expected) and all(
+        a[:3] == b[:3] and set(map(id, a[3])) == set(map(id, b[3])) for a, b in zip(found, expected))
+
+
+class MoveGenerationTest(unittest.TestCase):
+    def test_matches_legacy_generator(self):
+        """
+        Board.get_valid_moves, Board.get_all_moves and BitBoard.get_all_moves find the same
+        moves as the legacy generator, in the same order, capturing the same pieces.
+        """
+        rng = random.Random(0)
+        for _ in range(POSITIONS):
+            board = random_board(rng)
+            position = BitBoard.from_board(board)
+            for color in (YELLOW, PURPLE):
+                for piece in board.get_all_pieces(color):
+                    found, expected = board.get_valid_moves(piece), legacy_valid_moves(board, piece)
+                    self.assertEqual(list(found), list(expected), 'get_valid_moves differs from the legacy generator')
+                    for key in found:
+                        self.assertEqual(set(map(id, found[key])), set(map(id, expected[key])))
+                expected = legacy_all_moves(board, color)
+                self.assertTrue(same_moves(board.get_all_moves(color), expected), 'Board.get_all_moves differs')
+                moves = position.get_all_moves(color)
+                self.assertEqual(len(moves), len(expected))
+                for move, legacy in zip(moves, expected):
+                    undo = board.make_move(legacy)
+                    self.assertEqual(BitBoard.from_board(board), position.apply(move), 'BitBoard.get_all_moves differs')
+                    board.unmake_move(undo)
+
+    def test_start_perft(self):
+        """
+        Board and BitBoard count the same lines of play from the starting position.
+        """
+        for depth, expected in enumerate(START_PERFT, 1):
+            for position in (Board(), BitBoard.from_board(Board())):
+                nodes = perft(position, depth, PURPLE)  # PURPLE moves first in the game
+                self.assertEqual(nodes, expected, f"{type(position).__name__} at depth {depth}")
+
+
+if __name__ == '__main__':
+    unittest.main()